@@ -0,0 +1,119 @@
+"""
+Compares two ways of extracting the `loglam`, `flux` and `ivar` columns of
+the `COADD` table of an SDSS spectrum file:
+
+* ``astropy``: open the file with ``astropy.io.fits`` and read the table's
+  columns (the previous approach, still used as a fallback).
+* ``lean``: view the table's rows in place with ``cds_hubble.coadd.read_coadd``.
+
+Both are run against a file with only the three columns used, as served by
+``cds-app api-server``, and against one laid out like an SDSS DR17 spectrum,
+with all eight `COADD` columns and extra tables after it.
+
+Usage::
+
+    python benchmarks/coadd_reader.py --pixels 3800 4600
+"""
+
+import argparse
+import io
+import timeit
+from contextlib import closing
+
+import numpy as np
+from astropy.io import fits
+
+from cds_hubble.coadd import read_coadd
+
+
+def build_spectrum(pixels: int, full: bool) -> bytes:
+    """A spectrum file of `pixels` samples, with the full SDSS layout if `full`."""
+    rng = np.random.default_rng(pixels)
+    loglam = np.linspace(3.58, 3.96, pixels, dtype=">f4")
+    columns = [
+        fits.Column(name="flux", format="E", array=rng.normal(10, 1, pixels)),
+        fits.Column(name="loglam", format="E", array=loglam),
+        fits.Column(name="ivar", format="E", array=np.full(pixels, 4.0)),
+    ]
+
+    if full:
+        columns += [
+            fits.Column(name="and_mask", format="J", array=np.zeros(pixels)),
+            fits.Column(name="or_mask", format="J", array=np.zeros(pixels)),
+            fits.Column(name="wdisp", format="E", array=np.ones(pixels)),
+            fits.Column(name="sky", format="E", array=rng.normal(1, 0.1, pixels)),
+            fits.Column(name="model", format="E", array=rng.normal(10, 1, pixels)),
+        ]
+
+    hdus = [fits.PrimaryHDU(), fits.BinTableHDU.from_columns(columns, name="COADD")]
+
+    if full:
+        hdus += [
+            fits.BinTableHDU.from_columns(
+                [fits.Column(name="z", format="E", array=rng.random(1))], name="SPALL"
+            ),
+            fits.BinTableHDU.from_columns(
+                [fits.Column(name="linez", format="E", array=rng.random(32))],
+                name="SPZLINE",
+            ),
+        ]
+
+    buffer = io.BytesIO()
+    fits.HDUList(hdus).writeto(buffer)
+    return buffer.getvalue()
+
+
+def extract_astropy(content: bytes) -> tuple[np.ndarray, ...]:
+    with closing(io.BytesIO(content)) as f:
+        with fits.open(f) as hdulist:
+            data = hdulist["COADD"].data
+            return 10 ** data["loglam"], data["flux"], data["ivar"]
+
+
+def extract_lean(content: bytes) -> tuple[np.ndarray, ...]:
+    data = read_coadd(content)
+    return 10 ** data["loglam"], data["flux"], data["ivar"]
+
+
+def run(pixels: int, full: bool, repeat: int, number: int) -> dict:
+    content = build_spectrum(pixels, full)
+
+    for expected, actual in zip(extract_astropy(content), extract_lean(content)):
+        np.testing.assert_array_equal(expected, actual)
+
+    result = {"pixels": pixels, "layout": "sdss" if full else "served"}
+    for name, extract in (("astropy", extract_astropy), ("lean", extract_lean)):
+        best = min(
+            timeit.repeat(lambda: extract(content), repeat=repeat, number=number)
+        )
+        result[f"{name}_ms"] = best / number * 1000
+
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--pixels",
+        type=int,
+        nargs="+",
+        default=[3800, 4600],
+        help="Numbers of samples per spectrum to test.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    print(f"{'pixels':>8}{'layout':>9}{'astropy':>12}{'lean':>12}{'speedup':>10}")
+    for pixels in args.pixels:
+        for full in (False, True):
+            r = run(pixels, full, args.repeat, args.number)
+            print(
+                f"{r['pixels']:>8}{r['layout']:>9}"
+                f"{r['astropy_ms']:>10.3f}ms{r['lean_ms']:>10.3f}ms"
+                f"{r['astropy_ms'] / r['lean_ms']:>9.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Compares two ways of fitting the Hubble constant and age of the universe of
+every student from their distance and velocity measurements, as done by
+``make_summary_data`` for Stage 5 and by the educator dashboard:
+
+* ``per_group``: bucket the measurements per student in a Python loop, then
+  fit each student with astropy's ``LinearLSQFitter`` (the previous approach).
+* ``grouped``: fit every student at once with ``cds_core.fitting.hubble_fits``.
+
+Usage::
+
+    python benchmarks/grouped_hubble_fit.py --students 20 200 4000
+"""
+
+import argparse
+import timeit
+from collections import defaultdict
+
+import numpy as np
+from astropy import units as u
+from astropy.modeling import fitting, models
+
+from cds_core.fitting import hubble_fits
+
+MEASUREMENTS_PER_STUDENT = 5
+
+
+def build_measurements(students: int) -> tuple[np.ndarray, ...]:
+    rng = np.random.default_rng(students)
+    ids = np.repeat(np.arange(students), MEASUREMENTS_PER_STUDENT)
+    distances = rng.uniform(10, 400, len(ids))
+    velocities = 70 * distances + rng.normal(0, 1000, len(ids))
+    return ids, distances, velocities
+
+
+def fit_per_group(ids, distances, velocities) -> tuple[list, list, list]:
+    dists, vels = defaultdict(list), defaultdict(list)
+    for i in range(len(ids)):
+        dists[ids[i]].append(distances[i])
+        vels[ids[i]].append(velocities[i])
+
+    fit = fitting.LinearLSQFitter()
+    line_init = models.Linear1D(intercept=0, fixed={"intercept": True})
+    gyr = u.Mpc.to(u.km) * u.s.to(u.Gyr)
+
+    groups, hubbles, ages = [], [], []
+    for id_num in dists:
+        h0 = fit(line_init, dists[id_num], vels[id_num]).slope.value
+        groups.append(id_num)
+        hubbles.append(h0)
+        ages.append(round(gyr / h0, 3))
+
+    return groups, hubbles, ages
+
+
+def run(students: int, repeat: int, number: int) -> dict:
+    ids, distances, velocities = build_measurements(students)
+
+    _, expected, _ = fit_per_group(ids, distances, velocities)
+    np.testing.assert_allclose(hubble_fits(ids, distances, velocities).h0, expected)
+
+    cases = {
+        "per_group": lambda: fit_per_group(ids, distances, velocities),
+        "grouped": lambda: hubble_fits(ids, distances, velocities),
+        "grouped_error": lambda: hubble_fits(
+            ids, distances, velocities, uncertainty=True
+        ),
+    }
+
+    result = {"students": students}
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, repeat=repeat, number=number)) / number
+        result[f"{name}_ms"] = best * 1000
+
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--students",
+        type=int,
+        nargs="+",
+        default=[20, 200, 4000],
+        help="Numbers of students to test.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'students':>9}{'per_group':>13}{'grouped':>12}{'with error':>13}"
+        f"{'speedup':>10}"
+    )
+    for students in args.students:
+        r = run(students, args.repeat, args.number)
+        print(
+            f"{r['students']:>9}{r['per_group_ms']:>11.3f}ms"
+            f"{r['grouped_ms']:>10.3f}ms{r['grouped_error_ms']:>11.3f}ms"
+            f"{r['per_group_ms'] / r['grouped_ms']:>9.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
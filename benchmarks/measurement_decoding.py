@@ -0,0 +1,132 @@
+"""
+Compares three ways of decoding an ``all-data`` response of the CosmicDS API,
+as requested by `LocalAPI.get_all_data`:
+
+* ``per_row``: ``r.json()``, then one ``StudentMeasurement(**m)`` (and
+  summary) per row (the previous approach).
+* ``bulk``: validate the response bytes into lists of models with a
+  ``TypeAdapter``.
+* ``columnar``: validate the response bytes into plain rows, and gather the
+  measurements into a ``MeasurementTable``.
+
+Usage::
+
+    python benchmarks/measurement_decoding.py --measurements 1000 20000
+"""
+
+import argparse
+import json
+import timeit
+
+from cds_hubble.remote import LocalAPI
+from cds_hubble.story_state import ClassSummary, StudentMeasurement, StudentSummary
+
+MEASUREMENTS_PER_STUDENT = 5
+STUDENTS_PER_CLASS = 20
+
+
+def build_payload(measurements: int) -> bytes:
+    """An ``all-data`` response with `measurements` complete measurements."""
+    rows = []
+    for i in range(measurements):
+        student_id = i // MEASUREMENTS_PER_STUDENT
+        rows.append(
+            {
+                "student_id": student_id,
+                "class_id": student_id // STUDENTS_PER_CLASS,
+                "obs_wave_value": 6600.0 + i % 300,
+                "velocity_value": 1000.0 + i % 9000,
+                "ang_size_value": 10.0 + i % 90,
+                "est_dist_value": 20.0 + i % 400,
+                "measurement_number": None,
+                "brightness": 1,
+                "galaxy_id": i % 3000,
+                "galaxy": {
+                    "id": i % 3000,
+                    "name": f"{1000000 + i % 3000}.fits",
+                    "ra": (i % 360) * 1.0,
+                    "decl": (i % 60) * 1.0,
+                    "z": 0.01,
+                    "type": "Sp",
+                    "element": "H-α",
+                },
+            }
+        )
+
+    students = measurements // MEASUREMENTS_PER_STUDENT
+    payload = {
+        "measurements": rows,
+        "studentData": [
+            {"student_id": i, "hubble_fit_value": 70.0, "age_value": 13.9}
+            for i in range(students)
+        ],
+        "classData": [
+            {"class_id": i, "hubble_fit_value": 70.0, "age_value": 13.9}
+            for i in range(students // STUDENTS_PER_CLASS)
+        ],
+    }
+
+    return json.dumps(payload).encode()
+
+
+def decode_per_row(content: bytes) -> tuple[list, list, list]:
+    res_json = json.loads(content)
+    return (
+        [
+            StudentMeasurement(**m)
+            for m in res_json["measurements"]
+            if m["class_id"] is not None
+        ],
+        [StudentSummary(**s) for s in res_json["studentData"]],
+        [ClassSummary(**s) for s in res_json["classData"]],
+    )
+
+
+def run(measurements: int, repeat: int, number: int) -> dict:
+    content = build_payload(measurements)
+
+    expected, actual = decode_per_row(content), LocalAPI._parse_all_data(content)
+    assert expected == actual
+
+    cases = {
+        "per_row": lambda: decode_per_row(content),
+        "bulk": lambda: LocalAPI._parse_all_data(content),
+        "columnar": lambda: LocalAPI._parse_all_data(content, columnar=True),
+    }
+
+    result = {"measurements": measurements, "payload_kb": len(content) / 1024}
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, repeat=repeat, number=number)) / number
+        result[f"{name}_ms"] = best * 1000
+
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--measurements",
+        type=int,
+        nargs="+",
+        default=[1000, 20000],
+        help="Numbers of measurements per response to test.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'measurements':>13}{'payload':>11}{'per_row':>12}{'bulk':>12}"
+        f"{'columnar':>12}"
+    )
+    for measurements in args.measurements:
+        r = run(measurements, args.repeat, args.number)
+        print(
+            f"{r['measurements']:>13}{r['payload_kb']:>9.0f}kB"
+            f"{r['per_row_ms']:>10.2f}ms{r['bulk_ms']:>10.2f}ms"
+            f"{r['columnar_ms']:>10.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
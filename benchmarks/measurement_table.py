@@ -0,0 +1,102 @@
+"""
+Compares building the glue data of the All Measurements dataset of stage 5,
+and picking out one class's measurements, from:
+
+* ``models``: a list of ``StudentMeasurement`` models, converted with
+  ``models_to_glue_data`` and filtered with a list comprehension (the
+  previous approach).
+* ``table``: a ``MeasurementTable``, converted with ``to_glue_data`` and
+  filtered with ``for_class``.
+
+Usage::
+
+    python benchmarks/measurement_table.py --measurements 1000 20000
+"""
+
+import argparse
+import timeit
+
+from cds_hubble.measurement_table import MeasurementTable
+from cds_hubble.story_state import GalaxyData, StudentMeasurement
+from cds_hubble.utils import models_to_glue_data
+
+MEASUREMENTS_PER_STUDENT = 5
+STUDENTS_PER_CLASS = 20
+
+
+def build_measurements(measurements: int) -> list[StudentMeasurement]:
+    galaxies = [
+        GalaxyData(
+            id=i,
+            name=f"{1000000 + i}.fits",
+            ra=i % 360,
+            decl=i % 60,
+            z=0.01,
+            type="Sp",
+            element="H-α",
+        )
+        for i in range(3000)
+    ]
+
+    return [
+        StudentMeasurement(
+            student_id=i // MEASUREMENTS_PER_STUDENT,
+            class_id=i // (MEASUREMENTS_PER_STUDENT * STUDENTS_PER_CLASS),
+            obs_wave_value=6600.0 + i % 300,
+            velocity_value=1000.0 + i % 9000,
+            ang_size_value=10.0 + i % 90,
+            est_dist_value=20.0 + i % 400,
+            galaxy=galaxies[i % len(galaxies)],
+        )
+        for i in range(measurements)
+    ]
+
+
+def run(measurements: int, repeat: int, number: int) -> dict:
+    models = build_measurements(measurements)
+    table = MeasurementTable.from_models(models)
+    class_id = int(table.class_ids[len(table.class_ids) // 2])
+
+    cases = {
+        "models_glue": lambda: models_to_glue_data(models, label="All Measurements"),
+        "table_glue": lambda: table.to_glue_data(label="All Measurements"),
+        "models_class": lambda: [m for m in models if m.class_id == class_id],
+        "table_class": lambda: table.for_class(class_id),
+    }
+
+    result = {"measurements": measurements}
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, repeat=repeat, number=number)) / number
+        result[f"{name}_ms"] = best * 1000
+
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--measurements",
+        type=int,
+        nargs="+",
+        default=[1000, 20000],
+        help="Numbers of measurements to test.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'measurements':>13}{'models glue':>14}{'table glue':>14}"
+        f"{'models class':>14}{'table class':>14}"
+    )
+    for measurements in args.measurements:
+        r = run(measurements, args.repeat, args.number)
+        print(
+            f"{r['measurements']:>13}"
+            f"{r['models_glue_ms']:>12.3f}ms{r['table_glue_ms']:>12.3f}ms"
+            f"{r['models_class_ms']:>12.3f}ms{r['table_class_ms']:>12.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Compares two ways of finding what changed in the Hubble story's app state
+between two persistence flushes:
+
+* ``deepdiff``: dump the old and new state with ``model_dump`` and diff them
+  with ``cds_hubble.utils.extract_changed_subtree`` (the previous approach).
+* ``journal``: ask the new state for its changes since the last flush with
+  ``BaseState.dump_changes``.
+
+Usage::
+
+    python benchmarks/state_change_detection.py --responses 0 10 50 200
+"""
+
+import argparse
+import json
+import random
+import timeit
+
+import solara
+from solara.toestand import Ref
+
+import cds_hubble  # noqa: F401 (registers the story and stage states)
+from cds_core.app_state import AppState
+from cds_core.base_states import FreeResponse, MultipleChoiceResponse
+from cds_hubble.utils import extract_changed_subtree
+
+
+def build_state(responses: int) -> solara.Reactive:
+    """An app state with `responses` free and multiple choice responses per stage."""
+    app_state = solara.Reactive(AppState())
+    stage_states = app_state.fields.story_state.stage_states
+
+    for name in Ref(stage_states).value:
+        Ref(stage_states[name].free_responses).set(
+            {
+                f"fr-{i}": FreeResponse(tag=f"fr-{i}", response="lorem ipsum " * 4, stage=name)
+                for i in range(responses)
+            }
+        )
+        Ref(stage_states[name].multiple_choice_responses).set(
+            {
+                f"mc-{i}": MultipleChoiceResponse(tag=f"mc-{i}", score=10, choice=1, stage=name)
+                for i in range(responses)
+            }
+        )
+
+    return app_state
+
+
+def make_changes(app_state: solara.Reactive, changes: int, rng: random.Random):
+    """Edits `changes` random free responses, as students typing answers would."""
+    stage_states = app_state.fields.story_state.stage_states
+
+    for _ in range(changes):
+        name = rng.choice(list(Ref(stage_states).value))
+        tag = f"fr-{rng.randrange(1_000_000)}"
+        responses = Ref(stage_states[name].free_responses)
+        responses.set(
+            {**responses.value, tag: FreeResponse(tag=tag, response="answer", stage=name)}
+        )
+
+
+def run(responses: int, changes: int, repeat: int, number: int) -> dict:
+    app_state = build_state(responses)
+    old = app_state.value
+    make_changes(app_state, changes, random.Random(responses))
+    new = app_state.value
+
+    def deepdiff():
+        return extract_changed_subtree(old.as_dict(), new.as_dict())
+
+    def journal():
+        return new.dump_changes(since=old.journal_seq)
+
+    result = {"responses": responses, "state_kb": len(json.dumps(new.as_dict())) / 1024}
+    for name, detect in (("deepdiff", deepdiff), ("journal", journal)):
+        best = min(timeit.repeat(detect, repeat=repeat, number=number)) / number
+        result[f"{name}_ms"] = best * 1000
+        result[f"{name}_patch_kb"] = len(json.dumps(detect())) / 1024
+
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--responses",
+        type=int,
+        nargs="+",
+        default=[0, 10, 50, 200],
+        help="Numbers of free and multiple choice responses per stage to test.",
+    )
+    parser.add_argument(
+        "--changes", type=int, default=3, help="Responses edited between flushes."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'responses':>10}{'state':>10}{'deepdiff':>12}{'journal':>12}"
+        f"{'speedup':>10}{'patch (dd/j)':>18}"
+    )
+    for responses in args.responses:
+        r = run(responses, args.changes, args.repeat, args.number)
+        print(
+            f"{r['responses']:>10}{r['state_kb']:>8.1f}kB"
+            f"{r['deepdiff_ms']:>10.2f}ms{r['journal_ms']:>10.3f}ms"
+            f"{r['deepdiff_ms'] / r['journal_ms']:>9.0f}x"
+            f"{r['deepdiff_patch_kb']:>8.1f}/{r['journal_patch_kb']:.1f}kB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Measures how fast the Hubble story's app and story states are constructed
+and validated, with the union types of the state classes patched on every
+construction (``repatch``, the previous behavior) and patched once until
+the stage and story registries change (``frozen``).
+
+Usage::
+
+    python benchmarks/state_construction.py --number 200
+"""
+
+import argparse
+import timeit
+
+import cds_hubble  # noqa: F401 (registers the story and stage states)
+from cds_core import base_states
+from cds_core.app_state import AppState, Student
+from cds_hubble.story_state import StoryState
+
+
+def run(repeat: int, number: int) -> dict:
+    dumped = AppState(student=Student(id=1)).model_dump()
+
+    cases = {
+        "StoryState()": StoryState,
+        "AppState()": AppState,
+        "AppState.model_validate": lambda: AppState.model_validate(dumped),
+    }
+
+    results = {}
+    for name, construct in cases.items():
+        def repatch():
+            base_states._PATCHED_UNIONS.clear()
+            return construct()
+
+        results[name] = {
+            mode: min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+            for mode, fn in (("repatch", repatch), ("frozen", construct))
+        }
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(f"{'case':>24}{'repatch':>12}{'frozen':>12}{'speedup':>10}{'per s':>10}")
+    for name, r in run(args.repeat, args.number).items():
+        print(
+            f"{name:>24}{r['repatch'] * 1000:>10.3f}ms{r['frozen'] * 1000:>10.3f}ms"
+            f"{r['repatch'] / r['frozen']:>9.1f}x{1 / r['frozen']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Measures serialization and validation throughput of a full Hubble story app
+state, with the story state and all seven stage states, as done on every
+persistence flush and every state load:
+
+* ``dump``: ``model_dump`` of the app state.
+* ``dump_json``: ``model_dump_json`` of the app state.
+* ``validate``: ``AppState.model_validate`` of a dumped app state.
+
+Usage::
+
+    python benchmarks/state_serialization.py --responses 0 10 50
+"""
+
+import argparse
+import json
+import timeit
+
+from cds_core.app_state import AppState, Student
+from state_change_detection import build_state
+
+
+def run(responses: int, repeat: int, number: int) -> dict:
+    app_state = build_state(responses).value.update({"student": Student(id=1)})
+    dumped = app_state.model_dump()
+
+    cases = {
+        "dump": app_state.model_dump,
+        "dump_json": app_state.model_dump_json,
+        "validate": lambda: AppState.model_validate(dumped),
+    }
+
+    result = {"responses": responses, "state_kb": len(json.dumps(dumped)) / 1024}
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, repeat=repeat, number=number)) / number
+        result[f"{name}_ms"] = best * 1000
+
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--responses",
+        type=int,
+        nargs="+",
+        default=[0, 10, 50],
+        help="Numbers of free and multiple choice responses per stage to test.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'responses':>10}{'state':>10}{'dump':>12}{'dump_json':>12}"
+        f"{'validate':>12}{'dumps/s':>10}"
+    )
+    for responses in args.responses:
+        r = run(responses, args.repeat, args.number)
+        print(
+            f"{r['responses']:>10}{r['state_kb']:>8.1f}kB"
+            f"{r['dump_ms']:>10.3f}ms{r['dump_json_ms']:>10.3f}ms"
+            f"{r['validate_ms']:>10.3f}ms{1000 / r['dump_ms']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
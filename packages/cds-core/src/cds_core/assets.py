@@ -0,0 +1,184 @@
+"""
+Content-hashed, precompressed static assets.
+
+A `StaticAssets` serves the files of a story's or the portal's `public`
+folder under URLs like ``/assets/<digest>/<folder>/<file>``, where `digest`
+is a hash of the contents of the files in `folder`. As the URL of a file
+changes whenever its folder does, browsers may cache the files for good.
+Slideshow templates build file URLs from a folder URL, so digests are kept
+per folder rather than per file.
+
+``cds-app build-assets`` writes gzip (and, with the `brotli` package,
+brotli) variants of the files next to the `public` folder, which are served
+to browsers that accept them. Without a build, the files are served as is.
+"""
+
+import gzip
+import json
+import mimetypes
+import shutil
+from hashlib import sha256
+from pathlib import Path, PurePosixPath
+from threading import Lock
+
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.routing import Mount, Route
+
+from .logger import setup_logger
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = setup_logger("ASSETS")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Variants are only kept if they save at least this fraction of the size;
+#  images that are already compressed (PNG, JPEG, AVIF, ...) rarely do
+MIN_SAVING = 0.1
+
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+_MANIFEST = "manifest.json"
+
+
+def _digest(content: bytes) -> str:
+    return sha256(content).hexdigest()
+
+
+def _folder(path: str) -> str:
+    parent = str(PurePosixPath(path).parent)
+    return "" if parent == "." else parent
+
+
+class StaticAssets:
+    """
+    The files of the `public` folder, served with long-lived cache headers
+    once mounted in a Starlette app with `mount`. Until then, `url` returns
+    the files' ``/static/public`` URLs, served by Solara.
+    """
+
+    def __init__(self, public: str | Path, path: str = "/assets"):
+        self.public = Path(public).resolve()
+        self.build = self.public.with_name(f"{self.public.name}-build")
+        self.path = path
+        self.mounted = False
+        self._files: dict[str, str] | None = None
+        self._folders: dict[str, str] = {}
+        self._compressed: dict[str, str] = {}
+        self._lock = Lock()
+
+    def _index(self) -> dict[str, str]:
+        with self._lock:
+            if self._files is None:
+                self._files = _hash_files(self.public)
+
+                folders: dict[str, list[str]] = {}
+                for path, digest in sorted(self._files.items()):
+                    folders.setdefault(_folder(path), []).append(f"{path}:{digest}")
+
+                self._folders = {
+                    folder: _digest("\n".join(entries).encode())[:12]
+                    for folder, entries in folders.items()
+                }
+
+                try:
+                    manifest = json.loads((self.build / _MANIFEST).read_text())
+                    self._compressed = manifest["files"]
+                except FileNotFoundError:
+                    self._compressed = {}
+
+            return self._files
+
+    def url(self, path: str, root_path: str = "") -> str:
+        """The URL of the file or folder at `path`, relative to `public`."""
+        path = path.strip("/")
+
+        if not self.mounted:
+            return f"{root_path}/static/public/{path}"
+
+        self._index()
+        folder = path if (self.public / path).is_dir() else _folder(path)
+        digest = self._folders.get(folder, "0")
+
+        return f"{root_path}{self.path}/{digest}/{path}"
+
+    def mount(self, prefix: str = "") -> Mount:
+        """A route serving the assets under `prefix`, e.g. a story's path."""
+        self.mounted = True
+        return Mount(f"{prefix}{self.path}", routes=self.routes)
+
+    @property
+    def routes(self) -> list[Route]:
+        return [Route("/{digest}/{path:path}", endpoint=self.serve)]
+
+    async def serve(self, request: Request) -> Response:
+        digest, path = request.path_params["digest"], request.path_params["path"]
+        files = self._index()
+
+        if path not in files:
+            return Response(status_code=404)
+
+        headers = {
+            "Cache-Control": (
+                IMMUTABLE if digest == self._folders.get(_folder(path)) else "no-cache"
+            ),
+            "Vary": "Accept-Encoding",
+        }
+        media_type = mimetypes.guess_type(path)[0]
+        accepted = request.headers.get("accept-encoding", "")
+
+        # Only serve variants built from the current version of the file
+        if self._compressed.get(path) == files[path]:
+            for encoding, suffix in _ENCODINGS:
+                variant = self.build / f"{path}{suffix}"
+
+                if encoding in accepted and variant.is_file():
+                    headers["Content-Encoding"] = encoding
+                    return FileResponse(variant, media_type=media_type, headers=headers)
+
+        return FileResponse(self.public / path, media_type=media_type, headers=headers)
+
+
+def _hash_files(public: Path) -> dict[str, str]:
+    return {
+        path.relative_to(public).as_posix(): _digest(path.read_bytes())
+        for path in public.rglob("*")
+        if path.is_file()
+    }
+
+
+def build_assets(assets: StaticAssets) -> tuple[int, int]:
+    """
+    Writes the compressed variants of the files of `assets`, replacing any
+    previous build. Returns the number of files and of variants written.
+    """
+    files = _hash_files(assets.public)
+    shutil.rmtree(assets.build, ignore_errors=True)
+    variants = 0
+
+    for path in files:
+        content = (assets.public / path).read_bytes()
+        compressed = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+
+        if brotli is not None:
+            compressed[".br"] = brotli.compress(content, quality=11)
+
+        for suffix, data in compressed.items():
+            if len(data) > len(content) * (1 - MIN_SAVING):
+                continue
+
+            target = assets.build / f"{path}{suffix}"
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+            variants += 1
+
+    assets.build.mkdir(parents=True, exist_ok=True)
+    (assets.build / _MANIFEST).write_text(json.dumps({"files": files}, indent=1))
+
+    if brotli is None:
+        logger.warning("The `brotli` package is not installed; wrote gzip only.")
+
+    return len(files), variants
@@ -1,7 +1,6 @@
 import enum
-from inspect import isclass
+import itertools
 import os
-from types import UnionType
 from typing import (
     Dict,
     TypeVar,
@@ -13,19 +12,17 @@ from typing import (
     Literal,
     Callable,
     Any,
-    get_origin,
 )
 
 from pydantic import (
     BaseModel,
     Field,
-    SerializationInfo,
-    SerializerFunctionWrapHandler,
-    ValidationInfo,
+    GetCoreSchemaHandler,
+    PrivateAttr,
     computed_field,
-    field_serializer,
     field_validator,
 )
+from pydantic_core import CoreSchema, core_schema
 from solara import Reactive
 from solara.toestand import Ref
 
@@ -42,6 +39,16 @@ logger.info(f"Debug mode is {'enabled' if debug_mode_init else 'disabled'}. ")
 STAGE_REGISTRY: Dict[str, Type["BaseStageState"]] = {}
 STORY_REGISTRY: Dict[str, Type["BaseStoryState"]] = {}
 
+# Bumped whenever a stage or story is registered. The union types of the
+#  state classes are only patched again once it has changed.
+_registry_version = 0
+_PATCHED_UNIONS: Dict[type, int] = {}
+
+
+def _registry_changed():
+    global _registry_version
+    _registry_version += 1
+
 
 def register_stage(state_name: str):
 
@@ -49,6 +56,7 @@ def register_stage(state_name: str):
         setattr(cls, "type", state_name)
 
         STAGE_REGISTRY[state_name] = cls
+        _registry_changed()
         return cls
 
     return decorator
@@ -60,11 +68,22 @@ def register_story(state_name: str):
         setattr(cls, "type", state_name)
 
         STORY_REGISTRY[state_name] = cls
+        _registry_changed()
         return cls
 
     return decorator
 
 
+def _union_is_patched(cls: type) -> bool:
+    """Whether `cls` was patched since the registries last changed."""
+    return _PATCHED_UNIONS.get(cls) == _registry_version
+
+
+def _mark_union_patched(cls: type):
+    """Records that `cls` was patched, once its model has been rebuilt."""
+    _PATCHED_UNIONS[cls] = _registry_version
+
+
 class BaseMarker(enum.Enum):
 
     def __lt__(self, other):
@@ -115,36 +134,166 @@ class BaseMarker(enum.Enum):
     def is_at_or_before(cls, marker: "BaseMarker", end: "BaseMarker"):
         return marker.value <= end.value
 
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, _source: Any, _handler: GetCoreSchemaHandler
+    ) -> CoreSchema:
+        # Markers are validated from, and serialized to, their values. As the
+        #  schema belongs to the marker type, pydantic only applies it to the
+        #  fields of a state that hold markers, when it builds the state class.
+        serialization = core_schema.plain_serializer_function_ser_schema(
+            lambda marker: marker.value
+        )
+        members = list(cls.__members__.values())
 
-class BaseState(BaseModel):
+        if not members:
+            return core_schema.is_instance_schema(cls, serialization=serialization)
+
+        return core_schema.enum_schema(cls, members, serialization=serialization)
+
+
+# Global sequence numbers for change journal entries, and ids that identify
+#  states derived from one another through `model_copy`
+_JOURNAL_SEQUENCE = itertools.count(1)
+_LINEAGES = itertools.count(1)
+
+
+def _changed_paths(old: Any, new: Any) -> list[tuple]:
+    """
+    Returns the paths, relative to a field, that changed when the field's
+    value was replaced by `new`. An empty path means the whole value changed.
+    """
+    if new is old:
+        return []
 
-    @field_serializer("*", mode="wrap")
-    def serialize_enums(
-        self, value: Any, nxt: SerializerFunctionWrapHandler, _info: SerializationInfo
+    if (
+        isinstance(new, BaseState)
+        and isinstance(old, BaseState)
+        and new._lineage == old._lineage
     ):
-        if isinstance(value, BaseMarker):
-            return value.value
-        return nxt(value)
+        return [path for path, seq in new._journal.items() if old._journal.get(path) != seq]
+
+    # Removed keys can't be expressed as a patch, so those replace the dict
+    if isinstance(new, dict) and isinstance(old, dict) and old.keys() <= new.keys():
+        return [
+            (key, *path)
+            for key in new
+            for path in (_changed_paths(old[key], new[key]) if key in old else [()])
+        ]
 
-    @field_validator("*", mode="before")
-    @classmethod
-    def validate_marker(
-        cls,
-        value: Any,
-        info: ValidationInfo,
-    ) -> BaseMarker:
-        # TODO: Can this be simplified?
-        if info.field_name:
-            annotation = cls.model_fields[info.field_name].annotation
-            if annotation:
-                origin = get_origin(annotation)
-                if (
-                    origin not in (Union, UnionType)
-                    and isclass(origin)
-                    and issubclass(origin, BaseMarker)
-                ):
-                    return annotation(value)
-        return value
+    return [] if new == old else [()]
+
+
+def _collapse(paths) -> list[tuple]:
+    # Drop paths that are already covered by one of their prefixes
+    collapsed = []
+    for path in sorted(paths, key=len):
+        if not any(path[: len(p)] == p for p in collapsed):
+            collapsed.append(path)
+    return collapsed
+
+
+def _is_excluded(state: "BaseState", path: tuple) -> bool:
+    # Whether the path goes through a field excluded from serialization
+    value = state
+    for key in path:
+        if isinstance(value, BaseModel):
+            field = type(value).model_fields.get(key)
+            if field is not None and field.exclude:
+                return True
+            value = getattr(value, key, None)
+        elif isinstance(value, dict):
+            value = value.get(key)
+        else:
+            break
+    return False
+
+
+def _prune(dumped: dict, include: dict) -> dict:
+    # Drop containers that ended up empty because everything that changed
+    #  inside them is excluded from serialization
+    for key, sub in include.items():
+        if isinstance(sub, dict) and isinstance(dumped.get(key), dict):
+            if not _prune(dumped[key], sub):
+                del dumped[key]
+    return dumped
+
+
+class BaseState(BaseModel):
+    # Change journal: the path of every field changed through `model_copy`
+    #  (which is what `Ref(...).set` and `update` use), mapped to the sequence
+    #  number of its latest change. Changes to nested states are recorded
+    #  under their full path.
+    _journal: dict[tuple, int] = PrivateAttr(default_factory=dict)
+    _lineage: int = PrivateAttr(default_factory=lambda: next(_LINEAGES))
+
+    def model_copy(self, *, update: dict[str, Any] | None = None, deep: bool = False):
+        copied = super().model_copy(update=update, deep=deep)
+        journal = dict(self._journal)
+
+        if update:
+            seq = None
+            for key, value in update.items():
+                for path in _changed_paths(getattr(self, key, None), value):
+                    seq = seq or next(_JOURNAL_SEQUENCE)
+                    journal[(key, *path)] = seq
+
+        copied._journal = journal
+        return copied
+
+    def __eq__(self, other: Any) -> bool:
+        # The journal is bookkeeping, not state, so leave it out of comparisons
+        if isinstance(other, BaseState) and type(other) is type(self):
+            return all(
+                self.__dict__.get(name) == other.__dict__.get(name)
+                for name in type(self).model_fields
+            ) and self.__pydantic_extra__ == other.__pydantic_extra__
+        return super().__eq__(other)
+
+    @property
+    def journal_seq(self) -> int:
+        """Sequence number of the most recent change to this state."""
+        return max(self._journal.values(), default=0)
+
+    def shares_lineage(self, other: "BaseState | None") -> bool:
+        """Whether `self` was derived from `other` (or vice versa) by copying."""
+        return isinstance(other, BaseState) and other._lineage == self._lineage
+
+    def changed_paths(self, since: int = 0) -> list[tuple]:
+        """Paths of the fields that changed after journal entry `since`."""
+        return _collapse(path for path, seq in self._journal.items() if seq > since)
+
+    def dump_changes(self, since: int = 0) -> dict:
+        """
+        Serializes only the fields that changed after journal entry `since`,
+        in the same shape as `as_dict`. Computed fields of every state along a
+        changed path are included, since they may depend on what changed.
+        Changes to fields excluded from serialization are left out.
+        """
+        include = {}
+        for path in self.changed_paths(since):
+            if _is_excluded(self, path):
+                continue
+
+            node, value = include, self
+            for depth, key in enumerate(path):
+                if isinstance(value, BaseState):
+                    for name in type(value).model_computed_fields:
+                        node.setdefault(name, True)
+
+                if depth == len(path) - 1:
+                    node[key] = True
+                    break
+
+                node = node.setdefault(key, {})
+                value = (
+                    value.get(key) if isinstance(value, dict) else getattr(value, key, None)
+                )
+
+        if not include:
+            return {}
+
+        return _prune(self.model_dump(include=include), include)
 
     def as_dict(self):
         return self.model_dump()
@@ -297,11 +446,15 @@ class BaseStoryState(BaseState):
 
     @classmethod
     def patch_union_type(cls):
+        if _union_is_patched(cls):
+            return
+
         StageStateUnionFactory = lambda: Annotated[
             Union[tuple(STAGE_REGISTRY.values())], Field(discriminator="type")
         ]
         cls.__annotations__["stage_states"] = dict[str, StageStateUnionFactory()]
         cls.model_rebuild()
+        _mark_union_patched(cls)
 
     @field_validator("stage_states", mode="before")
     @classmethod
@@ -333,11 +486,15 @@ class BaseAppState(BaseState):
 
     @classmethod
     def patch_union_type(cls):
+        if _union_is_patched(cls):
+            return
+
         StoryStateUnionFactory = lambda: Annotated[
             Union[tuple(STORY_REGISTRY.values())], Field(discriminator="type")
         ]
         cls.__annotations__["story_states"] = StoryStateUnionFactory()
         cls.model_rebuild()
+        _mark_union_patched(cls)
 
     @field_validator("story_state", mode="before")
     @classmethod
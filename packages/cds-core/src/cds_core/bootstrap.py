@@ -0,0 +1,137 @@
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from threading import Lock
+from typing import Callable, Iterator
+
+from .logger import setup_logger
+
+logger = setup_logger("BOOTSTRAP")
+
+BOOTSTRAP_MAX_CONCURRENCY = int(os.getenv("CDS_BOOTSTRAP_MAX_CONCURRENCY", "32"))
+BOOTSTRAP_HISTORY = int(os.getenv("CDS_BOOTSTRAP_HISTORY", "500"))
+
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=BOOTSTRAP_MAX_CONCURRENCY, thread_name_prefix="cds-bootstrap"
+)
+
+
+class Bootstrap:
+    """
+    The start-up pipeline of a single session.
+
+    Independent requests are started with `fetch`, and run concurrently on a
+    process-wide thread pool. Fetches must not read or write reactive state,
+    as they run outside the session's kernel context. Their results are
+    applied to the state in the session's own thread, using `result` or
+    `as_completed`, inside `phase` blocks.
+
+    The duration of every fetch (`fetch:<name>`) and phase is recorded in
+    `timings`, in milliseconds, and `finish` adds the time-to-interactive
+    (`total`) and reports the breakdown to `BOOTSTRAP_STATS`.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.timings: dict[str, float] = {}
+        self._started = time.perf_counter()
+        self._futures: dict[str, Future] = {}
+        self._finished = False
+
+    def fetch(self, name: str, fn: Callable, *args, **kwargs) -> Future:
+        def _timed():
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.timings[f"fetch:{name}"] = _elapsed_ms(start)
+
+        future = self._futures[name] = _EXECUTOR.submit(_timed)
+        return future
+
+    def result(self, name: str):
+        """Waits for, and returns the result of, the fetch called `name`."""
+        return self._futures[name].result()
+
+    def as_completed(self, *names: str) -> Iterator[tuple[str, object]]:
+        """Yields `(name, result)` for the given fetches as each one finishes."""
+        names_by_future = {self._futures[name]: name for name in names}
+
+        for future in as_completed(names_by_future):
+            yield names_by_future[future], future.result()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = _elapsed_ms(start)
+
+    def finish(self) -> dict[str, float]:
+        if not self._finished:
+            self._finished = True
+            self.timings["total"] = _elapsed_ms(self._started)
+            BOOTSTRAP_STATS.record(self.timings)
+
+            logger.info(
+                "Bootstrapped `%s` in %.0f ms (%s).",
+                self.name,
+                self.timings["total"],
+                ", ".join(
+                    f"{phase}: {ms:.0f} ms"
+                    for phase, ms in self.timings.items()
+                    if phase != "total"
+                ),
+            )
+
+        return self.timings
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+class BootstrapStats:
+    """
+    Process-wide record of the timing breakdowns of the most recent
+    `history` session start-ups.
+    """
+
+    def __init__(self, history: int = BOOTSTRAP_HISTORY):
+        self._timings: deque[dict[str, float]] = deque(maxlen=history)
+        self._lock = Lock()
+
+    def record(self, timings: dict[str, float]):
+        with self._lock:
+            self._timings.append(dict(timings))
+
+    @property
+    def stats(self) -> dict:
+        """Median, 95th percentile and maximum duration (ms) of every phase."""
+        with self._lock:
+            by_phase: dict[str, list[float]] = {}
+            for timings in self._timings:
+                for phase, ms in timings.items():
+                    by_phase.setdefault(phase, []).append(ms)
+
+        return {
+            phase: {
+                "count": len(values),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "max": max(values),
+            }
+            for phase, values in by_phase.items()
+        }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(math.ceil(len(ordered) * q / 100) - 1, 0)]
+
+
+BOOTSTRAP_STATS = BootstrapStats()
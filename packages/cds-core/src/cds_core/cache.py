@@ -0,0 +1,189 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Hashable
+
+from .logger import setup_logger
+
+logger = setup_logger("CACHE")
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    A thread-safe, process-wide cache whose entries expire `ttl` seconds
+    after being stored. Once `max_size` entries are held, the least recently
+    used entry is evicted.
+
+    Keys are expected to be tuples whose leading items identify a scope
+    (e.g. ``(story_id, class_id, ...)``) so that `invalidate` can drop every
+    entry belonging to that scope at once.
+    """
+
+    def __init__(self, name: str, max_size: int = 256, ttl: float = 60.0):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[key]
+
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+
+        return value
+
+    async def get_or_set_async(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        value = self.get(key, _MISSING)
+
+        if value is _MISSING:
+            value = await factory()
+            self.set(key, value)
+
+        return value
+
+    def invalidate(self, *scope: Hashable):
+        """
+        Drops every entry whose key starts with `scope`. With no arguments,
+        the whole cache is cleared.
+        """
+        with self._lock:
+            if not scope:
+                self._entries.clear()
+                return
+
+            n = len(scope)
+            stale = [
+                k for k in self._entries if isinstance(k, tuple) and k[:n] == scope
+            ]
+
+            for k in stale:
+                del self._entries[k]
+
+        if stale:
+            logger.debug(
+                "Invalidated %d `%s` entries for %s.", len(stale), self.name, scope
+            )
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+
+class SizedLRUCache:
+    """
+    A thread-safe, process-wide LRU cache bounded by the total size of its
+    values, as measured by `sizeof`, rather than by their number. Values
+    larger than `max_bytes` are never stored.
+    """
+
+    def __init__(
+        self, name: str, max_bytes: int, sizeof: Callable[[Any], int] = len
+    ):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries: OrderedDict[Hashable, tuple[int, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def __contains__(self, key: Hashable) -> bool:
+        # A peek, which doesn't count as a hit or miss
+        with self._lock:
+            return key in self._entries
+
+    def set(self, key: Hashable, value: Any):
+        size = self.sizeof(value)
+
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[0]
+
+            self._entries[key] = (size, value)
+            self.nbytes += size
+
+            while self.nbytes > self.max_bytes:
+                _, (evicted_size, _) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable | None = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.nbytes = 0
+            elif (entry := self._entries.pop(key, None)) is not None:
+                self.nbytes -= entry[0]
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "bytes": self.nbytes,
+            }
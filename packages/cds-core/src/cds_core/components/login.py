@@ -4,8 +4,11 @@ from solara.lab import Ref
 from solara_enterprise import auth
 from ..utils import get_session_id
 from solara import Reactive
+from ..assets import StaticAssets
 from ..base_states import BaseAppState
 
+LOGO = "cosmicds_logo_transparent_for_dark_backgrounds.png"
+
 
 def _save_to_cache(class_code: str, update_db: bool, debug_mode: bool):
     solara.cache.storage[f"cds-login-options-{get_session_id()}"] = {
@@ -22,6 +25,7 @@ def Login(
     class_code: Reactive[str],
     update_db: Reactive[bool],
     debug_mode: Reactive[bool],
+    assets: StaticAssets,
 ):
     router = solara.use_router()
 
@@ -40,7 +44,7 @@ def Login(
                     class_="d-flex align-center flex-column justify-center"
                 ):
                     solara.Image(
-                        f"{router.root_path}/static/public/cosmicds_logo_transparent_for_dark_backgrounds.png",
+                        assets.url(LOGO, router.root_path),
                         classes=["mt-12"],
                     )
                     solara.Text(
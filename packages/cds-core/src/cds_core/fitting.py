@@ -0,0 +1,77 @@
+from typing import NamedTuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+# 1 / H0, converted from Mpc s / km to Gyr
+GYR_PER_INVERSE_H0 = 977.7922216807891
+
+
+class HubbleFits(NamedTuple):
+    """
+    The fits of `hubble_fits`, one per group, in the order of `ids`. Groups
+    without a point to fit have a `h0` and `age` of `nan`.
+    """
+
+    ids: np.ndarray
+    count: np.ndarray
+    h0: np.ndarray
+    age: np.ndarray
+    h0_error: np.ndarray | None = None
+
+
+def fit_slopes(
+    groups: ArrayLike, x: ArrayLike, y: ArrayLike, uncertainty: bool = False
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray | None]:
+    """
+    Fits a line through the origin to the points of each group by least
+    squares, all groups at once. Points where `x` or `y` is missing (`None`
+    or `nan`) are left out.
+
+    Returns the sorted group ids, the number of points fit, the slopes and,
+    if `uncertainty`, the standard errors of the slopes (`nan` for groups of
+    fewer than two points).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ids, inverse = np.unique(np.asarray(groups), return_inverse=True)
+
+    valid = np.isfinite(x) & np.isfinite(y)
+    group, x, y = inverse[valid], x[valid], y[valid]
+
+    size = len(ids)
+    count = np.bincount(group, minlength=size)
+    sxx = np.bincount(group, weights=x * x, minlength=size)
+    sxy = np.bincount(group, weights=x * y, minlength=size)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+
+        error = None
+        if uncertainty:
+            syy = np.bincount(group, weights=y * y, minlength=size)
+            residuals = np.maximum(syy - slope * sxy, 0)
+            error = np.where(
+                count > 1, np.sqrt(residuals / (count - 1) / sxx), np.nan
+            )
+
+    return ids, count, slope, error
+
+
+def hubble_fits(
+    groups: ArrayLike,
+    distances: ArrayLike,
+    velocities: ArrayLike,
+    uncertainty: bool = False,
+) -> HubbleFits:
+    """
+    Fits the Hubble constant (km / s / Mpc) of each group, e.g. of each
+    student or class, from distances (Mpc) and velocities (km / s), and the
+    corresponding age of the universe (Gyr). See `fit_slopes`.
+    """
+    ids, count, h0, h0_error = fit_slopes(groups, distances, velocities, uncertainty)
+
+    with np.errstate(divide="ignore"):
+        age = GYR_PER_INVERSE_H0 / h0
+
+    return HubbleFits(ids, count, h0, age, h0_error)
@@ -0,0 +1,111 @@
+import hashlib
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .logger import setup_logger
+
+logger = setup_logger("IDENTITY")
+
+IDENTITY_CACHE_MAX_SESSIONS = int(os.getenv("CDS_IDENTITY_CACHE_SIZE", "4096"))
+
+
+class UserIdentity(BaseModel):
+    """
+    Everything we know about the authenticated user of a session. The
+    remote flags start out unresolved (`None`) and are filled in the first
+    time they are requested from the API.
+    """
+
+    user_ref: str
+    hashed_user: str
+    is_educator: Optional[bool] = None
+    user_exists: Optional[bool] = None
+    student_id: Optional[int] = None
+
+
+def hash_user_ref(user_ref: str) -> str:
+    return hashlib.sha1(
+        (user_ref + os.environ["SOLARA_SESSION_SECRET_KEY"]).encode()
+    ).hexdigest()
+
+
+def session_key(user_ref: str) -> str:
+    """
+    Returns the key identifying the current session. Outside a solara kernel
+    context (e.g. in scripts) the user reference itself is used instead.
+    """
+    try:
+        from .utils import get_session_id
+
+        return get_session_id()
+    except Exception:
+        return user_ref
+
+
+class IdentityCache:
+    """
+    Process-wide, per-session store of `UserIdentity` records. A record is
+    dropped whenever the session's authenticated user changes, or when it is
+    explicitly invalidated on logout or user creation.
+    """
+
+    def __init__(self, max_sessions: int = IDENTITY_CACHE_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self.hits = 0
+        self.misses = 0
+        self._records: OrderedDict[str, UserIdentity] = OrderedDict()
+        self._lock = Lock()
+
+    def resolve(self, key: str, user_ref: str) -> UserIdentity:
+        with self._lock:
+            identity = self._records.get(key)
+
+            if identity is not None and identity.user_ref == user_ref:
+                self._records.move_to_end(key)
+                return identity
+
+            identity = UserIdentity(
+                user_ref=user_ref, hashed_user=hash_user_ref(user_ref)
+            )
+            self._records[key] = identity
+
+            if len(self._records) > self.max_sessions:
+                self._records.popitem(last=False)
+
+            return identity
+
+    def lookup(self, identity: UserIdentity, field: str) -> Optional[bool]:
+        value = getattr(identity, field)
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return value
+
+    def invalidate(self, key: Optional[str] = None):
+        with self._lock:
+            if key is None:
+                self._records.clear()
+            else:
+                self._records.pop(key, None)
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "sessions": len(self._records),
+            }
+
+
+IDENTITY_CACHE = IdentityCache()
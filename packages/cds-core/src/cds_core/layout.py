@@ -23,6 +23,8 @@ from .components.location_helper.location_helper import LocationHelper
 from .components.theme_toggle import ThemeToggle
 from .components.logout_dialog.logout_dialog import LogoutDialog
 from .base_states import BaseStoryState, BaseAppState
+from .bootstrap import Bootstrap
+from .identity import IDENTITY_CACHE
 from .remote import BaseAPI
 
 filterwarnings(action="ignore", category=UserWarning)
@@ -38,6 +40,7 @@ def BaseSetup(
     global_state: Reactive[BaseAppState],
     local_state: Reactive[BaseStoryState],
     force_demo: bool = False,
+    bootstrap: Optional[Bootstrap] = None,
 ):
     class_code = solara.use_reactive("")
     debug_mode = solara.use_reactive(force_demo)
@@ -54,7 +57,12 @@ def BaseSetup(
     def _initial_setup():
         educator_mode = False
 
+        # Without a pipeline from the story, the setup is timed on its own
+        setup_bootstrap = bootstrap or Bootstrap(local_state.value.story_id)
+
         if bool(auth.user.value):
+            remote_api.resolve_identity(setup_bootstrap)
+
             if remote_api.is_educator:
                 debug_mode.set(True)
                 educator_mode = True
@@ -101,7 +109,8 @@ def BaseSetup(
         if bool(auth.user.value):
             logger.debug("User is authenticated.")
             if remote_api.user_exists:
-                remote_api.load_user_info(local_state.value.story_id, global_state)
+                with setup_bootstrap.phase("user_info"):
+                    remote_api.load_user_info(local_state.value.story_id, global_state)
             elif bool(class_code.value):
                 remote_api.create_new_user(
                     local_state.value.title, class_code.value, global_state
@@ -127,7 +136,11 @@ def BaseSetup(
             )
             LocationHelper(url=root_url)
 
+        if bootstrap is None:
+            setup_bootstrap.finish()
+
         logger.info("Initial setup finished.")
+        logger.debug("Identity cache stats: %s", IDENTITY_CACHE.stats)
 
     solara.use_memo(_initial_setup, dependencies=[])
 
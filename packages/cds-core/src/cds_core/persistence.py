@@ -0,0 +1,175 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock, Thread
+from typing import Callable, Hashable
+
+from .logger import setup_logger
+
+logger = setup_logger("PERSISTENCE")
+
+PERSIST_INTERVAL = float(os.getenv("CDS_PERSIST_INTERVAL", "2"))
+PERSIST_MAX_CONCURRENCY = int(os.getenv("CDS_PERSIST_MAX_CONCURRENCY", "8"))
+
+
+@dataclass
+class _Entry:
+    flush: Callable[[], None]
+    due: float | None = None
+    lock: Lock = field(default_factory=Lock)
+
+
+class WriteBehindScheduler:
+    """
+    Process-wide, write-behind persistence for session state.
+
+    Sessions `register` a flush callback under a key and call `mark_dirty`
+    whenever their state changes. Repeated changes to the same key are
+    coalesced into a single flush, which runs `interval` seconds after the
+    key first became dirty, on a worker pool of at most `max_concurrency`
+    threads. Sessions that do not change cost nothing, and since each key is
+    scheduled from the moment it became dirty, writes spread out over time
+    rather than arriving in lockstep.
+
+    `unregister` (e.g. when a session closes) flushes any pending change
+    immediately, in the calling thread.
+    """
+
+    def __init__(
+        self,
+        interval: float = PERSIST_INTERVAL,
+        max_concurrency: int = PERSIST_MAX_CONCURRENCY,
+    ):
+        self.interval = interval
+        self.max_concurrency = max_concurrency
+        self.flushes = 0
+        self.coalesced = 0
+        self.failures = 0
+        self._entries: dict[Hashable, _Entry] = {}
+        self._lock = Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    def register(self, key: Hashable, flush: Callable[[], None]):
+        with self._lock:
+            self._entries[key] = _Entry(flush)
+
+    def unregister(self, key: Hashable, flush: bool = True):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+            if entry is None or entry.due is None:
+                return
+
+            entry.due = None
+
+        if flush:
+            self._flush(key, entry)
+
+    def mark_dirty(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return
+
+            if entry.due is not None:
+                self.coalesced += 1
+                return
+
+            entry.due = time.monotonic() + self.interval
+            self._ensure_started()
+
+        self._loop.call_soon_threadsafe(self._wake.set)
+
+    def flush(self, key: Hashable):
+        """Immediately flushes `key` in the calling thread, if it is dirty."""
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry.due is None:
+                return
+
+            entry.due = None
+
+        self._flush(key, entry)
+
+    def _flush(self, key: Hashable, entry: _Entry):
+        with entry.lock:
+            try:
+                entry.flush()
+            except Exception:
+                logger.exception("Failed to persist state for `%s`.", key)
+                succeeded = False
+            else:
+                succeeded = True
+
+        with self._lock:
+            if succeeded:
+                self.flushes += 1
+            else:
+                self.failures += 1
+
+    def _ensure_started(self):
+        if self._loop is not None:
+            return
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="cds-persist"
+        )
+        self._loop = asyncio.new_event_loop()
+        self._wake = asyncio.Event()
+        Thread(
+            target=self._loop.run_until_complete,
+            args=(self._run(),),
+            name="cds-persist-scheduler",
+            daemon=True,
+        ).start()
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            next_due = None
+
+            with self._lock:
+                due = []
+                for key, entry in self._entries.items():
+                    if entry.due is None:
+                        continue
+                    if entry.due <= now:
+                        entry.due = None
+                        due.append((key, entry))
+                    elif next_due is None or entry.due < next_due:
+                        next_due = entry.due
+
+                # Clear while holding the lock, so that a key marked dirty
+                #  from here on is guaranteed to wake us up again
+                self._wake.clear()
+
+            for key, entry in due:
+                self._loop.run_in_executor(self._executor, self._flush, key, entry)
+
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(),
+                    None if next_due is None else max(next_due - now, 0),
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._entries),
+                "pending": sum(e.due is not None for e in self._entries.values()),
+                "flushes": self.flushes,
+                "coalesced": self.coalesced,
+                "failures": self.failures,
+            }
+
+
+PERSISTENCE_SCHEDULER = WriteBehindScheduler()
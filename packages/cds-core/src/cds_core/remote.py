@@ -1,9 +1,17 @@
-import hashlib
+import asyncio
 import json
 import os
+from asyncio import AbstractEventLoop
+from concurrent.futures import Future
 from functools import cached_property
+from threading import Lock
+from typing import Awaitable, Callable
+from urllib.parse import urlsplit, urlunsplit
+from weakref import WeakKeyDictionary
 
+import httpx
 from requests import Session
+from requests.adapters import HTTPAdapter
 from typing import Optional
 from solara import Reactive
 from solara.lab import Ref
@@ -11,14 +19,162 @@ from solara_enterprise import auth
 
 from cds_core.app_state import Student
 from .base_states import BaseAppState, BaseStoryState, BaseStageState
+from .bootstrap import Bootstrap
+from .identity import IDENTITY_CACHE, UserIdentity, session_key
 from .logger import setup_logger
-from .utils import CDSJSONEncoder
+from .utils import API_URL, CDSJSONEncoder
 
 logger = setup_logger("API")
 
+# Connection pool and timeout settings shared by the blocking and async clients
+API_MAX_CONNECTIONS = int(os.getenv("CDS_API_MAX_CONNECTIONS", "100"))
+API_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("CDS_API_MAX_KEEPALIVE", "20"))
+API_KEEPALIVE_EXPIRY = float(os.getenv("CDS_API_KEEPALIVE_EXPIRY", "30"))
+API_CONNECT_TIMEOUT = float(os.getenv("CDS_API_CONNECT_TIMEOUT", "5"))
+API_TIMEOUT = float(os.getenv("CDS_API_TIMEOUT", "30"))
+
+
+def coalesce_key(url: str, student_id: int | str | None = None) -> str:
+    """
+    Returns the coalescing key for a GET request: the URL with the first path
+    segment matching `student_id` removed, so that requests for the same
+    class-level resource made on behalf of different students share a key.
+    """
+    if student_id is None:
+        return url
+
+    parts = urlsplit(url)
+    segments = parts.path.split("/")
+
+    if (student_segment := str(student_id)) in segments:
+        segments.remove(student_segment)
+
+    return urlunsplit(parts._replace(path="/".join(segments)))
+
+
+# Result handed to followers whose leader was interrupted (e.g. its task was
+#  cancelled), telling them to make the request themselves
+_RETRY = object()
+
+
+class _InFlight:
+    def __init__(self, loop: AbstractEventLoop | None):
+        self.future = Future()
+        self.loop = loop
+
+
+class RequestCoalescer:
+    """
+    Process-wide singleflight for idempotent GET requests. While a request
+    for a given key is in flight, any identical request (from any session,
+    blocking or async) waits for and shares the same upstream response
+    instead of issuing its own.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.coalesced = 0
+        self._in_flight: dict[str, _InFlight] = {}
+        self._lock = Lock()
+
+    def _join(
+        self, key: str, loop: AbstractEventLoop | None
+    ) -> tuple[_InFlight, bool]:
+        with self._lock:
+            self.requests += 1
+            entry = self._in_flight.get(key)
+
+            if entry is not None:
+                self.coalesced += 1
+                return entry, False
+
+            entry = self._in_flight[key] = _InFlight(loop)
+            return entry, True
+
+    def _finish(self, key: str, entry: _InFlight):
+        with self._lock:
+            if self._in_flight.get(key) is entry:
+                del self._in_flight[key]
+
+    def _abandon(self, key: str, entry: _InFlight):
+        # Release the entry before waking the followers, so that they don't
+        #  rejoin it when they retry
+        self._finish(key, entry)
+        entry.future.set_result(_RETRY)
+
+    def get(self, key: str, fetch: Callable[[], object]):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        entry, leader = self._join(key, None)
+
+        if not leader:
+            # Blocking on a request owned by this thread's own event loop
+            #  would deadlock, so fall back to a request of our own.
+            if entry.loop is None or entry.loop is not loop:
+                result = entry.future.result()
+                return self.get(key, fetch) if result is _RETRY else result
+
+            with self._lock:
+                self.coalesced -= 1
+            return fetch()
+
+        try:
+            result = fetch()
+        except Exception as e:
+            entry.future.set_exception(e)
+            raise
+        except BaseException:
+            self._abandon(key, entry)
+            raise
+        else:
+            entry.future.set_result(result)
+        finally:
+            self._finish(key, entry)
+
+        return result
+
+    async def get_async(self, key: str, fetch: Callable[[], Awaitable[object]]):
+        entry, leader = self._join(key, asyncio.get_running_loop())
+
+        if not leader:
+            # Shielded, so that cancelling a follower doesn't cancel the
+            #  shared request
+            result = await asyncio.shield(asyncio.wrap_future(entry.future))
+            return await self.get_async(key, fetch) if result is _RETRY else result
+
+        try:
+            result = await fetch()
+        except Exception as e:
+            entry.future.set_exception(e)
+            raise
+        except BaseException:
+            self._abandon(key, entry)
+            raise
+        else:
+            entry.future.set_result(result)
+        finally:
+            self._finish(key, entry)
+
+        return result
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight),
+            }
+
+
+REQUEST_COALESCER = RequestCoalescer()
+
 
 class BaseAPI:
-    API_URL = "https://api.cosmicds.cfa.harvard.edu"
+    API_URL = API_URL
 
     @cached_property
     def request_session(self):
@@ -29,37 +185,202 @@ class BaseAPI:
         """
         session = Session()
         session.headers.update({"Authorization": os.getenv("CDS_API_KEY")})
+
+        # `pool_connections` is the number of hosts pooled, not of connections
+        adapter = HTTPAdapter(pool_maxsize=API_MAX_CONNECTIONS)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
         return session
 
+    @cached_property
+    def _async_sessions(self) -> WeakKeyDictionary[AbstractEventLoop, httpx.AsyncClient]:
+        return WeakKeyDictionary()
+
+    @property
+    def async_session(self) -> httpx.AsyncClient:
+        """
+        Returns a pooled `httpx.AsyncClient` with the same authorization
+        parameters as `request_session`. Clients are bound to the event loop
+        they were created on, so one client is kept per running loop.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_sessions.get(loop)
+
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                headers={"Authorization": os.getenv("CDS_API_KEY", "")},
+                limits=httpx.Limits(
+                    max_connections=API_MAX_CONNECTIONS,
+                    max_keepalive_connections=API_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=API_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(API_TIMEOUT, connect=API_CONNECT_TIMEOUT),
+            )
+            self._async_sessions[loop] = client
+
+        return client
+
+    def coalesced_get(self, url: str, student_id: int | None = None):
+        """
+        Issues a GET through the process-wide `REQUEST_COALESCER`, sharing the
+        response with identical in-flight requests. `student_id` names the
+        per-student path segment to ignore when comparing requests.
+        """
+        return REQUEST_COALESCER.get(
+            coalesce_key(url, student_id), lambda: self.request_session.get(url)
+        )
+
+    async def coalesced_get_async(self, url: str, student_id: int | None = None):
+        return await REQUEST_COALESCER.get_async(
+            coalesce_key(url, student_id), lambda: self.async_session.get(url)
+        )
+
+    async def aclose(self):
+        """Close the async client bound to the running event loop, if any."""
+        client = self._async_sessions.pop(asyncio.get_running_loop(), None)
+
+        if client is not None:
+            await client.aclose()
+
+    @property
+    def identity(self) -> UserIdentity | None:
+        """
+        Returns the cached identity record for the current session, or `None`
+        if the user is not (fully) authenticated.
+        """
+        if auth.user.value is None:
+            return None
+
+        userinfo = auth.user.value.get("userinfo")
+
+        if not userinfo or not ("cds/email" in userinfo or "cds/name" in userinfo):
+            return None
+
+        user_ref = userinfo.get("cds/email", userinfo["cds/name"])
+
+        return IDENTITY_CACHE.resolve(session_key(user_ref), user_ref)
+
     @property
     def hashed_user(self):
         if auth.user.value is None:
             logger.error("Failed to create hash: user not authenticated.")
             return "User not authenticated"
 
-        userinfo = auth.user.value.get("userinfo")
+        identity = self.identity
 
-        if not ("cds/email" in userinfo or "cds/name" in userinfo):
+        if identity is None:
             logger.error("Failed to create hash: not authentication information.")
             return
 
-        user_ref = userinfo.get("cds/email", userinfo["cds/name"])
-
-        hashed = hashlib.sha1(
-            (user_ref + os.environ["SOLARA_SESSION_SECRET_KEY"]).encode()
-        ).hexdigest()
-
-        return hashed
+        return identity.hashed_user
 
     @property
     def user_exists(self):
+        identity = self.identity
+
+        if identity is not None and IDENTITY_CACHE.lookup(identity, "user_exists"):
+            return identity.user_exists
+
         r = self.request_session.get(f"{self.API_URL}/student/{self.hashed_user}")
-        return r.json()["student"] is not None
+        return self._store_student(identity, r.json()["student"])
 
     @property
     def is_educator(self):
+        identity = self.identity
+
+        if (
+            identity is not None
+            and IDENTITY_CACHE.lookup(identity, "is_educator") is not None
+        ):
+            return identity.is_educator
+
         r = self.request_session.get(f"{self.API_URL}/educators/{self.hashed_user}")
-        return r.json()["educator"] is not None
+        return self._store_identity_flag(
+            identity, "is_educator", r.json()["educator"] is not None
+        )
+
+    async def user_exists_async(self) -> bool:
+        identity = self.identity
+
+        if identity is not None and IDENTITY_CACHE.lookup(identity, "user_exists"):
+            return identity.user_exists
+
+        r = await self.async_session.get(f"{self.API_URL}/student/{self.hashed_user}")
+        return self._store_student(identity, r.json()["student"])
+
+    async def is_educator_async(self) -> bool:
+        identity = self.identity
+
+        if (
+            identity is not None
+            and IDENTITY_CACHE.lookup(identity, "is_educator") is not None
+        ):
+            return identity.is_educator
+
+        r = await self.async_session.get(
+            f"{self.API_URL}/educators/{self.hashed_user}"
+        )
+        return self._store_identity_flag(
+            identity, "is_educator", r.json()["educator"] is not None
+        )
+
+    @staticmethod
+    def _store_identity_flag(
+        identity: UserIdentity | None, field: str, value: bool
+    ) -> bool:
+        # Only a positive `user_exists` is stored: a user that does not exist
+        #  yet may be created by another request at any time.
+        if identity is not None and (value or field != "user_exists"):
+            setattr(identity, field, value)
+        return value
+
+    @classmethod
+    def _store_student(
+        cls, identity: UserIdentity | None, student_json: dict | None
+    ) -> bool:
+        if identity is not None and student_json is not None:
+            identity.student_id = student_json["id"]
+        return cls._store_identity_flag(
+            identity, "user_exists", student_json is not None
+        )
+
+    def resolve_identity(self, bootstrap: Bootstrap):
+        """
+        Resolves whether the current user is an educator and whether they
+        exist as a student concurrently, so that `is_educator` and
+        `user_exists` are answered from the identity cache afterwards.
+        """
+        identity = self.identity
+
+        if identity is None:
+            return
+
+        fetches = {}
+        if IDENTITY_CACHE.lookup(identity, "is_educator") is None:
+            fetches["educator"] = f"{self.API_URL}/educators/{identity.hashed_user}"
+        if not IDENTITY_CACHE.lookup(identity, "user_exists"):
+            fetches["student"] = f"{self.API_URL}/student/{identity.hashed_user}"
+
+        session = self.request_session
+        for name, url in fetches.items():
+            bootstrap.fetch(name, session.get, url)
+
+        with bootstrap.phase("identity"):
+            for name, r in bootstrap.as_completed(*fetches):
+                if name == "educator":
+                    self._store_identity_flag(
+                        identity, "is_educator", r.json()["educator"] is not None
+                    )
+                else:
+                    self._store_student(identity, r.json()["student"])
+
+    @staticmethod
+    def invalidate_identity():
+        """Drops the cached identity record of the current session."""
+        userinfo = (auth.user.value or {}).get("userinfo") or {}
+        user_ref = userinfo.get("cds/email", userinfo.get("cds/name", ""))
+        IDENTITY_CACHE.invalidate(session_key(user_ref))
 
     def update_class_size(self, state: Reactive[BaseAppState]):
         class_id = state.value.classroom.class_info["id"]
@@ -68,11 +389,18 @@ class BaseAPI:
         ).json()
         Ref(state.fields.classroom.size).set(size_json["size"])
 
+    async def update_class_size_async(self, state: Reactive[BaseAppState]):
+        class_id = state.value.classroom.class_info["id"]
+        r = await self.async_session.get(f"{self.API_URL}/classes/size/{class_id}")
+        Ref(state.fields.classroom.size).set(r.json()["size"])
+
     def load_user_info(self, story_name: str, state: Reactive[BaseAppState]):
-        student_json = self.request_session.get(
-            f"{self.API_URL}/student/{self.hashed_user}"
-        ).json()["student"]
-        sid = student_json["id"]
+        sid = self._cached_student_id()
+
+        if sid is None:
+            sid = self.request_session.get(
+                f"{self.API_URL}/student/{self.hashed_user}"
+            ).json()["student"]["id"]
 
         class_json = self.request_session.get(
             f"{self.API_URL}/class-for-student-story/{sid}/{story_name}"
@@ -84,6 +412,32 @@ class BaseAPI:
 
         logger.info("Loaded user info for user `%s`.", state.value.student.id)
 
+    async def load_user_info_async(
+        self, story_name: str, state: Reactive[BaseAppState]
+    ):
+        sid = self._cached_student_id()
+
+        if sid is None:
+            r = await self.async_session.get(
+                f"{self.API_URL}/student/{self.hashed_user}"
+            )
+            sid = r.json()["student"]["id"]
+
+        r = await self.async_session.get(
+            f"{self.API_URL}/class-for-student-story/{sid}/{story_name}"
+        )
+        class_json = r.json()
+
+        Ref(state.fields.student.id).set(sid)
+        Ref(state.fields.classroom.class_info).set(class_json["class"])
+        Ref(state.fields.classroom.size).set(class_json["size"])
+
+        logger.info("Loaded user info for user `%s`.", state.value.student.id)
+
+    def _cached_student_id(self) -> int | None:
+        identity = self.identity
+        return None if identity is None else identity.student_id
+
     def create_new_user(
         self, story_name: str, class_code: str, state: Reactive[BaseAppState]
     ):
@@ -119,8 +473,49 @@ class BaseAPI:
             class_code,
         )
 
+        self.invalidate_identity()
+
         self.load_user_info(story_name, state)
 
+    async def create_new_user_async(
+        self, story_name: str, class_code: str, state: Reactive[BaseAppState]
+    ):
+        r = await self.async_session.get(f"{self.API_URL}/student/{self.hashed_user}")
+        student = r.json()["student"]
+
+        if student is not None:
+            logger.error(
+                "Failed to create user `%s`: user already exists.", self.hashed_user
+            )
+            return
+
+        r = await self.async_session.post(
+            f"{self.API_URL}/students/create",
+            json={
+                "username": self.hashed_user,
+                "password": "",
+                "institution": "",
+                "email": f"{self.hashed_user}",
+                "age": 0,
+                "gender": "undefined",
+                "classroom_code": class_code,
+            },
+        )
+
+        if r.status_code != 201:
+            logger.error("Failed to create new user.")
+            return
+
+        logger.info(
+            "Created new user `%s` with class code '%s'.",
+            self.hashed_user,
+            class_code,
+        )
+
+        self.invalidate_identity()
+
+        await self.load_user_info_async(story_name, state)
+
     def put_stage_state(
         self,
         global_state: Reactive[BaseAppState],
@@ -129,6 +524,14 @@ class BaseAPI:
     ):
         raise NotImplementedError()
 
+    async def put_stage_state_async(
+        self,
+        global_state: Reactive[BaseAppState],
+        local_state: Reactive[BaseStoryState],
+        component_state: Reactive[BaseStageState],
+    ):
+        raise NotImplementedError()
+
     def get_stage_state(
         self,
         global_state: Reactive[BaseAppState],
@@ -149,6 +552,38 @@ class BaseAPI:
             .get("state", None)
         )
 
+        return self._set_stage_state(
+            stage_json, global_state, local_state, component_state
+        )
+
+    async def get_stage_state_async(
+        self,
+        global_state: Reactive[BaseAppState],
+        local_state: Reactive[BaseStoryState],
+        component_state: Reactive[BaseStageState],
+    ) -> BaseStageState | None:
+
+        if not global_state.value.update_db or await self.is_educator_async():
+            logger.info("Skipping retrieval of Component state.")
+            return component_state.value
+
+        r = await self.async_session.get(
+            f"{self.API_URL}/stage-state/{global_state.value.student.id}/"
+            f"{local_state.value.story_id}/{component_state.value.stage_id}"
+        )
+        stage_json = r.json().get("state", None)
+
+        return self._set_stage_state(
+            stage_json, global_state, local_state, component_state
+        )
+
+    @staticmethod
+    def _set_stage_state(
+        stage_json: dict | None,
+        global_state: Reactive[BaseAppState],
+        local_state: Reactive[BaseStoryState],
+        component_state: Reactive[BaseStageState],
+    ) -> BaseStageState | None:
         if stage_json is None:
             logger.error(
                 "Failed to retrieve stage state for story `%s` for user `%s`.",
@@ -178,6 +613,32 @@ class BaseAPI:
             f"{local_state.value.story_id}/{component_state.value.stage_id}"
         )
 
+        self._check_stage_state_deleted(r, global_state, local_state, component_state)
+
+    async def delete_stage_state_async(
+        self,
+        global_state: Reactive[BaseAppState],
+        local_state: Reactive[BaseStoryState],
+        component_state: Reactive[BaseStageState],
+    ):
+        if not global_state.value.update_db or await self.is_educator_async():
+            logger.info("Skipping deletion of stage state.")
+            return
+
+        r = await self.async_session.delete(
+            f"{self.API_URL}/stage-state/{global_state.value.student.id}/"
+            f"{local_state.value.story_id}/{component_state.value.stage_id}"
+        )
+
+        self._check_stage_state_deleted(r, global_state, local_state, component_state)
+
+    @staticmethod
+    def _check_stage_state_deleted(
+        r,
+        global_state: Reactive[BaseAppState],
+        local_state: Reactive[BaseStoryState],
+        component_state: Reactive[BaseStageState],
+    ):
         if r.status_code != 200:
             logger.error(
                 "Stage state for stage `%s`, story `%s` user `%s` did not exist in database.",
@@ -222,16 +683,59 @@ class BaseAPI:
 
         else:
             logger.info("Skipping retrieval of state.")
-            story_json = {
-                "app": global_state.value.__class__(
-                    student=global_state.value.student,
-                    show_team_interface=global_state.value.show_team_interface,
-                    classroom=global_state.value.classroom,
-                    educator=global_state.value.educator,
-                    update_db=global_state.value.update_db,
-                ).model_dump(),
-            }
+            story_json = self._default_story_json(global_state)
 
+        return self._set_app_story_states(
+            story_json, student_id, global_state, local_state
+        )
+
+    async def get_app_story_states_async(
+        self,
+        global_state: Reactive[BaseAppState],
+        local_state: Reactive[BaseStoryState],
+    ) -> BaseStoryState | None:
+        student_id = global_state.value.student.id
+        if global_state.value.update_db and not await self.is_educator_async():
+            r = await self.async_session.get(
+                f"{self.API_URL}/story-state/{global_state.value.student.id}/"
+                f"{local_state.value.story_id}"
+            )
+            story_json = r.json().get("state", None)
+
+            if story_json is None:
+                logger.error(
+                    f"Failed to retrieve state for story {local_state.value.story_id} "
+                    f"for user {global_state.value.student.id}."
+                )
+                return None
+
+        else:
+            logger.info("Skipping retrieval of state.")
+            story_json = self._default_story_json(global_state)
+
+        return self._set_app_story_states(
+            story_json, student_id, global_state, local_state
+        )
+
+    @staticmethod
+    def _default_story_json(global_state: Reactive[BaseAppState]) -> dict:
+        return {
+            "app": global_state.value.__class__(
+                student=global_state.value.student,
+                show_team_interface=global_state.value.show_team_interface,
+                classroom=global_state.value.classroom,
+                educator=global_state.value.educator,
+                update_db=global_state.value.update_db,
+            ).model_dump(),
+        }
+
+    @staticmethod
+    def _set_app_story_states(
+        story_json: dict,
+        student_id: int,
+        global_state: Reactive[BaseAppState],
+        local_state: Reactive[BaseStoryState],
+    ) -> BaseStoryState | None:
         global_state_json = story_json.get("app", {})
         # local_state_json = story_json.get("story", {})
         # global_state_json["story_state"] = local_state_json
@@ -255,6 +759,13 @@ class BaseAPI:
     ):
         raise NotImplementedError()
 
+    async def put_story_state_async(
+        self,
+        global_state: Reactive[BaseAppState],
+        local_state: Reactive[BaseStoryState],
+    ):
+        raise NotImplementedError()
+
     def patch_story_state(
         self,
         patch: dict,
@@ -286,6 +797,33 @@ class BaseAPI:
 
         return True
 
+    async def patch_story_state_async(
+        self,
+        patch: dict,
+        global_state: Reactive[BaseAppState],
+        local_state: Reactive[BaseStoryState],
+    ):
+        if not global_state.value.update_db or await self.is_educator_async():
+            logger.info("Skipping DB write")
+            return False
+
+        logger.info("Serializing state into DB.")
+
+        state_json = json.dumps({"app": patch}, cls=CDSJSONEncoder)
+
+        r = await self.async_session.patch(
+            f"{self.API_URL}/story-state/{global_state.value.student.id}/{local_state.value.story_id}",
+            headers={"Content-Type": "application/json"},
+            content=state_json,
+        )
+
+        if r.status_code != 200:
+            logger.error("Failed to write story state to database.")
+            logger.error(r.text)
+            return False
+
+        return True
+
     def ignore_student_for_story(
         self,
         story_name: str,
@@ -307,8 +845,30 @@ class BaseAPI:
 
         logger.info(f"Set student {stu_id}'s ignored status to {ignore} for story {story_name}")
 
+    async def ignore_student_for_story_async(
+        self,
+        story_name: str,
+        student_id: Optional[int] = None,
+        ignore: bool = True,
+    ):
+        stu_id = student_id or self.hashed_user
+
+        r = await self.async_session.put(
+            f"{self.API_URL}/students/ignore/{stu_id}/{story_name}",
+            json={
+                "ignore": ignore,
+            },
+        )
+
+        if r.status_code != 200:
+            logger.error(f"Failed to update ignored status for student {stu_id} for story {story_name}")
+            return
+
+        logger.info(f"Set student {stu_id}'s ignored status to {ignore} for story {story_name}")
+
     @staticmethod
     def clear_user(state: Reactive[BaseAppState]):
+        BaseAPI.invalidate_identity()
         Ref(state.fields.student.id).set(0)
         Ref(state.fields.classroom.class_info).set({})
         Ref(state.fields.classroom.size).set(0)
@@ -42,8 +42,9 @@ __all__ = [
     "debounce",
 ]
 
-# The URL for the CosmicDS API
-API_URL = "https://api.cosmicds.cfa.harvard.edu"
+# The URL for the CosmicDS API. Point `CDS_API_URL` at a stand-in server
+#  (see `cds-app api-server`) to run without touching production.
+API_URL = os.getenv("CDS_API_URL", "https://api.cosmicds.cfa.harvard.edu").rstrip("/")
 
 CDS_IMAGE_BASE_URL = (
     "https://cosmicds.github.io/cds-website/cosmicds_images/mean_median_mode"
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+from cds_core import cache
+from cds_core.cache import SizedLRUCache, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_invalidate_drops_only_the_scope():
+    c = TTLCache("test")
+    c.set(("hubbles_law", 1, "measurements"), "class 1")
+    c.set(("hubbles_law", 1, "all_data"), "class 1 all")
+    c.set(("hubbles_law", 2, "measurements"), "class 2")
+    c.set(("hubbles_law", None, "all_data"), "story-wide")
+    c.set(("other_story", 1, "measurements"), "other story")
+    c.set("not a tuple", "kept")
+
+    c.invalidate("hubbles_law", 1)
+
+    assert c.get(("hubbles_law", 1, "measurements")) is None
+    assert c.get(("hubbles_law", 1, "all_data")) is None
+    assert c.get(("hubbles_law", 2, "measurements")) == "class 2"
+    assert c.get(("hubbles_law", None, "all_data")) == "story-wide"
+    assert c.get(("other_story", 1, "measurements")) == "other story"
+    assert c.get("not a tuple") == "kept"
+
+
+def test_invalidate_full_key_and_everything():
+    c = TTLCache("test")
+    c.set(("hubbles_law", None, "all_data"), 1)
+    c.set(("hubbles_law", None, "all_data_columns"), 2)
+
+    c.invalidate("hubbles_law", None, "all_data")
+    assert c.get(("hubbles_law", None, "all_data")) is None
+    assert c.get(("hubbles_law", None, "all_data_columns")) == 2
+
+    c.invalidate()
+    assert c.stats["size"] == 0
+
+
+def test_entries_expire_after_ttl(clock):
+    c = TTLCache("test", ttl=60)
+    c.set("key", "value")
+
+    clock[0] += 59
+    assert c.get("key") == "value"
+
+    clock[0] += 2
+    assert c.get("key", "missing") == "missing"
+    assert c.stats["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    c = TTLCache("test", max_size=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")
+    c.set("c", 3)
+
+    assert c.get("b") is None
+    assert c.get("a") == 1
+    assert c.get("c") == 3
+    assert c.stats["evictions"] == 1
+
+
+def test_get_or_set_only_calls_factory_on_a_miss():
+    c = TTLCache("test")
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return len(calls)
+
+    assert c.get_or_set("key", factory) == 1
+    assert c.get_or_set("key", factory) == 1
+    assert calls == [1]
+    assert c.stats["hits"] == 1 and c.stats["misses"] == 1
+
+
+def test_get_or_set_async():
+    c = TTLCache("test")
+
+    async def factory():
+        return "fetched"
+
+    assert asyncio.run(c.get_or_set_async("key", factory)) == "fetched"
+    assert c.get("key") == "fetched"
+
+
+def test_falsy_values_are_cached():
+    c = TTLCache("test")
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return []
+
+    c.get_or_set("key", factory)
+    c.get_or_set("key", factory)
+    assert calls == [1]
+
+
+def test_sized_cache_evicts_by_total_size():
+    c = SizedLRUCache("test", max_bytes=10)
+    c.set("a", b"1234")
+    c.set("b", b"1234")
+    c.get("a")
+    c.set("c", b"1234")
+
+    assert "b" not in c
+    assert c.get("a") == b"1234"
+    assert c.get("c") == b"1234"
+    assert c.stats["bytes"] == 8
+    assert c.stats["evictions"] == 1
+
+
+def test_sized_cache_skips_values_larger_than_the_cache():
+    c = SizedLRUCache("test", max_bytes=4)
+    c.set("a", b"12")
+    c.set("big", b"12345")
+
+    assert "big" not in c
+    assert c.get("a") == b"12"
+
+
+def test_sized_cache_replacing_and_invalidating_track_size():
+    c = SizedLRUCache("test", max_bytes=10)
+    c.set("a", b"123456")
+    c.set("a", b"12")
+    assert c.stats["bytes"] == 2
+
+    c.set("b", b"123")
+    c.invalidate("a")
+    assert c.stats["bytes"] == 3
+
+    c.invalidate()
+    assert c.stats["bytes"] == 0 and c.stats["size"] == 0
+
+
+def test_sized_cache_contains_is_not_counted():
+    c = SizedLRUCache("test", max_bytes=10)
+    c.set("a", b"1")
+
+    assert "a" in c and "b" not in c
+    assert c.stats["hits"] == 0 and c.stats["misses"] == 0
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from cds_core.fitting import GYR_PER_INVERSE_H0, fit_slopes, hubble_fits
+
+
+def lstsq_slope(x, y) -> float:
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    return np.linalg.lstsq(x[:, None], y, rcond=None)[0][0]
+
+
+def test_slopes_match_least_squares():
+    rng = np.random.default_rng(0)
+    groups = rng.integers(0, 5, 200)
+    x = rng.uniform(10, 400, 200)
+    y = 70 * x + rng.normal(0, 500, 200)
+
+    ids, count, slope, _ = fit_slopes(groups, x, y)
+
+    assert ids.tolist() == [0, 1, 2, 3, 4]
+    for group, n, s in zip(ids, count, slope):
+        assert n == np.sum(groups == group)
+        assert s == pytest.approx(lstsq_slope(x[groups == group], y[groups == group]))
+
+
+def test_missing_values_are_left_out():
+    ids, count, slope, _ = fit_slopes(
+        ["a", "a", "a", "b"], [1.0, None, 2.0, np.nan], [10.0, 5.0, np.nan, 1.0]
+    )
+
+    assert ids.tolist() == ["a", "b"]
+    assert count.tolist() == [1, 0]
+    assert slope[0] == pytest.approx(10.0)
+    assert np.isnan(slope[1])
+
+
+def test_zero_distances_give_nan():
+    _, count, slope, _ = fit_slopes([1, 1], [0.0, 0.0], [5.0, 6.0])
+
+    assert count.tolist() == [2]
+    assert np.isnan(slope[0])
+
+
+def test_no_points():
+    ids, count, slope, error = fit_slopes([], [], [], uncertainty=True)
+
+    assert len(ids) == len(count) == len(slope) == len(error) == 0
+
+
+def test_uncertainty():
+    x = np.array([1.0, 2.0, 3.0, 4.0])
+    y = np.array([2.1, 3.9, 6.2, 7.8])
+    groups = [1, 1, 1, 1, 2]
+
+    _, _, slope, error = fit_slopes(groups, [*x, 1.0], [*y, 3.0], uncertainty=True)
+
+    residuals = y - slope[0] * x
+    expected = np.sqrt(residuals @ residuals / (len(x) - 1) / (x @ x))
+    assert error[0] == pytest.approx(expected)
+
+    # A single point has no spread to estimate an error from
+    assert np.isnan(error[1])
+    assert fit_slopes(groups, [*x, 1.0], [*y, 3.0])[3] is None
+
+
+def test_hubble_fits_age():
+    fits = hubble_fits([1, 1, 2, 3], [10.0, 20.0, 10.0, None], [700, 1400, 500, 1])
+
+    assert fits.h0[:2] == pytest.approx([70.0, 50.0])
+    np.testing.assert_allclose(fits.age[:2], GYR_PER_INVERSE_H0 / np.array([70, 50]))
+    assert fits.age[0] == pytest.approx(13.97, abs=0.01)
+    assert np.isnan(fits.h0[2]) and np.isnan(fits.age[2])
+    assert fits.h0_error is None
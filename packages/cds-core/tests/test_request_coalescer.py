@@ -0,0 +1,161 @@
+import asyncio
+import threading
+
+import pytest
+
+from cds_core.remote import RequestCoalescer, coalesce_key
+
+
+def test_coalesce_key_drops_student_segment():
+    url = "https://api/hubbles_law/class-measurements/1001/42"
+
+    assert coalesce_key(url, 1001) == "https://api/hubbles_law/class-measurements/42"
+    assert coalesce_key(url) == url
+
+
+def test_concurrent_requests_share_one_fetch():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"size": 5}
+
+    async def main():
+        return await asyncio.gather(
+            *(coalescer.get_async("key", fetch) for _ in range(5))
+        )
+
+    results = asyncio.run(main())
+
+    assert results == [{"size": 5}] * 5
+    assert len(calls) == 1
+    assert coalescer.stats == {"requests": 5, "coalesced": 4, "in_flight": 0}
+
+
+def test_leader_error_reaches_followers():
+    coalescer = RequestCoalescer()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def main():
+        return await asyncio.gather(
+            *(coalescer.get_async("key", fetch) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert coalescer.stats["in_flight"] == 0
+
+
+def test_cancelled_leader_makes_followers_retry():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def main():
+        leader = asyncio.create_task(coalescer.get_async("key", fetch))
+        await asyncio.sleep(0)
+        followers = [
+            asyncio.create_task(coalescer.get_async("key", fetch)) for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        return await asyncio.gather(*followers)
+
+    results = asyncio.run(main())
+
+    # The followers don't see the leader's cancellation: one of them makes
+    #  the request again, and the others share it
+    assert results == [2, 2, 2]
+    assert len(calls) == 2
+    assert coalescer.stats["in_flight"] == 0
+
+
+def test_cancelled_follower_leaves_request_running():
+    coalescer = RequestCoalescer()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        leader = asyncio.create_task(coalescer.get_async("key", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(coalescer.get_async("key", fetch))
+        await asyncio.sleep(0)
+
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+
+        return await leader
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_blocking_requests_from_threads_share_one_fetch():
+    coalescer = RequestCoalescer()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return "shared"
+
+    results = []
+
+    def request():
+        results.append(coalescer.get("key", fetch))
+
+    leader = threading.Thread(target=request)
+    leader.start()
+    started.wait(timeout=5)
+
+    followers = [threading.Thread(target=request) for _ in range(3)]
+    for follower in followers:
+        follower.start()
+
+    # Wait until every follower has joined the in-flight request
+    while coalescer.stats["requests"] < 4:
+        threading.Event().wait(0.001)
+
+    release.set()
+    for thread in (leader, *followers):
+        thread.join(timeout=5)
+
+    assert results == ["shared"] * 4
+    assert len(calls) == 1
+
+
+def test_blocking_request_on_leaders_loop_fetches_itself():
+    coalescer = RequestCoalescer()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "async"
+
+    async def main():
+        leader = asyncio.create_task(coalescer.get_async("key", fetch))
+        await asyncio.sleep(0)
+
+        # Waiting on the leader from its own loop would deadlock
+        result = coalescer.get("key", lambda: "blocking")
+        return result, await leader
+
+    assert asyncio.run(main()) == ("blocking", "async")
@@ -0,0 +1,146 @@
+import copy
+
+from pydantic import Field, computed_field
+from solara import Reactive
+from solara.toestand import Ref
+
+from cds_core.base_states import BaseState
+
+
+class Response(BaseState):
+    answer: str = ""
+    tries: int = 0
+
+
+class Stage(BaseState):
+    step: int = 0
+    responses: dict[str, Response] = {}
+    scratch: list[int] = Field(default_factory=list, exclude=True)
+
+    @computed_field
+    @property
+    def answered(self) -> int:
+        return len(self.responses)
+
+
+class Story(BaseState):
+    title: str = "story"
+    stages: dict[str, Stage] = Field(
+        default_factory=lambda: {"one": Stage(), "two": Stage()}
+    )
+    total: int = 0
+
+
+def _merge(target: dict, patch: dict) -> dict:
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = value
+    return target
+
+
+def _apply(state: Reactive, edit) -> tuple[dict, dict]:
+    """Applies `edit`, returning the dump before it and the changes it made."""
+    old, since = state.value.as_dict(), state.value.journal_seq
+    edit()
+    return old, state.value.dump_changes(since=since)
+
+
+def test_no_changes_dump_nothing():
+    story = Story()
+    assert story.dump_changes() == {}
+    assert story.journal_seq == 0
+
+
+def test_top_level_field():
+    state = Reactive(Story())
+    _, patch = _apply(state, lambda: Ref(state.fields.total).set(5))
+
+    assert patch == {"total": 5}
+
+
+def test_nested_field_includes_computed_fields_along_the_path():
+    state = Reactive(Story())
+    _, patch = _apply(state, lambda: Ref(state.fields.stages["one"].step).set(3))
+
+    assert patch == {"stages": {"one": {"step": 3, "answered": 0}}}
+
+
+def test_added_dict_key_sends_only_that_key():
+    state = Reactive(Story())
+    responses = Ref(state.fields.stages["two"].responses)
+    responses.set({"q1": Response(answer="a")})
+
+    _, patch = _apply(
+        state,
+        lambda: responses.set({**responses.value, "q2": Response(answer="b", tries=1)}),
+    )
+
+    assert patch == {
+        "stages": {
+            "two": {"responses": {"q2": {"answer": "b", "tries": 1}}, "answered": 2}
+        }
+    }
+
+
+def test_removed_dict_key_replaces_the_dict():
+    state = Reactive(Story())
+    responses = Ref(state.fields.stages["one"].responses)
+    responses.set({"q1": Response(), "q2": Response()})
+
+    _, patch = _apply(state, lambda: responses.set({"q2": Response()}))
+
+    assert patch["stages"]["one"]["responses"] == {"q2": {"answer": "", "tries": 0}}
+
+
+def test_excluded_field_dumps_nothing():
+    state = Reactive(Story())
+    _, patch = _apply(state, lambda: Ref(state.fields.stages["one"].scratch).set([1]))
+
+    assert patch == {}
+
+
+def test_setting_an_equal_value_records_nothing():
+    state = Reactive(Story())
+    Ref(state.fields.total).set(1)
+    seq = state.value.journal_seq
+
+    Ref(state.fields.total).set(1)
+    Ref(state.fields.stages["one"]).set(state.value.stages["one"])
+
+    assert state.value.journal_seq == seq
+
+
+def test_journal_is_not_part_of_equality():
+    edited = Story().model_copy(update={"total": 1}).model_copy(update={"total": 0})
+
+    assert edited.journal_seq > 0
+    assert edited == Story()
+
+
+def test_lineage():
+    story = Story()
+    copied = story.model_copy(update={"total": 1})
+
+    assert copied.shares_lineage(story)
+    assert not Story().shares_lineage(story)
+    assert not story.shares_lineage(None)
+
+
+def test_changes_rebuild_the_new_state():
+    # As the DeepDiff patch did, the dumped changes, merged into the last
+    #  written state, give the current state
+    state = Reactive(Story())
+    responses = Ref(state.fields.stages["one"].responses)
+
+    def edit():
+        responses.set({"q1": Response(answer="a")})
+        Ref(state.fields.stages["two"].step).set(2)
+        responses.set({**responses.value, "q1": Response(answer="b", tries=2)})
+        Ref(state.fields.title).set("renamed")
+
+    old, patch = _apply(state, edit)
+
+    assert _merge(copy.deepcopy(old), patch) == state.value.as_dict()
+    assert set(patch) == {"title", "stages"}
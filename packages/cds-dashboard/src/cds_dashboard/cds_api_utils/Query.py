@@ -3,12 +3,12 @@ from requests import Session
 import os
 import json
 import numpy as np
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 from dotenv import load_dotenv
 from pathlib import Path  # python3 only
 from random import randint
 
-API_URL = "https://api.cosmicds.cfa.harvard.edu"
+API_URL = os.getenv("CDS_API_URL", "https://api.cosmicds.cfa.harvard.edu").rstrip("/")
 HUBBLE_ROUTE_PATH = "hubbles_law"
 
 _stages = ['introduction',
@@ -27,7 +27,7 @@ class QueryCosmicDSApi():
     url_head = API_URL
     querystring = {"":""}
     payload = ""
-    headers = {"authority": "api.cosmicds.cfa.harvard.edu"}
+    headers = {"authority": urlsplit(API_URL).netloc}
     _stage_keys = None
     
     def __init__(self, story = HUBBLE_ROUTE_PATH, class_id = None):
@@ -37,6 +37,8 @@ class QueryCosmicDSApi():
         dotenv_path = Path(__file__).resolve().parent.parent.parent / '.env'
         if dotenv_path.exists():
             load_dotenv(dotenv_path=dotenv_path)
+        # `.env` may point the dashboard at a different API server
+        self.url_head = os.getenv('CDS_API_URL', API_URL).rstrip('/')
         self._request_session = self.request_session()
         pass
     
@@ -5,11 +5,12 @@ from .state_adapters import StateAdapterFactory
 import time
 HUBBLE_ROUTE_PATH = "hubbles_law"
 
-import astropy.units as u
 from math import nan
 
 from .utils import l2d, convert_column_of_dates_to_datetime, get_or_none
 
+from .fitting import hubble_fits
+
 from typing import List, Dict, cast, Optional, Any, Union, TypedDict
 from .common_types import StateInterface, StageProgress
 from .database.old_types import (
@@ -209,20 +210,23 @@ class Roster():
         if self.class_summary is None or self._refresh or refresh:
             measurements = self.measurements(refresh=refresh)
 
-            def get_slope(x, y):
-                # slope through origin
-                return nan if (sum(x**2) == 0) else (sum(x * y) / sum(x**2))
-
-            def slope2age(h0):
-                return (1 / (h0 * u.km / u.s / u.Mpc)).to(u.Gyr).value # pyright: ignore[reportAttributeAccessIssue]
+            rows = {}
+            if len(measurements) > 0:
+                fits = hubble_fits(
+                    measurements['student_id'].to_numpy(),
+                    measurements['est_dist_value'].to_numpy(),
+                    measurements['velocity_value'].to_numpy(),
+                )
+                rows = {student: i for i, student in enumerate(fits.ids.tolist())}
 
+            # only students with all 5 measurements are summarized
             H0 = []
             Age = []
             for student in self.student_ids:
-                student_data = measurements[measurements['student_id'] == student]
-                if len(student_data) == 5:
-                    H0.append(get_slope(student_data['est_dist_value'], student_data['velocity_value']))
-                    Age.append(slope2age(H0[-1]))
+                i = rows.get(student)
+                if (i is not None) and (fits.count[i] == 5):
+                    H0.append(fits.h0[i])
+                    Age.append(fits.age[i])
                 else:
                     H0.append(nan)
                     Age.append(nan)
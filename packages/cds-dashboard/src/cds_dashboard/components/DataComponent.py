@@ -5,7 +5,9 @@ from .ClassPlot import ClassPlot
 from pandas import DataFrame, to_datetime, Series
 
 
-from numpy import around, asarray
+from numpy import around, asarray, nan, zeros
+
+from ..fitting import GYR_PER_INVERSE_H0, hubble_fits
 
 from .TableComponents import DataTable
 from .AgeHistogram import AgeHoHistogram
@@ -148,19 +150,13 @@ def DataSummary(roster: Reactive[Roster] | Roster = None, student_id = None, on_
                 }
             )
 
-from numpy import nan, array
 def get_slope(x, y):
-    if (x is None) or (y is None):
-        return nan
-    # drop None values
-    pairs = [(xi,yi) for xi,yi in zip(x,y) if (xi is not None) and (yi is not None)]
-    if len(pairs) == 0:
+    if (x is None) or (y is None) or len(x) == 0:
         return nan
-    x, y = array(pairs).T
     # slope through origin
-    return nan if (sum(x**2) == 0) else (sum(x*y)/sum(x**2))
+    return hubble_fits(zeros(len(x)), x, y).h0[0]
 def slope2age(h0):
-    return 977.79222 / h0 # age of universe in Gyr
+    return GYR_PER_INVERSE_H0 / h0 # age of universe in Gyr
 
 
 
@@ -273,13 +269,10 @@ def DataHistogram(roster: Reactive[Roster] | Roster = None, id_col = 'student_id
         solara.Markdown("There is no data for this class")
         return
     
-    #group by student_id
-    grouped = dataframe.groupby(id_col)
-    h0 = grouped.apply(lambda x: get_slope(x['est_dist_value'].to_numpy(), x['velocity_value'].to_numpy()))
-    # get the name associated with the student_id
-    age = h0.apply(slope2age)
-    time = grouped['last_modified'].max()
-    data = DataFrame({'h0': h0, 'age': age, 'last_modified': time}).reset_index() # move student_id to column
+    # fit every student at once; groups are sorted by id, as by groupby
+    fits = hubble_fits(dataframe[id_col].to_numpy(), dataframe['est_dist_value'].to_numpy(), dataframe['velocity_value'].to_numpy())
+    time = dataframe.groupby(id_col)['last_modified'].max()
+    data = DataFrame({'h0': fits.h0, 'age': fits.age, 'last_modified': time.to_numpy()}, index=time.index).reset_index() # move student_id to column
     # student_id to str
     data['student_id'] = data['student_id'].apply(str)
     data['name'] = [roster.get_student_name(int(sid)) for sid in data['student_id']]
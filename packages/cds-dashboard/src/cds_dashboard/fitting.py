@@ -0,0 +1,41 @@
+from typing import NamedTuple
+
+import numpy as np
+
+# 1 / H0, converted from Mpc s / km to Gyr
+GYR_PER_INVERSE_H0 = 977.7922216807891
+
+
+class HubbleFits(NamedTuple):
+    ids: np.ndarray
+    count: np.ndarray
+    h0: np.ndarray
+    age: np.ndarray
+
+
+def hubble_fits(groups, distances, velocities) -> HubbleFits:
+    """
+    Fits the Hubble constant (slope of velocity against distance, through the
+    origin) of every group at once, e.g. of every student, and the matching
+    age of the universe in Gyr.
+
+    Points with a missing distance or velocity are left out. Returns the
+    sorted group ids, with the number of points fit, H0 and age of each
+    (nan for groups without a point to fit).
+    """
+    x = np.asarray(distances, dtype=np.float64)
+    y = np.asarray(velocities, dtype=np.float64)
+    ids, group = np.unique(np.asarray(groups), return_inverse=True)
+
+    valid = np.isfinite(x) & np.isfinite(y)
+    group, x, y = group[valid], x[valid], y[valid]
+
+    count = np.bincount(group, minlength=len(ids))
+    sxx = np.bincount(group, weights=x * x, minlength=len(ids))
+    sxy = np.bincount(group, weights=x * y, minlength=len(ids))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h0 = np.where(sxx > 0, sxy / sxx, np.nan)
+        age = GYR_PER_INVERSE_H0 / h0
+
+    return HubbleFits(ids, count, h0, age)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from cds_dashboard.fitting import GYR_PER_INVERSE_H0, hubble_fits
+
+
+def test_fits_match_least_squares():
+    rng = np.random.default_rng(0)
+    groups = rng.integers(0, 5, 200)
+    distances = rng.uniform(10, 400, 200)
+    velocities = 70 * distances + rng.normal(0, 500, 200)
+
+    fits = hubble_fits(groups, distances, velocities)
+
+    for group, count, h0, age in zip(*fits):
+        x, y = distances[groups == group], velocities[groups == group]
+        expected = np.linalg.lstsq(x[:, None], y, rcond=None)[0][0]
+
+        assert count == len(x)
+        assert h0 == pytest.approx(expected)
+        assert age == pytest.approx(GYR_PER_INVERSE_H0 / expected)
+
+
+def test_missing_values_and_empty_groups():
+    fits = hubble_fits(
+        [1, 1, 2, 3], [10.0, None, np.nan, 0.0], [700.0, 1.0, 500.0, 5.0]
+    )
+
+    assert fits.ids.tolist() == [1, 2, 3]
+    assert fits.count.tolist() == [1, 0, 1]
+    assert fits.h0[0] == pytest.approx(70.0)
+    assert np.isnan(fits.h0[1:]).all()
+    assert np.isnan(fits.age[1:]).all()
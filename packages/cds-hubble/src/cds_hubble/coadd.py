@@ -0,0 +1,144 @@
+"""
+A lean reader for the `COADD` binary table of SDSS spectrum files.
+
+The spectra served by the API all share one simple layout, so rather than
+going through `astropy.io.fits`, `read_coadd` walks the FITS headers itself
+and views the table rows in place with `numpy.frombuffer`. Anything it does
+not recognize (scaled, logical, variable-length or unusual columns, malformed
+headers) makes it return `None`, so that callers can fall back to astropy.
+"""
+
+import numpy as np
+
+BLOCK = 2880
+CARD = 80
+
+# Binary table column codes (TFORMn) and their big-endian numpy types.
+#  Logical columns (`L`), stored as the characters T and F, can't be viewed in
+#  place, so aren't supported
+_TFORM_TYPES = {
+    "B": "u1",
+    "I": ">i2",
+    "J": ">i4",
+    "K": ">i8",
+    "E": ">f4",
+    "D": ">f8",
+    "A": "S1",
+}
+
+
+def _parse_header(content: bytes, offset: int) -> tuple[dict, int] | None:
+    """Returns the header cards at `offset`, and the offset of its data."""
+    header = {}
+    position = offset
+
+    while position + BLOCK <= len(content):
+        block = content[position : position + BLOCK]
+        position += BLOCK
+
+        for start in range(0, BLOCK, CARD):
+            card = block[start : start + CARD].decode("ascii", "replace")
+            keyword = card[:8].strip()
+
+            if keyword == "END":
+                return header, position
+
+            if card[8:10] != "= ":
+                continue
+
+            value = card[10:].split("/", 1)[0].strip()
+            if value.startswith("'"):
+                value = card[10:].strip()[1:].split("'", 1)[0].strip()
+            header[keyword] = value
+
+    return None
+
+
+def _data_size(header: dict) -> int:
+    naxis = int(header.get("NAXIS", 0))
+
+    if naxis == 0:
+        return 0
+
+    elements = 1
+    for axis in range(1, naxis + 1):
+        elements *= int(header[f"NAXIS{axis}"])
+
+    elements += int(header.get("PCOUNT", 0))
+    elements *= int(header.get("GCOUNT", 1))
+    return abs(int(header["BITPIX"])) // 8 * elements
+
+
+def _row_dtype(header: dict) -> np.dtype | None:
+    names, formats = [], []
+
+    for index in range(1, int(header["TFIELDS"]) + 1):
+        if f"TSCAL{index}" in header or f"TZERO{index}" in header:
+            return None
+
+        tform = header[f"TFORM{index}"].strip()
+        repeat, code = tform[:-1] or "1", tform[-1]
+
+        if code not in _TFORM_TYPES or not repeat.isdigit():
+            return None
+
+        repeat = int(repeat)
+        base = _TFORM_TYPES[code]
+
+        if code == "A":
+            formats.append(f"S{repeat}")
+        elif repeat == 1:
+            formats.append(base)
+        else:
+            formats.append((base, (repeat,)))
+
+        names.append(header.get(f"TTYPE{index}", f"col{index}").lower())
+
+    dtype = np.dtype({"names": names, "formats": formats})
+
+    if dtype.itemsize != int(header["NAXIS1"]):
+        return None
+
+    return dtype
+
+
+def read_coadd(content: bytes) -> np.ndarray | None:
+    """
+    Returns the rows of the `COADD` table of the FITS file in `content` as a
+    read-only, big-endian record array viewing `content`, with lower-case
+    column names. Returns `None` if the file has no such table, or if its
+    layout isn't one this reader supports.
+    """
+    offset = 0
+
+    try:
+        while offset < len(content):
+            parsed = _parse_header(content, offset)
+
+            if parsed is None:
+                return None
+
+            header, data_offset = parsed
+            size = _data_size(header)
+
+            if (
+                header.get("XTENSION") == "BINTABLE"
+                and header.get("EXTNAME", "").upper() == "COADD"
+            ):
+                dtype = _row_dtype(header)
+
+                if dtype is None or data_offset + size > len(content):
+                    return None
+
+                return np.frombuffer(
+                    content,
+                    dtype=dtype,
+                    count=int(header["NAXIS2"]),
+                    offset=data_offset,
+                )
+
+            offset = data_offset + -(-size // BLOCK) * BLOCK
+    except (KeyError, ValueError):
+        return None
+
+    return None
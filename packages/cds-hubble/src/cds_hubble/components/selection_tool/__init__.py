@@ -3,7 +3,6 @@ from typing import Callable, Optional
 import astropy.units as u
 import solara
 from astropy.coordinates import SkyCoord
-from astropy.table import Table
 from reacton import ipyvuetify as rv
 from solara import Reactive
 
@@ -202,6 +201,15 @@ def SelectionTool(
             for k in ["ra", "decl"]:
                 galaxy[k] = float(galaxy[k])
 
+            # Resolve the clicked marker to the catalog's galaxy
+            nearest = LOCAL_API.get_galaxy_catalog(local_state).nearest(
+                galaxy["ra"],
+                galaxy["decl"],
+                max_separation=GALAXY_FOV.to_value(u.deg),
+            )
+            if nearest is not None:
+                galaxy.update(id=nearest.id, ra=nearest.ra, decl=nearest.decl)
+
             fov = min(wwt_widget.get_fov(), GALAXY_FOV)
 
             _go_to_location(
@@ -226,16 +234,9 @@ def SelectionTool(
         wwt_widget = solara.get_widget(wwt_container).children[0]
 
         if current_layer.value is None:
-            table = Table(
-                {
-                    k: [x.dict()[k] for x in LOCAL_API.get_galaxies(local_state)]
-                    for k in ["id", "ra", "decl"]
-                }
-            )
-
             layer = wwt_widget.layers.add_table_layer(
                 frame="Sky",
-                table=table,
+                table=LOCAL_API.get_galaxy_catalog(local_state).wwt_table,
                 lon_att="ra",
                 lat_att="decl",
                 marker_type="gaussian",
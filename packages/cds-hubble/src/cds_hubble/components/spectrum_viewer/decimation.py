@@ -0,0 +1,72 @@
+import numpy as np
+
+# Width (in pixels) of the spectrum viewer's plotting area, at its widest in
+#  the story's layouts
+SPECTRUM_PLOT_WIDTH = 560
+
+# Each bucket contributes its minimum and maximum, so a bucket per two pixels
+#  gives roughly one point per pixel of the plot
+SPECTRUM_BUCKETS = SPECTRUM_PLOT_WIDTH // 2
+
+# Precision of the values sent to the browser: hundredths of an angstrom for
+#  the wavelength, and thousandths of a flux unit for the brightness
+WAVE_DECIMALS = 2
+FLUX_DECIMALS = 3
+
+
+def decimate_minmax(
+    x: np.ndarray,
+    y: np.ndarray,
+    x_range: list[float] | None = None,
+    buckets: int = SPECTRUM_BUCKETS,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduces the (sorted) samples within `x_range` to the lowest and highest
+    sample of each of `buckets` equally wide buckets, keeping the order of
+    the samples. Narrow emission and absorption lines survive, as they are
+    the extremes of their bucket. One sample on either side of the range is
+    kept, so the line runs on to the edges of the plot.
+    """
+    start, stop = 0, len(x)
+
+    if x_range:
+        start = max(np.searchsorted(x, min(x_range), side="left") - 1, 0)
+        stop = min(np.searchsorted(x, max(x_range), side="right") + 1, len(x))
+
+    x, y = x[start:stop], y[start:stop]
+
+    if len(x) > 2 * buckets:
+        edges = np.linspace(x[0], x[-1], buckets + 1)
+        bucket = np.searchsorted(edges, x, side="right").clip(1, buckets) - 1
+
+        # Sorting by bucket, then by value, puts each bucket's minimum first
+        #  and its maximum last
+        order = np.lexsort((y, bucket))
+        sorted_buckets = bucket[order]
+        is_first = np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]]
+        firsts = np.flatnonzero(is_first)
+        lasts = np.r_[firsts[1:] - 1, len(order) - 1]
+
+        keep = np.unique(np.concatenate((order[firsts], order[lasts])))
+        x, y = x[keep], y[keep]
+
+    return (
+        np.round(x.astype(np.float64), WAVE_DECIMALS),
+        np.round(y.astype(np.float64), FLUX_DECIMALS),
+    )
+
+
+def buckets_for_width(width: int) -> int:
+    """The number of buckets giving roughly one point per pixel of `width`."""
+    return max(int(width) // 2, 1)
+
+
+def nearest_sample(x: np.ndarray, value: float) -> float:
+    """
+    The sample of the (sorted) full-resolution `x` nearest `value`, e.g. to
+    resolve a click on a decimated trace, whose points are rounded.
+    """
+    index = int(np.searchsorted(x, value).clip(1, len(x) - 1))
+    if value - x[index - 1] <= x[index] - value:
+        index -= 1
+    return float(x[index])
@@ -4,9 +4,74 @@ TODO: This needs to be removed. We only keep this here because plotly keeps
   don't have access to it from Solara natively.
 """
 
+import json
+from threading import Lock
+
+import numpy as np
 import solara
 from typing import Callable, Any
 
+from cds_core.logger import setup_logger
+
+logger = setup_logger("PLOTLY FIGURE")
+
+
+class FigureUpdateStats:
+    """
+    Process-wide count of the updates sent to figure widgets, and of their
+    size once serialized, by kind: `traces` (traces replaced outright),
+    `restyle` (changed trace properties) and `relayout` (changed layout
+    properties).
+    """
+
+    def __init__(self):
+        self._counts: dict[str, list[int]] = {}
+        self._lock = Lock()
+
+    def record(self, kind: str, payload) -> int:
+        from plotly.utils import PlotlyJSONEncoder
+
+        nbytes = len(json.dumps(payload, cls=PlotlyJSONEncoder))
+
+        with self._lock:
+            counts = self._counts.setdefault(kind, [0, 0])
+            counts[0] += 1
+            counts[1] += nbytes
+
+        return nbytes
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                kind: {"updates": updates, "bytes": nbytes}
+                for kind, (updates, nbytes) in self._counts.items()
+            }
+
+
+FIGURE_UPDATES = FigureUpdateStats()
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def _changes(old: dict, new: dict) -> dict:
+    """The top-level properties of `new` that differ from `old`; `None` if removed."""
+    changes = {k: v for k, v in new.items() if k not in old or not _same(old[k], v)}
+    changes.update({k: None for k in old.keys() - new.keys()})
+
+    # Trace IDs are assigned by the widget
+    changes.pop("uid", None)
+
+    return changes
+
 
 @solara.component
 def FigurePlotly(
@@ -44,15 +109,35 @@ def FigurePlotly(
     )
 
     def update_data():
+        # The widget lives as long as the component: only what changed since
+        #  the last render is sent to the browser
         fig_widget: FigureWidget = solara.get_widget(fig_element)
-        fig_widget.layout = fig.layout
-
         fig_widget._config = fig._config | (config or {})
 
-        length = len(fig_widget.data)
-        fig_widget.add_traces(fig.data)
-        data = list(fig_widget.data)
-        fig_widget.data = data[length:]
+        old_traces = [trace.to_plotly_json() for trace in fig_widget.data]
+        new_traces = [trace.to_plotly_json() for trace in fig.data]
+        sent = 0
+
+        if [t.get("type") for t in old_traces] != [t.get("type") for t in new_traces]:
+            length = len(fig_widget.data)
+            fig_widget.add_traces(fig.data)
+            fig_widget.data = list(fig_widget.data)[length:]
+            sent += FIGURE_UPDATES.record("traces", new_traces)
+        else:
+            for index, (old, new) in enumerate(zip(old_traces, new_traces)):
+                if restyle := _changes(old, new):
+                    restyle = {k: [v] for k, v in restyle.items()}
+                    fig_widget.plotly_restyle(restyle, trace_indexes=[index])
+                    sent += FIGURE_UPDATES.record("restyle", restyle)
+
+        relayout = _changes(
+            fig_widget.layout.to_plotly_json(), fig.layout.to_plotly_json()
+        )
+        if relayout:
+            fig_widget.plotly_relayout(relayout)
+            sent += FIGURE_UPDATES.record("relayout", relayout)
+
+        logger.debug("Sent %d bytes of figure updates.", sent)
 
     solara.use_effect(update_data, dependencies or fig)
     return fig_element
@@ -6,9 +6,14 @@ import solara
 from solara import Reactive
 
 from ...story_state import StoryState
-from ...story_state import GalaxyData
-from pandas import DataFrame
+from ...story_state import GalaxyData, SpectrumData
 from ...components.spectrum_viewer.plotly_figure import FigurePlotly
+from ...components.spectrum_viewer.decimation import (
+    SPECTRUM_PLOT_WIDTH,
+    buckets_for_width,
+    decimate_minmax,
+    nearest_sample,
+)
 from cds_core.logger import setup_logger
 from ...helpers.viewer_marker_colors import (
     GENERIC_COLOR,
@@ -18,7 +23,6 @@ from ...helpers.viewer_marker_colors import (
 )
 from ...utils import PLOTLY_MARGINS
 from ...remote import LOCAL_API
-from astropy.table import Table
 
 
 from glue_plotly.common import DEFAULT_FONT
@@ -45,6 +49,7 @@ def SpectrumViewer(
     max_spectrum_bounds: Optional[solara.Reactive[list[float]]] = None,
     spectrum_color: str = GENERIC_COLOR,
     local_state: Reactive[StoryState] = None,
+    plot_width: int = SPECTRUM_PLOT_WIDTH,
 ):
 
     # spectrum_bounds
@@ -63,9 +68,7 @@ def SpectrumViewer(
         if galaxy_data is None:
             return False
 
-        spec_data = LOCAL_API.load_spectrum_data(local_state, galaxy_data)
-
-        return Table({"wave": spec_data.wave, "flux": spec_data.flux}).to_pandas()
+        return LOCAL_API.load_spectrum_data(local_state, galaxy_data)
 
     spec_data_task = solara.lab.use_task(
         _load_spectrum,
@@ -77,9 +80,9 @@ def SpectrumViewer(
         logger.info("spec_data_task is finished")
         if (spec is not None) and (max_spectrum_bounds is not None):
             logger.info(
-                f"\tSetting max_spectrum_bounds to {spec['wave'].min()} and {spec['wave'].max()}"
+                f"\tSetting max_spectrum_bounds to {spec.wave.min()} and {spec.wave.max()}"
             )
-            max_spectrum_bounds.set([spec["wave"].min(), spec["wave"].max()])
+            max_spectrum_bounds.set([spec.wave.min(), spec.wave.max()])
 
     def _rest_wave_tool_toggled():
         on_rest_wave_tool_clicked()
@@ -127,8 +130,8 @@ def SpectrumViewer(
             if spec_data_task.value is not None and spectrum_bounds is not None:
                 spectrum_bounds.set(
                     [
-                        spec_data_task.value["wave"].min(),
-                        spec_data_task.value["wave"].max(),
+                        spec_data_task.value.wave.min(),
+                        spec_data_task.value.wave.max(),
                     ]
                 )
         except Exception as e:
@@ -139,12 +142,15 @@ def SpectrumViewer(
     solara.use_effect(_on_reset_button_clicked, dependencies=[galaxy_data])
 
     def _spectrum_clicked(**kwargs):
+        # The trace is decimated and rounded: resolve the clicked point
+        #  against the full-resolution spectrum
+        value = nearest_sample(spec_data_task.value.wave, kwargs["points"]["xs"][0])
+
         if spectrum_click_enabled:
             vertical_line_visible.set(True)
-            on_obs_wave_measured(kwargs["points"]["xs"][0])
+            on_obs_wave_measured(value)
         if marker_position is not None:
             # vertical_line_visible.set(False)
-            value = kwargs["points"]["xs"][0]
             marker_position.set(value)
             on_set_marker_position(value)
 
@@ -231,7 +237,7 @@ def SpectrumViewer(
                 rv.ProgressCircular(size=100, indeterminate=True, color="primary")
 
             return
-        elif not isinstance(spec_data_task.value, DataFrame):
+        elif not isinstance(spec_data_task.value, SpectrumData):
             with rv.Sheet(
                 style_="height: 360px", class_="d-flex justify-center align-center"
             ):
@@ -243,11 +249,19 @@ def SpectrumViewer(
             logger.info("galaxy_data is None")
             return
 
+        # Only as much of the spectrum as the visible window can show is sent
+        wave, flux = decimate_minmax(
+            spec_data_task.value.wave,
+            spec_data_task.value.flux,
+            x_bounds.value,
+            buckets_for_width(plot_width),
+        )
+
         fig = go.Figure()
         fig.add_trace(
             go.Scatter(
-                x=spec_data_task.value["wave"],
-                y=spec_data_task.value["flux"],
+                x=wave,
+                y=flux,
                 line=dict(
                     color=spectrum_color,
                     width=2,
@@ -432,20 +446,25 @@ def SpectrumViewer(
         # else:
         fig.update_yaxes(
             range=[
-                spec_data_task.value["flux"].min() * 0.95,
-                spec_data_task.value["flux"].max() * 1.25,
+                spec_data_task.value.flux.min() * 0.95,
+                spec_data_task.value.flux.max() * 1.25,
             ]
         )
 
         fig.update_layout(dragmode="zoom" if 0 in toggle_group_state.value else False)
 
+        # Only the parts of the figure that changed are sent on an update, so
+        #  e.g. moving the marker doesn't re-send the spectrum
         dependencies = [
+            galaxy_data,
+            spectrum_color,
             obs_wave,
             spectrum_click_enabled,
             vertical_line_visible.value,
             toggle_group_state.value,
             x_bounds.value,
             y_bounds.value,
+            plot_width,
         ]
 
         if marker_position is not None:
@@ -0,0 +1,87 @@
+from typing import Iterable
+
+import numpy as np
+from astropy.table import Table
+
+from .story_state import GalaxyData
+
+# Columns of the table shown as a layer in the WWT sky viewer
+WWT_COLUMNS = ("id", "ra", "decl")
+
+
+def _unit_vectors(ra: np.ndarray, decl: np.ndarray) -> np.ndarray:
+    ra, decl = np.radians(ra), np.radians(decl)
+    return np.column_stack(
+        (np.cos(decl) * np.cos(ra), np.cos(decl) * np.sin(ra), np.sin(decl))
+    )
+
+
+class GalaxyCatalog:
+    """
+    The galaxies of a story, held as numpy columns (`id`, `ra`, `decl`, `z`,
+    `type`, `element`), built once and shared by every session.
+
+    The position of each galaxy is indexed as a unit vector on the sky, so
+    that the galaxy nearest to a point is found with a single matrix-vector
+    product. The catalog, and the galaxies and table it hands out, must not
+    be modified.
+    """
+
+    def __init__(self, galaxies: Iterable[GalaxyData]):
+        self.galaxies: list[GalaxyData] = list(galaxies)
+
+        self.id = np.array([g.id for g in self.galaxies], dtype=np.int64)
+        self.ra = np.array([g.ra for g in self.galaxies], dtype=np.float64)
+        self.decl = np.array([g.decl for g in self.galaxies], dtype=np.float64)
+        self.z = np.array([g.z for g in self.galaxies], dtype=np.float64)
+        self.type = np.array([g.type for g in self.galaxies], dtype=np.str_)
+        self.element = np.array([g.element for g in self.galaxies], dtype=np.str_)
+
+        self._rows = {gal_id: row for row, gal_id in enumerate(self.id.tolist())}
+        self._sky = _unit_vectors(self.ra, self.decl)
+
+        self.wwt_table = Table({k: getattr(self, k) for k in WWT_COLUMNS})
+
+    def __len__(self) -> int:
+        return len(self.galaxies)
+
+    def get(self, gal_id: int) -> GalaxyData | None:
+        row = self._rows.get(int(gal_id))
+        return None if row is None else self.galaxies[row]
+
+    def nearest(
+        self, ra: float, decl: float, max_separation: float | None = None
+    ) -> GalaxyData | None:
+        """
+        Returns the galaxy closest to `(ra, decl)` (in degrees), or `None` if
+        there is none within `max_separation` degrees.
+        """
+        if not self.galaxies:
+            return None
+
+        cosines = self._sky @ _unit_vectors(np.array([ra]), np.array([decl]))[0]
+        row = int(np.argmax(cosines))
+
+        if max_separation is not None:
+            separation = np.degrees(np.arccos(np.clip(cosines[row], -1, 1)))
+
+            if separation > max_separation:
+                return None
+
+        return self.galaxies[row]
+
+    def sample(
+        self,
+        size: int,
+        exclude: Iterable[int] = (),
+        rng: np.random.Generator | None = None,
+    ) -> list[GalaxyData]:
+        """
+        Returns up to `size` distinct galaxies at random, leaving out those
+        whose ids are in `exclude`.
+        """
+        rng = rng or np.random.default_rng()
+        rows = np.flatnonzero(~np.isin(self.id, list(exclude)))
+        rows = rng.choice(rows, size=min(size, len(rows)), replace=False)
+
+        return [self.galaxies[row] for row in rows]
@@ -1,23 +1,30 @@
 import time
 
 import solara
-from deepdiff import DeepDiff
+import solara.server.kernel_context
 from solara import Reactive
 from solara.lab import Ref
 from solara_enterprise import auth
 
 from cds_core.app_state import AppState
+from cds_core.bootstrap import Bootstrap
 from cds_core.layout import BaseLayout, BaseSetup
 from cds_core.logger import setup_logger
+from cds_core.persistence import PERSISTENCE_SCHEDULER
 from .remote import LOCAL_API
+from .spectrum_prefetch import SPECTRUM_PREFETCHER
 from .story_state import StoryState
-from .utils import push_to_route, extract_changed_subtree
+from .utils import push_to_route
 
 logger = setup_logger("LAYOUT")
 
 
 def _load_state(
-    app_state: Reactive[AppState], story_state: Reactive[StoryState], *args, **kwargs
+    app_state: Reactive[AppState],
+    story_state: Reactive[StoryState],
+    bootstrap: Bootstrap | None = None,
+    *args,
+    **kwargs,
 ):
     # Force reset global and local states
     logger.info("Clearing local states.")
@@ -39,23 +46,32 @@ def _load_state(
         app_state.value.student.id,
     )
 
-    # Retrieve the student's app and local states
-    LOCAL_API.get_app_story_states(app_state, story_state)
-
-    # Load in the student's measurements
-    measurements = LOCAL_API.get_measurements(app_state, story_state)
-    sample_measurements = LOCAL_API.get_sample_measurements(app_state, story_state)
+    # Retrieve the student's app and local states, and their measurements
+    LOCAL_API.load_story_data(
+        app_state, story_state, bootstrap or Bootstrap(story_state.value.story_id)
+    )
 
     logger.info("Finished loading state.")
 
+    # Every student starts with the example galaxy, so have its spectrum ready
+    for measurement in story_state.value.example_measurements:
+        if measurement.galaxy is not None:
+            SPECTRUM_PREFETCHER.prefetch(
+                story_state.value.story_id, measurement.galaxy, owner=student_id.value
+            )
+
     Ref(story_state.fields.measurements_loaded).set(True)
 
 
 def _write_state(
     patch: dict, app_state: Reactive[AppState], story_state: Reactive[StoryState]
 ):
-    # Listen for changes in the states and write them to the database
-    patch_state = LOCAL_API.patch_story_state(patch, app_state, story_state)
+    # Listen for changes in the states and write them to the database. Changes
+    #  to fields kept out of the state dump, like measurements, leave nothing
+    #  to patch.
+    patch_state = (
+        LOCAL_API.patch_story_state(patch, app_state, story_state) if patch else True
+    )
 
     # Be sure to write the measurement data separately since it's stored
     #  in another location in the database
@@ -78,51 +94,83 @@ def Layout(
     app_state: Reactive[AppState] = None,
     story_state: Reactive[StoryState] = None,
 ):
-    BaseSetup(remote_api=LOCAL_API, global_state=app_state, local_state=story_state)
+    # Times the session's start-up, from login to the restored page
+    bootstrap = solara.use_memo(
+        lambda: Bootstrap(story_state.value.story_id), dependencies=[]
+    )
+
+    BaseSetup(
+        remote_api=LOCAL_API,
+        global_state=app_state,
+        local_state=story_state,
+        bootstrap=bootstrap,
+    )
 
     initial_state_loaded = solara.use_reactive(False)
 
     # Load stored state from the server
     def _state_setup():
-        _load_state(app_state, story_state)
+        _load_state(app_state, story_state, bootstrap)
         initial_state_loaded.set(True)
 
     solara.use_memo(_state_setup, dependencies=[])
 
-    initial_state_written = solara.use_reactive(False)
+    # Hand state changes to the process-wide write-behind scheduler, which
+    #  coalesces them and writes them to the database in the background
+    def _register_state_writer():
+        if not initial_state_loaded.value or not app_state.value.update_db:
+            return
+
+        context = solara.server.kernel_context.get_current_context()
+        key = (story_state.value.story_id, app_state.value.student.id, context.id)
+        last_written = None
+        latest = app_state.value
+
+        def _flush():
+            nonlocal last_written
+
+            snapshot = latest
+
+            # The first write after loading, or after the state was replaced
+            #  wholesale, is a full one. Otherwise the change journal tells us
+            #  exactly which fields to send.
+            if last_written is None or not snapshot.shares_lineage(last_written):
+                patch = snapshot.as_dict()
+            elif snapshot.journal_seq > last_written.journal_seq:
+                patch = snapshot.dump_changes(since=last_written.journal_seq)
+            else:
+                return
 
-    def _consume_write_state():
-        while True:
-            if not initial_state_loaded.value:
-                time.sleep(2)
-                continue
+            with context:
+                _write_state(patch, app_state, story_state)
 
-            if not initial_state_written.value:
-                logger.info(f"Initializing with full DB write.")
-                _write_state(app_state.value.as_dict(), app_state, story_state)
-                initial_state_written.set(True)
-                continue
+            last_written = snapshot
 
-            # Retrieve current state
-            old_state = app_state.value.as_dict()
+        def _on_change(value):
+            nonlocal latest
+            latest = value
+            PERSISTENCE_SCHEDULER.mark_dirty(key)
 
-            # Sleep for 2 seconds
-            time.sleep(2)
+        PERSISTENCE_SCHEDULER.register(key, _flush)
+        PERSISTENCE_SCHEDULER.mark_dirty(key)
+        unsubscribe = app_state.subscribe(_on_change)
+        registered = True
 
-            # Retrieve state after sleep
-            new_state = app_state.value.as_dict()
+        def _cleanup():
+            nonlocal registered
 
-            # Get state diff to send atomic updates
-            diff = extract_changed_subtree(old_state, new_state)
+            if not registered:
+                return
 
-            # Return if diff dict is empty
-            if not diff:
-                continue
+            registered = False
+            unsubscribe()
+            PERSISTENCE_SCHEDULER.unregister(key)
 
-            # Write the state to the server
-            _write_state(diff, app_state, story_state)
+        # Flush outstanding changes when the session closes
+        context.on_close(_cleanup)
+        return _cleanup
 
-    solara.lab.use_task(_consume_write_state, dependencies=[])
+    solara.use_effect(_register_state_writer, dependencies=[initial_state_loaded.value])
 
     route_restored = solara.use_reactive(False)
 
@@ -162,6 +210,7 @@ def Layout(
                 push_to_route(router, location, story_state.value.last_route)
 
             route_restored.set(True)
+            bootstrap.finish()
 
     solara.lab.use_task(_restore_user_location, dependencies=[])
 
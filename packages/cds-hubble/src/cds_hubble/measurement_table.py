@@ -0,0 +1,153 @@
+from functools import cached_property
+from typing import Iterable, Sequence
+
+import numpy as np
+from glue.core import Data
+from glue.core.component import CategoricalComponent, Component
+
+from .story_state import StudentMeasurement
+
+# Numeric columns of a measurement table, with their types. Missing values
+#  are `nan` in float columns.
+COLUMNS = {
+    "student_id": np.int64,
+    "class_id": np.int64,
+    "obs_wave_value": np.float64,
+    "velocity_value": np.float64,
+    "ang_size_value": np.float64,
+    "est_dist_value": np.float64,
+    "brightness": np.float64,
+    "galaxy_id": np.int64,
+}
+
+
+class MeasurementTable:
+    """
+    Measurements held as numpy columns (see `COLUMNS`) rather than as
+    `StudentMeasurement` models, for large read-only datasets such as the
+    measurements of every class.
+
+    Galaxy names are interned: `galaxy_code` indexes into `galaxy_names`.
+    Rows are sorted by class and student, so that the measurements of a
+    class or of a student are a slice of the table, and `for_class` and
+    `for_student` return views rather than copies. Tables may be shared
+    between sessions, and must not be modified.
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray], galaxy_names: np.ndarray):
+        order = np.lexsort((columns["student_id"], columns["class_id"]))
+        self.columns = {name: columns[name][order] for name in COLUMNS}
+        self.galaxy_code = columns["galaxy_code"][order]
+        self.galaxy_names = galaxy_names
+
+    def _view(self, rows: slice) -> "MeasurementTable":
+        view = object.__new__(type(self))
+        view.columns = {name: column[rows] for name, column in self.columns.items()}
+        view.galaxy_code = self.galaxy_code[rows]
+        view.galaxy_names = self.galaxy_names
+        return view
+
+    @cached_property
+    def _students(self) -> dict[int, slice]:
+        class_id, student_id = self.columns["class_id"], self.columns["student_id"]
+
+        # Rows at which a new class, or a new student, starts
+        changes = np.ones(len(self) + 1, dtype=bool)
+        changes[1:-1] = (class_id[1:] != class_id[:-1]) | (
+            student_id[1:] != student_id[:-1]
+        )
+        starts = np.flatnonzero(changes).tolist()
+
+        students = {}
+        for start, stop in zip(starts[:-1], starts[1:]):
+            students.setdefault(int(student_id[start]), slice(start, stop))
+        return students
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "MeasurementTable":
+        """
+        Builds a table from measurements as decoded from the API, with the
+        galaxy of each nested under `galaxy`.
+        """
+        rows = list(rows)
+        fields = StudentMeasurement.model_fields
+        columns = {
+            name: np.array(
+                [row.get(name, fields[name].default) for row in rows], dtype=dtype
+            )
+            for name, dtype in COLUMNS.items()
+            if name != "galaxy_id"
+        }
+
+        galaxies = [row.get("galaxy") or {} for row in rows]
+        columns["galaxy_id"] = np.array(
+            [g.get("id", 0) for g in galaxies], dtype=np.int64
+        )
+
+        names: dict[str, int] = {}
+        columns["galaxy_code"] = np.array(
+            [names.setdefault(g.get("name", ""), len(names)) for g in galaxies],
+            dtype=np.int32,
+        )
+
+        return cls(columns, np.array(list(names), dtype=np.str_))
+
+    @classmethod
+    def from_models(
+        cls, measurements: Sequence[StudentMeasurement]
+    ) -> "MeasurementTable":
+        return cls.from_rows(m.model_dump() for m in measurements)
+
+    @classmethod
+    def concatenate(cls, tables: Sequence["MeasurementTable"]) -> "MeasurementTable":
+        galaxy_names, codes = np.unique(
+            np.concatenate([t.galaxy_names for t in tables]), return_inverse=True
+        )
+
+        columns = {
+            name: np.concatenate([t.columns[name] for t in tables]) for name in COLUMNS
+        }
+
+        # Map the codes of each table to the merged names
+        offsets = np.cumsum([0] + [len(t.galaxy_names) for t in tables])
+        columns["galaxy_code"] = np.concatenate(
+            [
+                codes[offset:][t.galaxy_code].astype(np.int32)
+                for offset, t in zip(offsets.tolist(), tables)
+            ]
+        )
+
+        return cls(columns, galaxy_names.astype(np.str_))
+
+    def __len__(self) -> int:
+        return len(self.galaxy_code)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name == "galaxy_name":
+            return self.galaxy_names[self.galaxy_code]
+        return self.columns[name]
+
+    @cached_property
+    def class_ids(self) -> np.ndarray:
+        return np.unique(self.columns["class_id"])
+
+    def for_class(self, class_id: int) -> "MeasurementTable":
+        class_id_column = self.columns["class_id"]
+        start, stop = np.searchsorted(class_id_column, [class_id, class_id + 1])
+        return self._view(slice(int(start), int(stop)))
+
+    def for_student(self, student_id: int) -> "MeasurementTable":
+        """
+        The measurements of `student_id`; only those made in their first class
+        if they have measurements in several.
+        """
+        rows = self._students.get(int(student_id), slice(0, 0))
+        return self._view(rows)
+
+    def to_glue_data(self, label: str | None = None) -> Data:
+        data_dict = {name: Component(column) for name, column in self.columns.items()}
+        data_dict["galaxy_name"] = CategoricalComponent(self["galaxy_name"])
+
+        if label:
+            data_dict["label"] = label
+        return Data(**data_dict)
@@ -1,22 +1,32 @@
+import asyncio
 import json
+import os
 from contextlib import closing
 from csv import DictReader
-from functools import cache
+from functools import cached_property
 from io import BytesIO
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, TypedDict
 
 from astropy.io import fits
+from pydantic import TypeAdapter
 from solara import Reactive
 from solara.toestand import Ref
 
 from cds_core.base_states import BaseStageState, BaseStoryState
+from cds_core.bootstrap import Bootstrap
+from cds_core.cache import TTLCache
 from cds_core.logger import setup_logger
 from cds_core.remote import BaseAPI
 from cds_core.app_state import AppState
 from cds_core.utils import CDSJSONEncoder
+from .coadd import read_coadd
+from .galaxy_catalog import GalaxyCatalog
+from .measurement_table import MeasurementTable
 from .story_state import ClassSummary, StudentMeasurement, StudentSummary
 from .story_state import GalaxyData, SpectrumData, StoryState
+from .spectrum_bundle import SPECTRUM_BUNDLE
+from .spectrum_cache import SPECTRUM_CACHE
 
 logger = setup_logger("CDS-HUBBLE API")
 
@@ -25,6 +35,77 @@ from pandas import read_csv
 
 DEBOUNCE_TIMEOUT = 1
 
+# Precision in which spectra are held, e.g. `float32`; by default, as stored
+SPECTRUM_DTYPE = os.getenv("CDS_SPECTRUM_DTYPE") or None
+
+# Columns of the `COADD` table a spectrum is built from
+COADD_COLUMNS = {"loglam", "flux", "ivar"}
+
+# Class- and story-wide datasets are shared by every session in the process.
+#  Keys are `(story_id, class_id, dataset)`; story-wide datasets use a
+#  `class_id` of `None`.
+CLASS_DATA_CACHE = TTLCache(
+    "class data",
+    max_size=int(os.getenv("CDS_CLASS_DATA_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("CDS_CLASS_DATA_CACHE_TTL", "60")),
+)
+
+# The galaxy catalog of each story rarely changes, and is expensive to rebuild
+GALAXY_CATALOGS = TTLCache(
+    "galaxy catalogs",
+    max_size=16,
+    ttl=float(os.getenv("CDS_GALAXY_CATALOG_TTL", "3600")),
+)
+
+# Fingerprints of the measurement rows last uploaded (or loaded) by each
+#  student, as `(story_id, student_id, sample) -> {row key: fingerprint}`, so
+#  that only changed rows are uploaded. Entries expire so that rows written
+#  by another process are eventually uploaded again.
+UPLOADED_MEASUREMENTS = TTLCache(
+    "uploaded measurements",
+    max_size=int(os.getenv("CDS_UPLOADED_MEASUREMENTS_SIZE", "4096")),
+    ttl=float(os.getenv("CDS_UPLOADED_MEASUREMENTS_TTL", "600")),
+)
+
+
+class _MeasurementsPayload(TypedDict):
+    measurements: list[StudentMeasurement]
+
+
+class _AllDataPayload(TypedDict):
+    measurements: list[StudentMeasurement]
+    studentData: list[StudentSummary]
+    classData: list[ClassSummary]
+
+
+class _GalaxyRow(TypedDict, total=False):
+    id: int
+    name: str
+
+
+class _MeasurementRow(TypedDict, total=False):
+    student_id: int
+    class_id: int | None
+    obs_wave_value: float | None
+    velocity_value: float | None
+    ang_size_value: float | None
+    est_dist_value: float | None
+    brightness: float
+    galaxy: _GalaxyRow | None
+
+
+class _AllDataRows(TypedDict):
+    measurements: list[_MeasurementRow]
+    studentData: list[StudentSummary]
+    classData: list[ClassSummary]
+
+
+# Payloads are validated straight from the response bytes. Building an
+#  adapter is costly, so each is built once.
+MEASUREMENTS_PAYLOAD = TypeAdapter(_MeasurementsPayload)
+ALL_DATA_PAYLOAD = TypeAdapter(_AllDataPayload)
+ALL_DATA_ROWS = TypeAdapter(_AllDataRows)
+
 
 class LocalAPI(BaseAPI):
     def get_app_story_states(
@@ -33,43 +114,230 @@ class LocalAPI(BaseAPI):
 
         return super().get_app_story_states(global_state, local_state)
 
-    @cache
+    async def get_app_story_states_async(
+        self, global_state: Reactive[AppState], local_state: Reactive[StoryState]
+    ) -> BaseStoryState | None:
+
+        return await super().get_app_story_states_async(global_state, local_state)
+
+    def load_story_data(
+        self,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+        bootstrap: Bootstrap,
+    ):
+        """
+        Loads the student's story state, measurements and example measurements
+        like `get_app_story_states`, `get_measurements` and
+        `get_sample_measurements` would, but with the requests in flight
+        concurrently and each result applied as soon as it arrives.
+        """
+        story_id = local_state.value.story_id
+        student_id = global_state.value.student.id
+        from_db = global_state.value.update_db and not self.is_educator
+
+        if from_db:
+            session = self.request_session
+            bootstrap.fetch(
+                "story_state",
+                session.get,
+                f"{self.API_URL}/story-state/{student_id}/{story_id}",
+            )
+            bootstrap.fetch(
+                "measurements",
+                session.get,
+                f"{self.API_URL}/{story_id}/measurements/{student_id}",
+            )
+            bootstrap.fetch(
+                "sample_measurements",
+                session.get,
+                f"{self.API_URL}/{story_id}/sample-measurements/{student_id}",
+            )
+
+            story_json = bootstrap.result("story_state").json().get("state", None)
+        else:
+            logger.info("Skipping retrieval of state and measurements.")
+            story_json = self._default_story_json(global_state)
+
+        # The stored state replaces the app and story states wholesale, so it
+        #  has to be applied before any of the measurements
+        with bootstrap.phase("story_state"):
+            if story_json is None:
+                logger.error(
+                    f"Failed to retrieve state for story {story_id} "
+                    f"for user {student_id}."
+                )
+            else:
+                self._set_app_story_states(
+                    story_json, student_id, global_state, local_state
+                )
+
+        if not from_db:
+            Ref(local_state.fields.measurements_loaded).set(True)
+
+            with bootstrap.phase("sample_measurements"):
+                self._load_sample_measurements(
+                    {"measurements": []}, global_state, local_state, bootstrap
+                )
+            return
+
+        for name, r in bootstrap.as_completed("measurements", "sample_measurements"):
+            with bootstrap.phase(name):
+                if name == "measurements":
+                    measurements = self._set_measurements(r, local_state)
+
+                    if r.status_code == 200:
+                        self._mark_uploaded(global_state, local_state, measurements)
+                else:
+                    self._load_sample_measurements(
+                        r.json(), global_state, local_state, bootstrap
+                    )
+
+    def _load_sample_measurements(
+        self,
+        sample_measurement_json: dict,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+        bootstrap: Bootstrap,
+    ):
+        sample_gal_data = None
+        if len(sample_measurement_json["measurements"]) < 2:
+            with bootstrap.phase("sample_galaxy"):
+                sample_gal_data = self.get_sample_galaxy(local_state)
+
+        self._set_sample_measurements(
+            sample_measurement_json, sample_gal_data, global_state, local_state
+        )
+
     def get_galaxies(self, local_state: Reactive[StoryState]) -> list[GalaxyData]:
-        galaxy_data_json = self.request_session.get(
-            f"{self.API_URL}/{local_state.value.story_id}/galaxies?types=Sp"
-        ).json()
+        return self.get_galaxy_catalog(local_state).galaxies
 
-        galaxy_data = [GalaxyData(**x) for x in galaxy_data_json]
+    async def get_galaxies_async(
+        self, local_state: Reactive[StoryState]
+    ) -> list[GalaxyData]:
+        return (await self.get_galaxy_catalog_async(local_state)).galaxies
 
-        return galaxy_data
+    def get_galaxy_catalog(self, local_state: Reactive[StoryState]) -> GalaxyCatalog:
+        story_id = local_state.value.story_id
+
+        def _fetch():
+            galaxy_data_json = self.coalesced_get(
+                f"{self.API_URL}/{story_id}/galaxies?types=Sp"
+            ).json()
+
+            return GalaxyCatalog(GalaxyData(**x) for x in galaxy_data_json)
+
+        return GALAXY_CATALOGS.get_or_set((story_id,), _fetch)
+
+    async def get_galaxy_catalog_async(
+        self, local_state: Reactive[StoryState]
+    ) -> GalaxyCatalog:
+        story_id = local_state.value.story_id
+
+        async def _fetch():
+            r = await self.coalesced_get_async(
+                f"{self.API_URL}/{story_id}/galaxies?types=Sp"
+            )
+
+            return GalaxyCatalog(GalaxyData(**x) for x in r.json())
+
+        return await GALAXY_CATALOGS.get_or_set_async((story_id,), _fetch)
+
+    @staticmethod
+    def invalidate_class_data(story_id: str, class_id: int | None):
+        """
+        Drops the cached class-wide datasets for the given class, e.g. after
+        one of its students has submitted new measurements.
+        """
+        CLASS_DATA_CACHE.invalidate(story_id, class_id)
+        for dataset in ("all_data", "all_data_columns"):
+            CLASS_DATA_CACHE.invalidate(story_id, None, dataset)
 
     def load_spectrum_data(
         self, local_state: Reactive[StoryState], gal_data: GalaxyData
     ) -> SpectrumData | None:
+        return self.fetch_spectrum_data(local_state.value.story_id, gal_data)
+
+    def fetch_spectrum_data(
+        self, story_id: str, gal_data: GalaxyData
+    ) -> SpectrumData | None:
+        """
+        Like `load_spectrum_data`, but without reading any reactive state, so
+        that it can be called from outside the session (e.g. to prefetch).
+        """
+        if SPECTRUM_BUNDLE is not None and gal_data in SPECTRUM_BUNDLE:
+            return SPECTRUM_BUNDLE.get(gal_data)
+
+        spec_data = SPECTRUM_CACHE.get(story_id, gal_data.name)
+
+        if spec_data is None:
+            spec_data = self.download_spectrum_data(story_id, gal_data)
+
+            if spec_data is not None:
+                SPECTRUM_CACHE.set(story_id, spec_data)
+
+        return spec_data
+
+    def download_spectrum_data(
+        self, story_id: str, gal_data: GalaxyData
+    ) -> SpectrumData | None:
+        """Downloads the spectrum from the API, bypassing the bundle and caches."""
+        response = self.coalesced_get(self._spectrum_url(story_id, gal_data))
+
+        return self._parse_spectrum_data(response.content, gal_data)
+
+    async def load_spectrum_data_async(
+        self, local_state: Reactive[StoryState], gal_data: GalaxyData
+    ) -> SpectrumData | None:
+        story_id = local_state.value.story_id
+
+        if SPECTRUM_BUNDLE is not None and gal_data in SPECTRUM_BUNDLE:
+            return SPECTRUM_BUNDLE.get(gal_data)
+
+        spec_data = SPECTRUM_CACHE.get(story_id, gal_data.name)
+
+        if spec_data is None:
+            url = self._spectrum_url(story_id, gal_data)
+            response = await self.coalesced_get_async(url)
+            spec_data = self._parse_spectrum_data(response.content, gal_data)
+
+            if spec_data is not None:
+                SPECTRUM_CACHE.set(story_id, spec_data)
+
+        return spec_data
+
+    def _spectrum_url(self, story_id: str, gal_data: GalaxyData) -> str:
         file_name = f"{gal_data.name.replace('.fits', '')}.fits"
 
         type_folders = {"Sp": "spiral", "E": "elliptical", "Ir": "irregular"}
         folder = type_folders[gal_data.type]
-        url = (
-            f"{self.API_URL}/{local_state.value.story_id}/spectra/{folder}/{file_name}"
-        )
-        response = self.request_session.get(url)
 
-        with closing(BytesIO(response.content)) as f:
-            f.name = gal_data.name
+        return f"{self.API_URL}/{story_id}/spectra/{folder}/{file_name}"
 
-            with fits.open(f) as hdulist:
-                data = hdulist["COADD"].data if "COADD" in hdulist else None
+    @staticmethod
+    def _parse_spectrum_data(
+        content: bytes, gal_data: GalaxyData
+    ) -> SpectrumData | None:
+        data = read_coadd(content)
+
+        # Spectra outside the known layout go through astropy instead
+        if data is None or not COADD_COLUMNS <= set(data.dtype.names):
+            with closing(BytesIO(content)) as f:
+                f.name = gal_data.name
+
+                with fits.open(f) as hdulist:
+                    data = hdulist["COADD"].data if "COADD" in hdulist else None
 
         if data is None:
             logger.error("No extension named 'COADD' in spectrum file.")
             return
 
-        spec_data = SpectrumData(
-            name=gal_data.name,
+        spec_data = SpectrumData.from_arrays(
+            gal_data.name,
             wave=10 ** data["loglam"],
             flux=data["flux"],
             ivar=data["ivar"],
+            dtype=SPECTRUM_DTYPE,
         )
 
         logger.info("Loaded spectrum data for galaxy `%s` from database.", gal_data.id)
@@ -111,18 +379,43 @@ class LocalAPI(BaseAPI):
             return []
 
         r = self.request_session.get(url)
+        measurements = self._set_measurements(r, local_state)
 
-        measurements = Ref(local_state.fields.measurements)
         if r.status_code == 200:
-            measurement_json = r.json()
+            self._mark_uploaded(global_state, local_state, measurements)
 
-            parsed_measurements = []
+        return measurements
 
-            for measurement in measurement_json["measurements"]:
-                measurement = StudentMeasurement(**measurement)
-                parsed_measurements.append(measurement)
+    async def get_measurements_async(
+        self,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+    ) -> list[StudentMeasurement]:
+        url = (
+            f"{self.API_URL}/{local_state.value.story_id}/measurements/"
+            f"{global_state.value.student.id}"
+        )
+        if not global_state.value.update_db or await self.is_educator_async():
+            Ref(local_state.fields.measurements_loaded).set(True)
+            logger.info("Skipping retrieval of measurements from database.")
+            return []
 
-            measurements.set(parsed_measurements)
+        r = await self.async_session.get(url)
+        measurements = self._set_measurements(r, local_state)
+
+        if r.status_code == 200:
+            self._mark_uploaded(global_state, local_state, measurements)
+
+        return measurements
+
+    @staticmethod
+    def _set_measurements(
+        r, local_state: Reactive[StoryState]
+    ) -> list[StudentMeasurement]:
+        measurements = Ref(local_state.fields.measurements)
+        if r.status_code == 200:
+            payload = MEASUREMENTS_PAYLOAD.validate_json(r.content)
+            measurements.set(payload["measurements"])
 
         Ref(local_state.fields.measurements_loaded).set(True)
 
@@ -146,13 +439,53 @@ class LocalAPI(BaseAPI):
 
             sample_measurement_json = r.json()
 
+        sample_gal_data = None
+        if len(sample_measurement_json["measurements"]) < 2:
+            sample_gal_data = LOCAL_API.get_sample_galaxy(local_state)
+
+        return self._set_sample_measurements(
+            sample_measurement_json, sample_gal_data, global_state, local_state
+        )
+
+    async def get_sample_measurements_async(
+        self,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+    ) -> list[StudentMeasurement]:
+
+        if not global_state.value.update_db or await self.is_educator_async():
+            sample_measurement_json = {"measurements": []}
+        else:
+            r = await self.async_session.get(
+                f"{self.API_URL}/{local_state.value.story_id}/sample-"
+                f"measurements/{global_state.value.student.id}"
+            )
+
+            sample_measurement_json = r.json()
+
+        sample_gal_data = None
+        if len(sample_measurement_json["measurements"]) < 2:
+            sample_gal_data = await LOCAL_API.get_sample_galaxy_async(local_state)
+
+        return self._set_sample_measurements(
+            sample_measurement_json, sample_gal_data, global_state, local_state
+        )
+
+    def _set_sample_measurements(
+        self,
+        sample_measurement_json: dict,
+        sample_gal_data: GalaxyData | None,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+    ) -> list[StudentMeasurement]:
+        n_loaded = len(sample_measurement_json["measurements"])
+
         if len(sample_measurement_json["measurements"]) == 0:
             logger.info(
                 "Failed to find sample galaxies for user `%s`: creating new "
                 "sample measurement.",
                 global_state.value.student.id,
             )
-            sample_gal_data = LOCAL_API.get_sample_galaxy(local_state)
             for meas in ["first", "second"]:
                 sample_measurement_json["measurements"].append(
                     StudentMeasurement(
@@ -165,7 +498,6 @@ class LocalAPI(BaseAPI):
             logger.info(
                 "Example measurements only had the first. Creating missing second measurement"
             )
-            sample_gal_data = LOCAL_API.get_sample_galaxy(local_state)
             sample_measurement_json["measurements"].append(
                 StudentMeasurement(
                     student_id=global_state.value.student.id,
@@ -183,6 +515,14 @@ class LocalAPI(BaseAPI):
 
         sample_measurements.set(parsed_sample_measurements)
 
+        # Only the measurements created here still need uploading
+        self._mark_uploaded(
+            global_state,
+            local_state,
+            parsed_sample_measurements[:n_loaded],
+            sample=True,
+        )
+
         logger.info("Loaded example measurements from database.")
 
         return sample_measurements.value
@@ -197,20 +537,36 @@ class LocalAPI(BaseAPI):
             logger.info("Skipping DB write")
             return False
 
-        url = f"{self.API_URL}/{local_state.value.story_id}/submit-measurement/"
+        key, rows = self._dirty_measurements(global_state, local_state)
+        statuses = self._submit_measurements(local_state.value.story_id, rows)
+        self._record_uploads(key, rows, statuses, global_state)
 
-        for measurement in local_state.value.measurements:
-            r = self.request_session.put(url, json=measurement.dict(exclude={"galaxy"}))
+        logger.info(
+            "Stored %d changed measurements for student `%s`.",
+            sum(statuses),
+            global_state.value.student.id,
+        )
+        return True
 
-            if r.status_code != 200:
-                logger.warning(
-                    f"Failed to add measurement for galaxy `%s` by student `%s`.",
-                    global_state.value.student.id,
-                    measurement.galaxy_id,
-                )
+    async def put_measurements_async(
+        self,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+    ):
+
+        if not global_state.value.update_db or await self.is_educator_async():
+            logger.info("Skipping DB write")
+            return False
+
+        key, rows = self._dirty_measurements(global_state, local_state)
+        statuses = await self._submit_measurements_async(
+            local_state.value.story_id, rows
+        )
+        self._record_uploads(key, rows, statuses, global_state)
 
         logger.info(
-            "Stored measurements for student `%s`.",
+            "Stored %d changed measurements for student `%s`.",
+            sum(statuses),
             global_state.value.student.id,
         )
         return True
@@ -222,30 +578,198 @@ class LocalAPI(BaseAPI):
             logger.info("Skipping DB write")
             return False
 
-        url = f"{self.API_URL}/{local_state.value.story_id}/sample-measurement/"
+        key, rows = self._dirty_measurements(global_state, local_state, sample=True)
+        statuses = self._submit_measurements(
+            local_state.value.story_id, rows, sample=True
+        )
+        self._record_uploads(key, rows, statuses, global_state)
 
-        for i, measurement in enumerate(local_state.value.example_measurements):
-            if i == 0:
-                logger.info(
-                    f"Adding example measurement for galaxy `%s` by student `%s`.",
-                    measurement.galaxy_id,
-                    global_state.value.student.id,
-                )
+        logger.info(
+            "Stored %d changed example measurements for student %s.",
+            sum(statuses),
+            global_state.value.student.id,
+        )
+        return True
+
+    async def put_sample_measurements_async(
+        self, global_state: Reactive[AppState], local_state: Reactive[StoryState]
+    ):
+        if not global_state.value.update_db or await self.is_educator_async():
+            logger.info("Skipping DB write")
+            return False
 
-            r = self.request_session.put(url, json=measurement.dict(exclude={"galaxy"}))
+        key, rows = self._dirty_measurements(global_state, local_state, sample=True)
+        statuses = await self._submit_measurements_async(
+            local_state.value.story_id, rows, sample=True
+        )
+        self._record_uploads(key, rows, statuses, global_state)
 
-            if r.status_code != 200:
+        logger.info(
+            "Stored %d changed example measurements for student %s.",
+            sum(statuses),
+            global_state.value.student.id,
+        )
+        return True
+
+    @cached_property
+    def _bulk_submit_unsupported(self) -> set[str]:
+        return set()
+
+    @staticmethod
+    def _measurement_row(measurement: StudentMeasurement, sample: bool):
+        row_key = (
+            (measurement.galaxy_id, measurement.measurement_number)
+            if sample
+            else measurement.galaxy_id
+        )
+        return row_key, hash(measurement.model_dump_json(exclude={"galaxy"}))
+
+    def _dirty_measurements(
+        self,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+        sample: bool = False,
+    ) -> tuple[tuple, list[tuple]]:
+        """
+        Returns the upload key for the student, and the `(row key,
+        fingerprint, measurement)` rows that changed since they were last
+        uploaded successfully.
+        """
+        story_id = local_state.value.story_id
+        key = (story_id, global_state.value.student.id, sample)
+        uploaded = UPLOADED_MEASUREMENTS.get(key, {})
+        measurements = (
+            local_state.value.example_measurements
+            if sample
+            else local_state.value.measurements
+        )
+
+        rows = []
+        for measurement in measurements:
+            row_key, fingerprint = self._measurement_row(measurement, sample)
+            if uploaded.get(row_key) != fingerprint:
+                rows.append((row_key, fingerprint, measurement))
+
+        return key, rows
+
+    def _mark_uploaded(
+        self,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+        measurements: list[StudentMeasurement],
+        sample: bool = False,
+    ):
+        # Measurements just loaded from the database don't need uploading
+        key = (local_state.value.story_id, global_state.value.student.id, sample)
+        UPLOADED_MEASUREMENTS.set(
+            key, dict(self._measurement_row(m, sample) for m in measurements)
+        )
+
+    def _measurement_urls(self, story_id: str, sample: bool) -> tuple[str, str]:
+        if sample:
+            return (
+                f"{self.API_URL}/{story_id}/sample-measurement/",
+                f"{self.API_URL}/{story_id}/submit-sample-measurements/",
+            )
+
+        return (
+            f"{self.API_URL}/{story_id}/submit-measurement/",
+            f"{self.API_URL}/{story_id}/submit-measurements/",
+        )
+
+    def _parse_bulk_statuses(self, r, url: str, n_rows: int) -> list[bool] | None:
+        """
+        Returns the per-row upload statuses from a bulk submission, or `None`
+        if the server has no bulk endpoint and rows must be sent one by one.
+        """
+        if r.status_code in (404, 405):
+            logger.info("Bulk measurement endpoint `%s` unavailable.", url)
+            self._bulk_submit_unsupported.add(url)
+            return None
+
+        if r.status_code != 200:
+            return [False] * n_rows
+
+        results = r.json().get("results", [])
+
+        if len(results) != n_rows:
+            return [False] * n_rows
+
+        return [bool(result.get("success")) for result in results]
+
+    def _submit_measurements(
+        self, story_id: str, rows: list[tuple], sample: bool = False
+    ) -> list[bool]:
+        if not rows:
+            return []
+
+        url, bulk_url = self._measurement_urls(story_id, sample)
+        payloads = [m.model_dump(exclude={"galaxy"}) for _, _, m in rows]
+
+        if bulk_url not in self._bulk_submit_unsupported:
+            r = self.request_session.put(bulk_url, json={"measurements": payloads})
+            statuses = self._parse_bulk_statuses(r, bulk_url, len(rows))
+
+            if statuses is not None:
+                return statuses
+
+        return [
+            self.request_session.put(url, json=payload).status_code == 200
+            for payload in payloads
+        ]
+
+    async def _submit_measurements_async(
+        self, story_id: str, rows: list[tuple], sample: bool = False
+    ) -> list[bool]:
+        if not rows:
+            return []
+
+        url, bulk_url = self._measurement_urls(story_id, sample)
+        payloads = [m.model_dump(exclude={"galaxy"}) for _, _, m in rows]
+
+        if bulk_url not in self._bulk_submit_unsupported:
+            r = await self.async_session.put(
+                bulk_url, json={"measurements": payloads}
+            )
+            statuses = self._parse_bulk_statuses(r, bulk_url, len(rows))
+
+            if statuses is not None:
+                return statuses
+
+        responses = await asyncio.gather(
+            *(self.async_session.put(url, json=payload) for payload in payloads)
+        )
+        return [r.status_code == 200 for r in responses]
+
+    def _record_uploads(
+        self,
+        key: tuple,
+        rows: list[tuple],
+        statuses: list[bool],
+        global_state: Reactive[AppState],
+    ):
+        """
+        Remembers which rows were uploaded, and invalidates the cached class
+        datasets whenever any of the student's measurements changed.
+        """
+        story_id, student_id, sample = key
+        uploaded = dict(UPLOADED_MEASUREMENTS.get(key, {}))
+
+        for (row_key, fingerprint, measurement), success in zip(rows, statuses):
+            if success:
+                uploaded[row_key] = fingerprint
+            else:
                 logger.warning(
-                    f"Failed to add example measurement for galaxy `%s` by student `%s`.",
+                    "Failed to add %smeasurement for galaxy `%s` by student `%s`.",
+                    "example " if sample else "",
                     measurement.galaxy_id,
-                    global_state.value.student.id,
+                    student_id,
                 )
 
-            logger.info(
-                "Stored example measurements for student %s.",
-                global_state.value.student.id,
-            )
-        return True
+        UPLOADED_MEASUREMENTS.set(key, uploaded)
+
+        if not sample and any(statuses):
+            self.invalidate_class_data(story_id, self._class_id(global_state))
 
     def get_measurement(
         self,
@@ -270,6 +794,29 @@ class LocalAPI(BaseAPI):
 
         return measurement
 
+    async def get_measurement_async(
+        self,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+        galaxy_id: int,
+    ) -> StudentMeasurement:
+        logger.info(
+            "Retrieving measurement of galaxy %s for student %s...",
+            (galaxy_id, global_state.value.student.id),
+        )
+        url = (
+            f"{self.API_URL}/{local_state.value.story_id}/measurements/"
+            f"{global_state.value.student.id}/{galaxy_id}"
+        )
+        r = await self.async_session.get(url)
+        measurement = r.json()["measurements"]
+
+        measurements = Ref(local_state.fields.measurements)
+
+        measurements.set(measurements.value + [measurement])
+
+        return measurement
+
     def get_sample_measurement(
         self,
         global_state: Reactive[AppState],
@@ -294,6 +841,30 @@ class LocalAPI(BaseAPI):
 
         return measurement
 
+    async def get_sample_measurement_async(
+        self,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+        galaxy_id: int,
+    ) -> StudentMeasurement:
+        logger.info(
+            "Retrieving sample measurement of galaxy %s for student %s...",
+            (galaxy_id, global_state.value.student.id),
+        )
+        url = (
+            f"{self.API_URL}/{local_state.value.story_id}/"
+            f"sample-measurements/{global_state.value.student.id}/"
+            f"{galaxy_id}"
+        )
+        r = await self.async_session.get(url)
+        measurement = r.json()["measurements"]
+
+        measurements = Ref(local_state.fields.measurements)
+
+        measurements.set(measurements.value + [measurement])
+
+        return measurement
+
     def delete_all_measurements(
         self,
         global_state: Reactive[AppState],
@@ -308,8 +879,7 @@ class LocalAPI(BaseAPI):
 
         for measurement in measurements_json["measurements"]:
             # url = url + "/first" if samples else url + f"/{measurement['galaxy']['id']}"
-            url += f"/{measurement['galaxy']['id']}"
-            r = self.request_session.delete(url)
+            r = self.request_session.delete(f"{url}/{measurement['galaxy']['id']}")
 
             if r.status_code != 200:
                 logger.error(
@@ -331,6 +901,16 @@ class LocalAPI(BaseAPI):
 
         return galaxy_data
 
+    async def get_sample_galaxy_async(
+        self,
+        local_state: Reactive[StoryState],
+    ) -> GalaxyData:
+        r = await self.async_session.get(
+            f"{self.API_URL}/{local_state.value.story_id}/sample-galaxy"
+        )
+
+        return GalaxyData(**r.json())
+
     def get_class_measurements(
         self,
         global_state: Reactive[AppState],
@@ -341,17 +921,56 @@ class LocalAPI(BaseAPI):
             f"{global_state.value.student.id}/{global_state.value.classroom.class_info['id']}"
             f"?complete_only=true"
         )
-        r = self.request_session.get(url)
-        measurement_json = r.json()
+        key = (local_state.value.story_id, self._class_id(global_state), "class")
 
-        measurements = Ref(local_state.fields.class_measurements)
-        parsed_measurements = []
+        parsed = CLASS_DATA_CACHE.get_or_set(
+            key,
+            lambda: self._parse_class_measurements(
+                self.coalesced_get(url, global_state.value.student.id).content
+            ),
+        )
 
-        for measurement in measurement_json["measurements"]:
-            measurement = StudentMeasurement(**measurement)
-            parsed_measurements.append(measurement)
+        return self._set_class_measurements(parsed, local_state)
 
-        measurements.set(parsed_measurements)
+    async def get_class_measurements_async(
+        self,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+    ) -> list[StudentMeasurement]:
+        url = (
+            f"{self.API_URL}/{local_state.value.story_id}/class-measurements/"
+            f"{global_state.value.student.id}/{global_state.value.classroom.class_info['id']}"
+            f"?complete_only=true"
+        )
+        key = (local_state.value.story_id, self._class_id(global_state), "class")
+
+        async def _fetch():
+            r = await self.coalesced_get_async(url, global_state.value.student.id)
+            return self._parse_class_measurements(r.content)
+
+        parsed = await CLASS_DATA_CACHE.get_or_set_async(key, _fetch)
+
+        return self._set_class_measurements(parsed, local_state)
+
+    @staticmethod
+    def _class_id(global_state: Reactive[AppState]) -> int | None:
+        class_info = global_state.value.classroom.class_info
+        return class_info.get("id") if class_info else None
+
+    @staticmethod
+    def _parse_class_measurements(content: bytes) -> list[StudentMeasurement]:
+        return MEASUREMENTS_PAYLOAD.validate_json(content)["measurements"]
+
+    @staticmethod
+    def _set_class_measurements(
+        parsed_measurements: list[StudentMeasurement],
+        local_state: Reactive[StoryState],
+    ) -> list[StudentMeasurement]:
+        measurements = Ref(local_state.fields.class_measurements)
+
+        # The parsed models are shared between sessions; give each session
+        #  its own list so that in-place edits don't leak across sessions.
+        measurements.set(list(parsed_measurements))
 
         logger.info("Loaded class measurements from database.")
 
@@ -372,7 +991,26 @@ class LocalAPI(BaseAPI):
             f"{self.API_URL}/{local_state.value.story_id}/class-measurements/students-completed/"
             f"{global_state.value.student.id}/{global_state.value.classroom.class_info['id']}"
         )
-        r = self.request_session.get(url)
+        r = self.coalesced_get(url, global_state.value.student.id)
+        # TODO: Handle non-200 status codes
+        return r.json()["students_completed_measurements"]
+
+    async def get_students_completed_measurements_count_async(
+        self,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+    ) -> int:
+        if (
+            global_state.value.classroom.class_info is None
+            or "id" not in global_state.value.classroom.class_info
+        ):
+            logger.warning("No class id found in classroom info.")
+            return 0
+        url = (
+            f"{self.API_URL}/{local_state.value.story_id}/class-measurements/students-completed/"
+            f"{global_state.value.student.id}/{global_state.value.classroom.class_info['id']}"
+        )
+        r = await self.coalesced_get_async(url, global_state.value.student.id)
         # TODO: Handle non-200 status codes
         return r.json()["students_completed_measurements"]
 
@@ -380,42 +1018,113 @@ class LocalAPI(BaseAPI):
         self,
         global_state: Reactive[AppState],
         local_state: Reactive[StoryState],
-    ) -> tuple[list[StudentMeasurement], list[StudentSummary], list[ClassSummary]]:
+        columnar: bool = False,
+    ) -> tuple[
+        list[StudentMeasurement] | MeasurementTable,
+        list[StudentSummary],
+        list[ClassSummary],
+    ]:
+        """
+        Returns the measurements and summaries of every class, or of the
+        student's class if they're in one. If `columnar`, the measurements
+        are returned as a `MeasurementTable` rather than as models, and aren't
+        set on `local_state`.
+        """
+        url = self._all_data_url(global_state, local_state)
+        dataset = "all_data_columns" if columnar else "all_data"
+        key = (local_state.value.story_id, self._class_id(global_state), dataset)
+
+        parsed = CLASS_DATA_CACHE.get_or_set(
+            key,
+            lambda: self._parse_all_data(self.coalesced_get(url).content, columnar),
+        )
+
+        return self._set_all_data(parsed, local_state, columnar)
+
+    async def get_all_data_async(
+        self,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+        columnar: bool = False,
+    ) -> tuple[
+        list[StudentMeasurement] | MeasurementTable,
+        list[StudentSummary],
+        list[ClassSummary],
+    ]:
+        url = self._all_data_url(global_state, local_state)
+        dataset = "all_data_columns" if columnar else "all_data"
+        key = (local_state.value.story_id, self._class_id(global_state), dataset)
+
+        async def _fetch():
+            r = await self.coalesced_get_async(url)
+            return self._parse_all_data(r.content, columnar)
+
+        parsed = await CLASS_DATA_CACHE.get_or_set_async(key, _fetch)
+
+        return self._set_all_data(parsed, local_state, columnar)
+
+    def _all_data_url(
+        self, global_state: Reactive[AppState], local_state: Reactive[StoryState]
+    ) -> str:
         url = f"{self.API_URL}/{local_state.value.story_id}/all-data?minimal=True"
         if global_state.value.classroom.class_info is not None:
             url += f"&class_id={global_state.value.classroom.class_info['id']}"
-        r = self.request_session.get(url)
-        res_json = r.json()
+        return url
 
-        measurements = Ref(local_state.fields.all_measurements)
-        parsed_measurements = []
-        for measurement in res_json["measurements"]:
-            if measurement["class_id"] is None:
-                continue
-            measurement = StudentMeasurement(**measurement)
-            parsed_measurements.append(measurement)
+    @staticmethod
+    def _parse_all_data(
+        content: bytes, columnar: bool = False
+    ) -> tuple[
+        list[StudentMeasurement] | MeasurementTable,
+        list[StudentSummary],
+        list[ClassSummary],
+    ]:
+        if columnar:
+            payload = ALL_DATA_ROWS.validate_json(content)
+            measurements = MeasurementTable.from_rows(
+                m for m in payload["measurements"] if m.get("class_id") is not None
+            )
+        else:
+            payload = ALL_DATA_PAYLOAD.validate_json(content)
+            measurements = [
+                m for m in payload["measurements"] if m.class_id is not None
+            ]
 
-        measurements.set(parsed_measurements)
+        return measurements, payload["studentData"], payload["classData"]
 
-        student_summaries = Ref(local_state.fields.student_summaries)
-        parsed_student_summaries = []
-        for summary in res_json["studentData"]:
-            summary = StudentSummary(**summary)
-            parsed_student_summaries.append(summary)
+    @staticmethod
+    def _set_all_data(
+        parsed: tuple[
+            list[StudentMeasurement] | MeasurementTable,
+            list[StudentSummary],
+            list[ClassSummary],
+        ],
+        local_state: Reactive[StoryState],
+        columnar: bool = False,
+    ) -> tuple[
+        list[StudentMeasurement] | MeasurementTable,
+        list[StudentSummary],
+        list[ClassSummary],
+    ]:
+        parsed_measurements, parsed_student_summaries, parsed_class_summaries = parsed
+
+        if columnar:
+            # The table is shared between sessions, and must not be modified
+            measurements = parsed_measurements
+        else:
+            all_measurements = Ref(local_state.fields.all_measurements)
+            all_measurements.set(list(parsed_measurements))
+            measurements = all_measurements.value
 
-        student_summaries.set(parsed_student_summaries)
+        student_summaries = Ref(local_state.fields.student_summaries)
+        student_summaries.set(list(parsed_student_summaries))
 
         class_summaries = Ref(local_state.fields.class_summaries)
-        parsed_class_summaries = []
-        for summary in res_json["classData"]:
-            summary = ClassSummary(**summary)
-            parsed_class_summaries.append(summary)
-
-        class_summaries.set(parsed_class_summaries)
+        class_summaries.set(list(parsed_class_summaries))
 
         logger.info("Loaded all measurements and summary data from database.")
 
-        return measurements.value, student_summaries.value, class_summaries.value
+        return measurements, student_summaries.value, class_summaries.value
 
     def put_stage_state(
         self,
@@ -429,17 +1138,67 @@ class LocalAPI(BaseAPI):
 
         logger.info("Serializing stage state into DB.")
 
+        r = self.request_session.put(
+            f"{self.API_URL}/stage-state/{global_state.value.student.id}/"
+            f"{local_state.value.story_id}/{component_state.value.stage_id}",
+            json=self._stage_state_dict(component_state),
+        )
+
+        if r.status_code != 200:
+            logger.error("Failed to write story state to database.")
+            logger.error(r.text)
+            return False
+
+        return True
+
+    async def put_stage_state_async(
+        self,
+        global_state: Reactive[AppState],
+        local_state: Reactive[StoryState],
+        component_state: Reactive[BaseStageState],
+    ):
+        if not global_state.value.update_db or await self.is_educator_async():
+            logger.info("Skipping DB write")
+            return False
+
+        logger.info("Serializing stage state into DB.")
+
+        r = await self.async_session.put(
+            f"{self.API_URL}/stage-state/{global_state.value.student.id}/"
+            f"{local_state.value.story_id}/{component_state.value.stage_id}",
+            json=self._stage_state_dict(component_state),
+        )
+
+        if r.status_code != 200:
+            logger.error("Failed to write story state to database.")
+            logger.error(r.text)
+            return False
+
+        return True
+
+    @staticmethod
+    def _stage_state_dict(component_state: Reactive[BaseStageState]) -> dict:
         comp_state_dict = component_state.value.dict(
             exclude={"selected_galaxy", "selected_example_galaxy"}
         )
         comp_state_dict.update(
             {"current_step": component_state.value.current_step.value}
         )
+        return comp_state_dict
+
+    def put_story_state(
+        self, global_state: Reactive[AppState], local_state: Reactive[StoryState]
+    ):
+        if not global_state.value.update_db or self.is_educator:
+            logger.info("Skipping DB write")
+            return False
+
+        logger.info("Serializing state into DB.")
 
         r = self.request_session.put(
-            f"{self.API_URL}/stage-state/{global_state.value.student.id}/"
-            f"{local_state.value.story_id}/{component_state.value.stage_id}",
-            json=comp_state_dict,
+            f"{self.API_URL}/story-state/{global_state.value.student.id}/{local_state.value.story_id}",
+            headers={"Content-Type": "application/json"},
+            data=self._story_state_json(global_state),
         )
 
         if r.status_code != 200:
@@ -449,26 +1208,19 @@ class LocalAPI(BaseAPI):
 
         return True
 
-    def put_story_state(
+    async def put_story_state_async(
         self, global_state: Reactive[AppState], local_state: Reactive[StoryState]
     ):
-        if not global_state.value.update_db or self.is_educator:
+        if not global_state.value.update_db or await self.is_educator_async():
             logger.info("Skipping DB write")
             return False
 
         logger.info("Serializing state into DB.")
 
-        state = {
-            "app": global_state.value.model_dump(
-                exclude={"story_state": global_state.value.story_state.excluded_fields}
-            ),
-        }
-
-        state_json = json.dumps(state, cls=CDSJSONEncoder)
-        r = self.request_session.put(
+        r = await self.async_session.put(
             f"{self.API_URL}/story-state/{global_state.value.student.id}/{local_state.value.story_id}",
             headers={"Content-Type": "application/json"},
-            data=state_json,
+            content=self._story_state_json(global_state),
         )
 
         if r.status_code != 200:
@@ -478,6 +1230,16 @@ class LocalAPI(BaseAPI):
 
         return True
 
+    @staticmethod
+    def _story_state_json(global_state: Reactive[AppState]) -> str:
+        state = {
+            "app": global_state.value.model_dump(
+                exclude={"story_state": global_state.value.story_state.excluded_fields}
+            ),
+        }
+
+        return json.dumps(state, cls=CDSJSONEncoder)
+
     def get_example_seed_measurement(self, which="both") -> list[dict[str, Any]]:
         # url = f"{self.API_URL}/{local_state.value.story_id}/sample-measurements"
         # r = self.request_session.get(url)
@@ -512,5 +1274,12 @@ class LocalAPI(BaseAPI):
     ):
         super().ignore_student_for_story("hubbles_law", student_id, ignore)
 
+    async def ignore_student_async(
+        self,
+        student_id: Optional[int] = None,
+        ignore: bool = True,
+    ):
+        await super().ignore_student_for_story_async("hubbles_law", student_id, ignore)
+
 
 LOCAL_API = LocalAPI()
@@ -6,6 +6,9 @@ from solara.server import settings
 
 import solara.server.starlette
 
+from . import wwt_proxy
+from .utils import ASSETS
+
 
 def root(request: Request):
     return JSONResponse({"Error Message": "Go back whence ye came."})
@@ -13,7 +16,11 @@ def root(request: Request):
 
 routes = [
     Route("/", endpoint=root),
+    ASSETS.mount("/hubbles-law"),
     Mount("/hubbles-law/", routes=solara.server.starlette.routes),
 ]
 
+if wwt_proxy.WWT_PROXY_URL:
+    routes.insert(2, Mount("/wwt/", routes=wwt_proxy.routes))
+
 app = Starlette(routes=routes, middleware=solara.server.starlette.middleware)
@@ -0,0 +1,138 @@
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from cds_core.logger import setup_logger
+from .story_state import GalaxyData, SpectrumData
+
+logger = setup_logger("SPECTRUM BUNDLE")
+
+SPECTRUM_BUNDLE_PATH = os.getenv(
+    "CDS_SPECTRUM_BUNDLE", str(Path(__file__).parent / "data" / "spectra.bundle")
+)
+
+_MAGIC = b"CDSSPEC1"
+_PREAMBLE = struct.Struct("<8sQ")
+_ALIGNMENT = 64
+_ARRAYS = ("wave", "flux", "ivar")
+
+
+class SpectrumBundle:
+    """
+    A read-only archive of every galaxy spectrum of the story, built with
+    ``cds-app build-spectra``.
+
+    The file holds a JSON index, mapping each galaxy id to its name and to
+    the range of samples it occupies, followed by the `wave`, `flux` and
+    `ivar` samples of all galaxies, one after another. The samples are
+    memory-mapped, so spectra are read without copying, and every server
+    process shares the same pages through the OS page cache.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+        with open(self.path, "rb") as f:
+            magic, header_size = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+
+            if magic != _MAGIC:
+                raise ValueError(f"`{self.path}` is not a spectrum bundle.")
+
+            header = json.loads(f.read(header_size))
+
+        self.index: dict[int, tuple[int, int, str]] = {
+            int(gal_id): (start, stop, name)
+            for gal_id, (start, stop, name) in header["galaxies"].items()
+        }
+        self._samples = np.memmap(
+            self.path,
+            dtype=np.dtype(header["dtype"]),
+            mode="r",
+            offset=_data_offset(header_size),
+            shape=(len(_ARRAYS), header["samples"]),
+        )
+
+    @classmethod
+    def open(cls, path: str | Path) -> "SpectrumBundle | None":
+        """Opens the bundle at `path`, or returns `None` if there is none."""
+        if not Path(path).exists():
+            return None
+
+        try:
+            bundle = cls(path)
+        except Exception:
+            logger.exception("Failed to open spectrum bundle `%s`.", path)
+            return None
+
+        logger.info("Opened bundle of %d spectra at `%s`.", len(bundle), path)
+
+        return bundle
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, gal_data: GalaxyData) -> bool:
+        entry = self.index.get(gal_data.id)
+        return entry is not None and entry[2] == gal_data.name
+
+    def get(self, gal_data: GalaxyData) -> SpectrumData | None:
+        if gal_data not in self:
+            return None
+
+        start, stop, _ = self.index[gal_data.id]
+        wave, flux, ivar = self._samples[:, start:stop]
+
+        return SpectrumData(name=gal_data.name, wave=wave, flux=flux, ivar=ivar)
+
+
+def _data_offset(header_size: int) -> int:
+    end = _PREAMBLE.size + header_size
+    return -(-end // _ALIGNMENT) * _ALIGNMENT
+
+
+def write_bundle(
+    path: str | Path,
+    spectra: Iterable[tuple[GalaxyData, SpectrumData]],
+    dtype: str = "<f4",
+) -> int:
+    """
+    Writes the given spectra to a `SpectrumBundle` at `path`, replacing any
+    existing bundle atomically. Returns the number of spectra written.
+    """
+    path = Path(path)
+    spectra = list(spectra)
+
+    galaxies = {}
+    start = 0
+    for gal_data, spec_data in spectra:
+        stop = start + len(spec_data.wave)
+        galaxies[str(gal_data.id)] = (start, stop, gal_data.name)
+        start = stop
+
+    header = json.dumps(
+        {"dtype": np.dtype(dtype).str, "samples": start, "galaxies": galaxies}
+    ).encode()
+    data_offset = _data_offset(len(header))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as f:
+        f.write(_PREAMBLE.pack(_MAGIC, len(header)))
+        f.write(header)
+        f.write(b"\0" * (data_offset - _PREAMBLE.size - len(header)))
+
+        for array in _ARRAYS:
+            for _, spec_data in spectra:
+                f.write(np.asarray(getattr(spec_data, array), dtype=dtype).tobytes())
+
+    os.replace(f.name, path)
+
+    return len(spectra)
+
+
+SPECTRUM_BUNDLE = SpectrumBundle.open(SPECTRUM_BUNDLE_PATH)
@@ -0,0 +1,141 @@
+import os
+import tempfile
+from pathlib import Path
+from threading import Lock
+
+from cds_core.cache import SizedLRUCache
+from cds_core.logger import setup_logger
+from .story_state import SpectrumData
+
+logger = setup_logger("SPECTRUM CACHE")
+
+SPECTRUM_CACHE_BYTES = int(os.getenv("CDS_SPECTRUM_CACHE_BYTES", str(64 * 2**20)))
+SPECTRUM_CACHE_DIR = os.getenv(
+    "CDS_SPECTRUM_CACHE_DIR", str(Path(tempfile.gettempdir()) / "cds-spectra")
+)
+
+
+class SpectrumDiskStore:
+    """
+    Decoded spectra stored on disk, as one file per galaxy (in the format of
+    `SpectrumData.dumps`), under a folder per story.
+    With no `directory`, nothing is stored.
+    """
+
+    def __init__(self, directory: str | None):
+        self.directory = Path(directory) if directory else None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = Lock()
+
+    def _path(self, story_id: str, name: str) -> Path:
+        file_name = name.replace(".fits", "").replace(os.sep, "_")
+        return self.directory / story_id / f"{file_name}.npz"
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return self.directory is not None and self._path(*key).exists()
+
+    def get(self, story_id: str, name: str) -> SpectrumData | None:
+        if self.directory is None:
+            return None
+
+        try:
+            data = self._path(story_id, name).read_bytes()
+            spec_data = SpectrumData.loads(name, data)
+        except FileNotFoundError:
+            spec_data = None
+        except Exception:
+            logger.exception("Failed to read cached spectrum of `%s`.", name)
+            spec_data = None
+
+        with self._lock:
+            if spec_data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return spec_data
+
+    def set(self, story_id: str, spec_data: SpectrumData):
+        if self.directory is None:
+            return
+
+        path = self._path(story_id, spec_data.name)
+        f = None
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Write to a temporary file first, so that concurrent readers
+            #  never see a partially written spectrum
+            with tempfile.NamedTemporaryFile(
+                dir=path.parent, suffix=".npz", delete=False
+            ) as f:
+                f.write(spec_data.dumps())
+            os.replace(f.name, path)
+        except OSError:
+            logger.exception("Failed to cache spectrum of `%s`.", spec_data.name)
+            if f is not None:
+                Path(f.name).unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self.writes += 1
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "writes": self.writes,
+                "directory": None if self.directory is None else str(self.directory),
+            }
+
+
+class SpectrumCache:
+    """
+    Process-wide, two-tier cache of parsed spectra: a byte-bounded LRU in
+    memory in front of a `SpectrumDiskStore`. Spectra found on disk are
+    promoted to memory. Cached spectra are shared between sessions, and must
+    not be modified.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = SPECTRUM_CACHE_BYTES,
+        directory: str | None = SPECTRUM_CACHE_DIR,
+    ):
+        self.memory = SizedLRUCache(
+            "spectra", max_bytes, sizeof=lambda spec_data: spec_data.nbytes
+        )
+        self.disk = SpectrumDiskStore(directory)
+
+    def get(self, story_id: str, name: str) -> SpectrumData | None:
+        spec_data = self.memory.get((story_id, name))
+
+        if spec_data is None:
+            spec_data = self.disk.get(story_id, name)
+
+            if spec_data is not None:
+                self.memory.set((story_id, name), spec_data)
+
+        return spec_data
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        """Whether `(story_id, name)` is cached, without counting a hit or miss."""
+        return key in self.memory or key in self.disk
+
+    def set(self, story_id: str, spec_data: SpectrumData):
+        self.memory.set((story_id, spec_data.name), spec_data)
+        self.disk.set(story_id, spec_data)
+
+    @property
+    def stats(self) -> dict:
+        return {"memory": self.memory.stats, "disk": self.disk.stats}
+
+
+SPECTRUM_CACHE = SpectrumCache()
@@ -0,0 +1,149 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Hashable, Iterable
+
+from cds_core.logger import setup_logger
+from .remote import LOCAL_API
+from .spectrum_bundle import SPECTRUM_BUNDLE
+from .spectrum_cache import SPECTRUM_CACHE
+from .story_state import GalaxyData
+
+logger = setup_logger("SPECTRUM PREFETCH")
+
+SPECTRUM_PREFETCH_WORKERS = int(os.getenv("CDS_SPECTRUM_PREFETCH_WORKERS", "4"))
+SPECTRUM_PREFETCH_HISTORY = 500
+
+
+@dataclass
+class _Prefetch:
+    future: Future
+    owners: set[Hashable] = field(default_factory=set)
+
+
+class SpectrumPrefetcher:
+    """
+    Downloads and decodes galaxy spectra into `SPECTRUM_CACHE` in the
+    background, on a process-wide pool of at most `max_workers` threads, so
+    that a `SpectrumViewer` finds them ready when it opens.
+
+    Every prefetch is requested on behalf of one or more owners (e.g. a
+    session). `retain` cancels the queued prefetches an owner no longer needs;
+    a prefetch that is already running is allowed to finish.
+    """
+
+    def __init__(self, max_workers: int = SPECTRUM_PREFETCH_WORKERS):
+        self.max_workers = max_workers
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        self._pending: dict[tuple[str, str], _Prefetch] = {}
+        self._waits: deque[float] = deque(maxlen=SPECTRUM_PREFETCH_HISTORY)
+        self._durations: deque[float] = deque(maxlen=SPECTRUM_PREFETCH_HISTORY)
+        self._lock = Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def prefetch(self, story_id: str, gal_data: GalaxyData, owner: Hashable):
+        key = (story_id, gal_data.name)
+
+        if key in SPECTRUM_CACHE or (
+            SPECTRUM_BUNDLE is not None and gal_data in SPECTRUM_BUNDLE
+        ):
+            return
+
+        with self._lock:
+            if (pending := self._pending.get(key)) is not None:
+                pending.owners.add(owner)
+                return
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="cds-spectrum-prefetch",
+                )
+
+            queued = time.perf_counter()
+            future = self._executor.submit(self._fetch, key, gal_data, queued)
+            self._pending[key] = _Prefetch(future, {owner})
+
+    def retain(
+        self, story_id: str, owner: Hashable, names: Iterable[str] = ()
+    ) -> int:
+        """
+        Cancels the queued prefetches of `owner` for any galaxy not in `names`,
+        unless another owner still wants them. Returns the number cancelled.
+        """
+        keep = set(names)
+        cancelled = 0
+
+        with self._lock:
+            for key, pending in list(self._pending.items()):
+                if key[0] != story_id or key[1] in keep:
+                    continue
+
+                pending.owners.discard(owner)
+
+                if not pending.owners and pending.future.cancel():
+                    del self._pending[key]
+                    cancelled += 1
+
+            self.cancelled += cancelled
+
+        if cancelled:
+            logger.debug("Cancelled %d spectrum prefetches.", cancelled)
+
+        return cancelled
+
+    def _fetch(self, key: tuple[str, str], gal_data: GalaxyData, queued: float):
+        started = time.perf_counter()
+
+        try:
+            LOCAL_API.fetch_spectrum_data(key[0], gal_data)
+        except Exception:
+            logger.exception("Failed to prefetch spectrum of `%s`.", gal_data.name)
+            succeeded = False
+        else:
+            succeeded = True
+
+        finished = time.perf_counter()
+
+        with self._lock:
+            self._pending.pop(key, None)
+            self._waits.append((started - queued) * 1000)
+            self._durations.append((finished - started) * 1000)
+
+            if succeeded:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+        logger.debug(
+            "Prefetched spectrum of `%s` in %.0f ms (queued for %.0f ms).",
+            gal_data.name,
+            (finished - started) * 1000,
+            (started - queued) * 1000,
+        )
+
+    @property
+    def stats(self) -> dict:
+        """Counts, and the median and maximum queue wait and fetch time (ms)."""
+        with self._lock:
+            waits = sorted(self._waits)
+            durations = sorted(self._durations)
+
+            return {
+                "pending": len(self._pending),
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "failed": self.failed,
+                "wait_p50": waits[len(waits) // 2] if waits else 0.0,
+                "wait_max": waits[-1] if waits else 0.0,
+                "fetch_p50": durations[len(durations) // 2] if durations else 0.0,
+                "fetch_max": durations[-1] if durations else 0.0,
+            }
+
+
+SPECTRUM_PREFETCHER = SpectrumPrefetcher()
@@ -1,7 +1,6 @@
 import asyncio
 from pathlib import Path
 
-import numpy as np
 import reacton.ipyvuetify as rv
 import solara
 from glue.core import Data
@@ -53,6 +52,7 @@ from ...helpers.viewer_marker_colors import (
     LIGHT_GENERIC_COLOR,
 )
 from ...remote import LOCAL_API
+from ...spectrum_prefetch import SPECTRUM_PREFETCHER
 from ...story_state import (
     StoryState,
     StudentMeasurement,
@@ -106,6 +106,9 @@ def Page(app_state: Reactive[AppState]):
 
     seed_data_setup = solara.use_reactive(False)
 
+    # Identifies this session's spectrum prefetches
+    prefetch_owner = solara.use_memo(object, dependencies=[])
+
     def glue_setup() -> JupyterApplication:
         gjapp = _glue_setup(app_state, story_state)
         if EXAMPLE_GALAXY_SEED_DATA not in gjapp.data_collection:
@@ -134,6 +137,15 @@ def Page(app_state: Reactive[AppState]):
             lambda *args: total_galaxies.set(len(measurements.value))
         )
 
+        # Stop prefetching the spectra of galaxies that were removed
+        measurements.subscribe(
+            lambda value: SPECTRUM_PREFETCHER.retain(
+                story_state.value.story_id,
+                prefetch_owner,
+                [m.galaxy.name for m in value if m.galaxy is not None],
+            )
+        )
+
         example_measurements = Ref(story_state.fields.example_measurements)
 
         def _on_example_measurement_change(meas):
@@ -202,8 +214,9 @@ def Page(app_state: Reactive[AppState]):
         need = 5 - len(story_state.value.measurements)
         if need <= 0:
             return
-        galaxies: list = LOCAL_API.get_galaxies(story_state)
-        sample = np.random.choice(galaxies, size=need, replace=False)
+        sample = LOCAL_API.get_galaxy_catalog(story_state).sample(
+            need, exclude=[x.galaxy_id for x in story_state.value.measurements]
+        )
         new_measurements = [
             StudentMeasurement(student_id=app_state.value.student.id, galaxy=galaxy)
             for galaxy in sample
@@ -214,12 +227,11 @@ def Page(app_state: Reactive[AppState]):
     def _select_one_random_galaxy():
         if len(story_state.value.measurements) >= 5:
             return
-        need = 1
-        galaxies = LOCAL_API.get_galaxies(story_state)
-        rng = np.random.default_rng()
-        index = rng.integers(low=0, high=len(galaxies) - 1, size=need)[0]
-        galaxy = galaxies[index]
-        selection_tool_candidate_galaxy.set(galaxy.model_dump())
+        sample = LOCAL_API.get_galaxy_catalog(story_state).sample(
+            1, exclude=[x.galaxy_id for x in story_state.value.measurements]
+        )
+        if sample:
+            selection_tool_candidate_galaxy.set(sample[0].model_dump())
 
     def num_bad_velocities():
         measurements = Ref(story_state.fields.measurements)
@@ -452,10 +464,8 @@ def Page(app_state: Reactive[AppState]):
             solara.lab.use_task(snackbar_off, dependencies=[show_snackbar])
 
             def _galaxy_added_callback(galaxy_data: dict):
-                galaxy = next(
-                    gal
-                    for gal in LOCAL_API.get_galaxies(story_state)
-                    if gal.id == int(galaxy_data["id"])
+                galaxy = LOCAL_API.get_galaxy_catalog(story_state).get(
+                    int(galaxy_data["id"])
                 )
                 already_exists = galaxy.id in [
                     x.galaxy_id for x in story_state.value.measurements
@@ -477,6 +487,11 @@ def Page(app_state: Reactive[AppState]):
 
                 logger.info("Adding galaxy `%s` to measurements.", galaxy.id)
 
+                # Start loading the spectrum now, so it's ready when opened
+                SPECTRUM_PREFETCHER.prefetch(
+                    story_state.value.story_id, galaxy, owner=prefetch_owner
+                )
+
                 measurements = Ref(story_state.fields.measurements)
 
                 measurements.set(
@@ -499,10 +514,8 @@ def Page(app_state: Reactive[AppState]):
             total_galaxies.subscribe(advance_on_total_galaxies)
 
             def _galaxy_selected_callback(galaxy_data: dict):
-                galaxy = next(
-                    gal
-                    for gal in LOCAL_API.get_galaxies(story_state)
-                    if gal.id == int(galaxy_data["id"])
+                galaxy = LOCAL_API.get_galaxy_catalog(story_state).get(
+                    int(galaxy_data["id"])
                 )
                 selected_galaxy = Ref(stage_state.fields.selected_galaxy)
                 selected_galaxy.set(galaxy.id)
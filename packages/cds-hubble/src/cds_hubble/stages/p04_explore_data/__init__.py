@@ -117,9 +117,9 @@ def Page(app_state: Reactive[AppState]):
 
     gjapp, viewers = solara.use_memo(glue_setup, dependencies=[])
 
-    def check_completed_students_count():
+    async def check_completed_students_count():
         logger.info("Checking how many students have completed measurements")
-        count = LOCAL_API.get_students_completed_measurements_count(
+        count = await LOCAL_API.get_students_completed_measurements_count_async(
             app_state, story_state
         )
         logger.info(f"Count: {count}")
@@ -182,7 +182,7 @@ def Page(app_state: Reactive[AppState]):
         enough_students_ready = Ref(story_state.fields.enough_students_ready)
         # Add a state guard in case task cancellation fails
         while stage_state.value.current_step == Marker.wwt_wait:
-            count = check_completed_students_count()
+            count = await check_completed_students_count()
             if (not enough_students_ready.value) and count >= 12:
                 enough_students_ready.set(True)
             completed_count.set(count)
@@ -204,7 +204,9 @@ def Page(app_state: Reactive[AppState]):
     async def _load_student_data():
         if not story_state.value.measurements_loaded:
             logger.info("Loading measurements")
-            measurements = LOCAL_API.get_measurements(app_state, story_state)
+            measurements = await LOCAL_API.get_measurements_async(
+                app_state, story_state
+            )
             student_plot_data.set(measurements)
 
     solara.lab.use_task(_load_student_data)
@@ -50,6 +50,7 @@ from ...helpers.viewer_marker_colors import (
     OTHER_STUDENTS_COLOR,
     GENERIC_COLOR,
 )
+from ...measurement_table import MeasurementTable
 from ...remote import LOCAL_API
 from ...story_state import (
     StoryState,
@@ -185,7 +186,7 @@ def Page(app_state: Reactive[AppState]):
         measurements.set(class_measurements)
 
         all_measurements, student_summaries, class_summaries = LOCAL_API.get_all_data(
-            app_state, story_state
+            app_state, story_state, columnar=True
         )
         if app_state.value.classroom.class_info is not None:
             class_id = app_state.value.classroom.class_info["id"]
@@ -217,12 +218,12 @@ def Page(app_state: Reactive[AppState]):
             )
             for measurement in class_measurements:
                 measurement.class_id = class_id
-            all_measurements.extend(class_measurements)
+            all_measurements = MeasurementTable.concatenate(
+                [all_measurements, MeasurementTable.from_models(class_measurements)]
+            )
 
-        all_meas = Ref(story_state.fields.all_measurements)
         all_stu_summaries = Ref(story_state.fields.student_summaries)
         all_cls_summaries = Ref(story_state.fields.class_summaries)
-        all_meas.set(all_measurements)
         all_stu_summaries.set(student_summaries)
         all_cls_summaries.set(class_summaries)
 
@@ -339,7 +340,7 @@ def Page(app_state: Reactive[AppState]):
         student_hist_viewer.layers[0].state.color = MY_CLASS_COLOR
         student_hist_viewer.add_subset(my_summ_subset)
 
-        all_data = models_to_glue_data(all_measurements, label="All Measurements")
+        all_data = all_measurements.to_glue_data(label="All Measurements")
         all_data = app_state.value.add_or_update_data(all_data)
 
         student_summ_data = models_to_glue_data(
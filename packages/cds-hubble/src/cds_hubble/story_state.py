@@ -1,8 +1,11 @@
 import datetime
-from typing import Callable, Tuple, Optional
+from io import BytesIO
+from typing import Annotated, Callable, Tuple, Optional
 from typing import TypeVar
 
-from pydantic import BaseModel, computed_field
+import numpy as np
+from pydantic import BaseModel, BeforeValidator, ConfigDict, PlainSerializer
+from pydantic import computed_field
 from pydantic import Field
 from solara import Reactive
 from solara.toestand import Ref
@@ -19,11 +22,78 @@ from .helpers.data_management import ELEMENT_REST
 logger = setup_logger("HUBBLEDS-STATE")
 
 
+def _as_spectrum_array(value) -> np.ndarray:
+    # Columns of a FITS table are big-endian and strided; anything else,
+    #  including arrays we built ourselves, is kept as is without copying
+    array = np.asarray(value)
+
+    if not array.dtype.isnative:
+        array = array.astype(array.dtype.newbyteorder("="))
+
+    return np.ascontiguousarray(array)
+
+
+SpectrumArray = Annotated[
+    np.ndarray,
+    BeforeValidator(_as_spectrum_array),
+    PlainSerializer(lambda array: array.tolist(), when_used="json"),
+]
+
+
 class SpectrumData(BaseModel):
+    """
+    A galaxy spectrum, holding its samples as numpy arrays rather than lists
+    of Python floats. `dumps` and `loads` convert it to and from a compact
+    binary form, e.g. for caching.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     name: str
-    wave: list[float]
-    flux: list[float]
-    ivar: list[float]
+    wave: SpectrumArray
+    flux: SpectrumArray
+    ivar: SpectrumArray
+
+    @classmethod
+    def from_arrays(
+        cls, name: str, wave, flux, ivar, dtype: str | None = None
+    ) -> "SpectrumData":
+        """
+        Builds a spectrum from the given arrays, converting them to `dtype`
+        (e.g. ``"float32"``) only if they are not already of that type.
+        """
+        arrays = [_as_spectrum_array(array) for array in (wave, flux, ivar)]
+
+        if dtype is not None:
+            arrays = [array.astype(dtype, copy=False) for array in arrays]
+
+        wave, flux, ivar = arrays
+        return cls(name=name, wave=wave, flux=flux, ivar=ivar)
+
+    @property
+    def nbytes(self) -> int:
+        return self.wave.nbytes + self.flux.nbytes + self.ivar.nbytes
+
+    def dumps(self) -> bytes:
+        with BytesIO() as f:
+            np.savez(f, wave=self.wave, flux=self.flux, ivar=self.ivar)
+            return f.getvalue()
+
+    @classmethod
+    def loads(cls, name: str, data: bytes) -> "SpectrumData":
+        with np.load(BytesIO(data)) as arrays:
+            return cls(
+                name=name, wave=arrays["wave"], flux=arrays["flux"], ivar=arrays["ivar"]
+            )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SpectrumData):
+            return NotImplemented
+
+        return self.name == other.name and all(
+            np.array_equal(getattr(self, field), getattr(other, field))
+            for field in ("wave", "flux", "ivar")
+        )
 
 
 class GalaxyData(BaseModel):
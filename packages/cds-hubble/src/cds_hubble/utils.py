@@ -1,15 +1,16 @@
-from collections import defaultdict
 from astropy import units as u
 from astropy.modeling import models, fitting
-from numpy import argsort, array, pi
+from numpy import argsort, around, array, nan, pi, zeros
 
+from cds_core.assets import StaticAssets
+from cds_core.fitting import hubble_fits
 from cds_core.utils import component_type_for_field, mode, percent_around_center_indices
 from pydantic import BaseModel
 
 from glue.core import Data
 from glue_jupyter.app import JupyterApplication
 from numbers import Number
-from typing import List, Set, Tuple, TypeVar, Optional, cast, Any
+from typing import List, Tuple, TypeVar, Optional, cast, Any
 from collections.abc import Callable
 import solara
 from solara.routing import Router
@@ -67,11 +68,11 @@ PLOTLY_MARGINS = {"l": 60, "r": 20, "t": 20, "b": 60}
 
 IMAGE_BASE_URL = "https://cosmicds.github.io/cds-website/hubbleds_images"
 
-IMAGE_BASE_STATIC_PATH = "/static/public"
+ASSETS = StaticAssets(Path(__file__).parent / "public")
 
 
 def get_image_path(router, sub_path):
-    return f"{router.root_path}{IMAGE_BASE_STATIC_PATH}/{sub_path}"
+    return ASSETS.url(sub_path, router.root_path)
 
 
 def angle_to_json(angle, _widget):
@@ -202,9 +203,9 @@ def models_to_glue_data(
 def create_single_summary(
     distances: List[Number], velocities: List[Number]
 ) -> Tuple[float, float]:
-    line = fit_line(distances, velocities)
-    h0 = line.slope.value
-    age = age_in_gyr_simple(h0)
+    fits = hubble_fits(zeros(len(distances)), distances, velocities)
+    h0 = float(fits.h0[0]) if len(fits.ids) else nan
+    age = round(float(fits.age[0]), 3) if len(fits.ids) else nan
     return h0, age
 
 
@@ -213,32 +214,20 @@ def make_summary_data(
     input_id_field: str = "id",
     output_id_field: str | None = None,
     label: str | None = None,
+    uncertainty: bool = False,
 ) -> Data:
-    dists = defaultdict(list)
-    vels = defaultdict(list)
-    d = measurement_data["est_dist_value"]
-    v = measurement_data["velocity_value"]
-    ids: Set[int] = set()
-
-    for i in range(measurement_data.size):
-        id_num = measurement_data[input_id_field][i]
-        ids.add(id_num)
-        dist = d[i]
-        vel = v[i]
-        if dist is not None and vel is not None:
-            dists[id_num].append(dist)
-            vels[id_num].append(vel)
-
-    hubbles: List[float] = []
-    ages: List[float] = []
-    for id_num in ids:
-        h0, age = create_single_summary(dists[id_num], vels[id_num])
-        hubbles.append(h0)
-        ages.append(age)
-
-    data_kwargs: dict = {"hubble_fit_value": hubbles, "age_value": ages}
+    fits = hubble_fits(
+        measurement_data[input_id_field],
+        measurement_data["est_dist_value"],
+        measurement_data["velocity_value"],
+        uncertainty=uncertainty,
+    )
+
+    data_kwargs: dict = {"hubble_fit_value": fits.h0, "age_value": around(fits.age, 3)}
+    if uncertainty:
+        data_kwargs["hubble_fit_error"] = fits.h0_error
     output_id_field = output_id_field or input_id_field
-    data_kwargs[output_id_field] = list(ids)
+    data_kwargs[output_id_field] = fits.ids
 
     if label:
         data_kwargs["label"] = label
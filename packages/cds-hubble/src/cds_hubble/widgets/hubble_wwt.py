@@ -2,6 +2,8 @@ from traitlets import Unicode
 
 from ipywwt import WWTWidget
 
+from ..wwt_proxy import UPSTREAM_SURVEYS_URL, WWT_PROXY_URL
+
 
 class HubbleWWTWidget(WWTWidget):
 
@@ -15,7 +17,11 @@ class HubbleWWTWidget(WWTWidget):
         help="The layer to show in the foreground (`str`)",
     ).tag(wwt=None, wwt_reset=True)
 
-    SURVEYS_URL = "https://gist.githubusercontent.com/Carifio24/447d69e14a3196665fa3cb59f93ec0ee/raw/040cb93508c47284b44435c413e3fc92dc601f2d/surveys_minimal.wtml"
+    # Through the caching proxy, if there is one, so that each tile is
+    #  fetched from upstream once rather than by every student
+    SURVEYS_URL = (
+        f"{WWT_PROXY_URL}/surveys.wtml" if WWT_PROXY_URL else UPSTREAM_SURVEYS_URL
+    )
 
 
     def __init__(self, *args, **kwargs):
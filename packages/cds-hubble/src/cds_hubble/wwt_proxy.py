@@ -0,0 +1,400 @@
+"""
+An optional caching proxy for the WWT survey catalog (WTML) and the imagery
+tiles shown by the story's sky viewers.
+
+When ``CDS_WWT_PROXY_URL`` is set to the public URL at which the proxy is
+mounted (``/wwt/`` on ``cds_hubble.server:app``), `HubbleWWTWidget` loads the
+surveys WTML from the proxy. The WTML is rewritten so that every image URL
+in it points back at the proxy, which fetches each tile from upstream once
+and serves it from a bounded on-disk cache to every student after that.
+"""
+
+import asyncio
+import math
+import mimetypes
+import os
+import re
+import tempfile
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+from threading import Lock
+from urllib.parse import urlsplit
+
+import httpx
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from cds_core.logger import setup_logger
+
+logger = setup_logger("WWT PROXY")
+
+UPSTREAM_SURVEYS_URL = "https://gist.githubusercontent.com/Carifio24/447d69e14a3196665fa3cb59f93ec0ee/raw/040cb93508c47284b44435c413e3fc92dc601f2d/surveys_minimal.wtml"
+
+# Public URL of the proxy's mount, e.g. `https://example.org/wwt`; unset to
+#  have the widgets fetch imagery from upstream directly
+WWT_PROXY_URL = os.getenv("CDS_WWT_PROXY_URL", "").rstrip("/")
+WWT_CACHE_DIR = os.getenv(
+    "CDS_WWT_CACHE_DIR", str(Path(tempfile.gettempdir()) / "cds-wwt")
+)
+WWT_CACHE_BYTES = int(os.getenv("CDS_WWT_CACHE_BYTES", str(2 * 2**30)))
+
+# Hosts that may be proxied besides those named in the surveys WTML
+WWT_PROXY_HOSTS = [h for h in os.getenv("CDS_WWT_PROXY_HOSTS", "").split(",") if h]
+
+# Browsers may keep proxied tiles for a day
+_CACHE_CONTROL = "public, max-age=86400"
+
+_WTML_URLS = re.compile(
+    r"""(\s(?:Thumbnail)?Url="|<(?:Thumbnail)?Url>)(https?://[^"<\s]+)"""
+)
+
+
+def proxied_url(url: str, base: str = WWT_PROXY_URL) -> str:
+    """The URL at which the proxy mounted at `base` serves `url`."""
+    parts = urlsplit(url)
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{base}/tiles/{parts.scheme}/{parts.netloc}{parts.path}{query}"
+
+
+def wtml_hosts(wtml: str) -> set[str]:
+    """The hosts of the image URLs in `wtml`, which may contain placeholders."""
+    return {urlsplit(m.group(2)).netloc for m in _WTML_URLS.finditer(wtml)}
+
+
+def rewrite_wtml(wtml: str, base: str = WWT_PROXY_URL) -> str:
+    """Points every image and thumbnail URL in `wtml` at the proxy."""
+    return _WTML_URLS.sub(lambda m: m.group(1) + proxied_url(m.group(2), base), wtml)
+
+
+def _host_pattern(host: str) -> re.Pattern:
+    # WWT fills placeholders such as `{1}` in the host too (e.g. `r{1}.x.net`)
+    return re.compile(re.sub(r"\\\{\w+\\\}", r"[\\w-]+", re.escape(host)) + "$")
+
+
+class TileCache:
+    """
+    Upstream responses stored on disk, one file per URL, under `directory`.
+    Once they take up more than `max_bytes`, the least recently used files
+    are deleted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = WWT_CACHE_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._size: int | None = None
+        self._lock = Lock()
+
+    def _path(self, url: str) -> Path:
+        digest = sha256(url.encode()).hexdigest()
+        return self.directory / digest[:2] / digest[2:]
+
+    def __contains__(self, url: str) -> bool:
+        return self._path(url).exists()
+
+    def get(self, url: str) -> bytes | None:
+        path = self._path(url)
+
+        try:
+            content = path.read_bytes()
+            # Mark the file as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            content = None
+
+        with self._lock:
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return content
+
+    def set(self, url: str, content: bytes):
+        path = self._path(url)
+        f = None
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as f:
+                f.write(content)
+            os.replace(f.name, path)
+        except OSError:
+            logger.exception("Failed to cache `%s`.", url)
+            if f is not None:
+                Path(f.name).unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self.writes += 1
+
+            if self._size is None:
+                self._size = self._scan()[1]
+            else:
+                self._size += len(content)
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan(self) -> tuple[list[tuple[os.stat_result, Path]], int]:
+        files = [
+            (path.stat(), path) for path in self.directory.glob("*/*") if path.is_file()
+        ]
+        return files, sum(stat.st_size for stat, _ in files)
+
+    def _evict(self):
+        # Make some headroom, so that the scan isn't repeated on every write
+        files, size = self._scan()
+        target = self.max_bytes * 0.9
+
+        for stat, path in sorted(files, key=lambda file: file[0].st_mtime):
+            if size <= target:
+                break
+
+            path.unlink(missing_ok=True)
+            size -= stat.st_size
+            self.evictions += 1
+
+        self._size = size
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "bytes": self._size,
+                "directory": str(self.directory),
+            }
+
+
+class WWTProxy:
+    """
+    Serves the surveys WTML and the tiles it refers to through a `TileCache`.
+    Concurrent requests for the same uncached URL share one upstream fetch.
+    Only hosts named in the surveys WTML (or in ``CDS_WWT_PROXY_HOSTS``) are
+    proxied.
+    """
+
+    def __init__(self, cache: TileCache, surveys_url: str = UPSTREAM_SURVEYS_URL):
+        self.cache = cache
+        self.surveys_url = surveys_url
+        self._wtml: str | None = None
+        self._hosts: list[re.Pattern] = [_host_pattern(h) for h in WWT_PROXY_HOSTS]
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(follow_redirects=True, timeout=30)
+
+        return self._client
+
+    async def fetch(self, url: str) -> tuple[int, bytes]:
+        """Returns the status and content of `url`, from the cache if possible."""
+        content = await run_in_threadpool(self.cache.get, url)
+
+        if content is not None:
+            return 200, content
+
+        if (inflight := self._inflight.get(url)) is not None:
+            return await asyncio.shield(inflight)
+
+        inflight = asyncio.get_running_loop().create_future()
+        self._inflight[url] = inflight
+        result = 502, b""
+
+        try:
+            r = await self.client.get(url)
+            result = r.status_code, r.content
+
+            if r.status_code == 200:
+                await run_in_threadpool(self.cache.set, url, r.content)
+        except httpx.HTTPError as e:
+            logger.warning("Failed to fetch `%s`: %s", url, e)
+        finally:
+            del self._inflight[url]
+            inflight.set_result(result)
+
+        return result
+
+    async def wtml(self) -> str | None:
+        """
+        The upstream surveys WTML. It is fetched once per process, and kept in
+        the cache, as the gist revision it comes from never changes.
+        """
+        if self._wtml is None:
+            status, content = await self.fetch(self.surveys_url)
+
+            if status != 200:
+                return None
+
+            self._wtml = content.decode()
+            self._hosts += [_host_pattern(h) for h in wtml_hosts(self._wtml)]
+
+        return self._wtml
+
+    def allows(self, host: str) -> bool:
+        return any(pattern.match(host) for pattern in self._hosts)
+
+    async def surveys(self, request: Request) -> Response:
+        wtml = await self.wtml()
+
+        if wtml is None:
+            return Response(status_code=502)
+
+        return Response(
+            rewrite_wtml(wtml),
+            media_type="application/xml",
+            headers={"Access-Control-Allow-Origin": "*"},
+        )
+
+    async def tile(self, request: Request) -> Response:
+        scheme, host = request.path_params["scheme"], request.path_params["host"]
+        await self.wtml()
+
+        if scheme not in ("http", "https") or not self.allows(host):
+            return Response(status_code=403)
+
+        url = f"{scheme}://{host}/{request.path_params['path']}"
+        if request.url.query:
+            url += f"?{request.url.query}"
+
+        status, content = await self.fetch(url)
+
+        return Response(
+            content,
+            status_code=status,
+            media_type=mimetypes.guess_type(urlsplit(url).path)[0],
+            headers={
+                "Access-Control-Allow-Origin": "*",
+                "Cache-Control": _CACHE_CONTROL if status == 200 else "no-store",
+            },
+        )
+
+
+@dataclass
+class ImageSet:
+    name: str
+    url: str
+    projection: str
+    file_type: str
+    tile_levels: int
+
+
+def read_imagesets(wtml: str) -> list[ImageSet]:
+    return [
+        ImageSet(
+            name=element.get("Name", ""),
+            url=element.get("Url", ""),
+            projection=element.get("Projection", ""),
+            file_type=element.get("FileType", ""),
+            tile_levels=int(element.get("TileLevels") or 0),
+        )
+        for element in ElementTree.fromstring(wtml).iter("ImageSet")
+    ]
+
+
+def _spread_bits(value: int) -> int:
+    result = 0
+    for bit in range(value.bit_length()):
+        result |= ((value >> bit) & 1) << (2 * bit)
+    return result
+
+
+def healpix_nest(order: int, ra: float, decl: float) -> int:
+    """The nested HEALPix index, at `order`, of the pixel containing a point."""
+    nside = 1 << order
+    z = math.sin(math.radians(decl))
+    za = abs(z)
+    tt = (math.radians(ra) % (2 * math.pi)) / (math.pi / 2)
+
+    if za <= 2 / 3:
+        # Equatorial region
+        temp1 = nside * (0.5 + tt)
+        temp2 = nside * z * 0.75
+        jp, jm = int(temp1 - temp2), int(temp1 + temp2)
+        ifp, ifm = jp >> order, jm >> order
+
+        if ifp == ifm:
+            face = ifp | 4
+        elif ifp < ifm:
+            face = ifp
+        else:
+            face = ifm + 8
+
+        ix = jm & (nside - 1)
+        iy = nside - (jp & (nside - 1)) - 1
+    else:
+        # Polar caps
+        ntt = min(int(tt), 3)
+        tp = tt - ntt
+        tmp = nside * math.sqrt(3 * (1 - za))
+        jp = min(int(tp * tmp), nside - 1)
+        jm = min(int((1 - tp) * tmp), nside - 1)
+
+        if z >= 0:
+            face, ix, iy = ntt, nside - jm - 1, nside - jp - 1
+        else:
+            face, ix, iy = ntt + 8, jp, jm
+
+    return (face << (2 * order)) + _spread_bits(ix) + (_spread_bits(iy) << 1)
+
+
+def field_tile_urls(
+    imageset: ImageSet, ra: float, decl: float, fov: float, max_order: int
+) -> set[str]:
+    """
+    The URLs of the HiPS tiles of `imageset`, at every order up to
+    `max_order`, covering a field `fov` degrees wide centered on a point.
+    Returns no URLs for imagesets in other projections.
+    """
+    if imageset.projection.lower() != "healpix":
+        return set()
+
+    if imageset.tile_levels:
+        max_order = min(max_order, imageset.tile_levels)
+
+    half = fov / 2
+    scale = max(math.cos(math.radians(decl)), 1e-6)
+    points = [
+        (ra + dx * half / scale, max(min(decl + dy * half, 90), -90))
+        for dx in (-1, 0, 1)
+        for dy in (-1, 0, 1)
+    ]
+
+    urls = set()
+    # HiPS tiles start at order 3
+    for order in range(3, max_order + 1):
+        for point_ra, point_decl in points:
+            npix = healpix_nest(order, point_ra, point_decl)
+            urls.add(
+                imageset.url.replace("{0}", str(order))
+                .replace("{1}", str(npix // 10000 * 10000))
+                .replace("{2}", str(npix))
+                + imageset.file_type
+            )
+
+    return urls
+
+
+WWT_TILE_CACHE = TileCache(WWT_CACHE_DIR)
+WWT_PROXY = WWTProxy(WWT_TILE_CACHE)
+
+routes = [
+    Route("/surveys.wtml", endpoint=WWT_PROXY.surveys),
+    Route("/tiles/{scheme}/{host}/{path:path}", endpoint=WWT_PROXY.tile),
+]
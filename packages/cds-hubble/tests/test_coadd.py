@@ -0,0 +1,108 @@
+import io
+
+import numpy as np
+import pytest
+from astropy.io import fits
+
+from cds_hubble.coadd import read_coadd
+
+
+def fits_bytes(*hdus) -> bytes:
+    buffer = io.BytesIO()
+    fits.HDUList([fits.PrimaryHDU(), *hdus]).writeto(buffer)
+    return buffer.getvalue()
+
+
+def coadd(columns, name: str = "COADD") -> fits.BinTableHDU:
+    return fits.BinTableHDU.from_columns(columns, name=name)
+
+
+def spectrum_columns(pixels: int = 50) -> list[fits.Column]:
+    rng = np.random.default_rng(pixels)
+    return [
+        fits.Column(name="flux", format="E", array=rng.normal(10, 1, pixels)),
+        fits.Column(name="loglam", format="E", array=np.linspace(3.58, 3.96, pixels)),
+        fits.Column(name="ivar", format="D", array=np.full(pixels, 4.0)),
+        fits.Column(name="and_mask", format="J", array=np.arange(pixels)),
+        fits.Column(name="label", format="3A", array=["abc"] * pixels),
+        fits.Column(name="pair", format="2I", array=np.ones((pixels, 2))),
+    ]
+
+
+def astropy_coadd(content: bytes):
+    with fits.open(io.BytesIO(content)) as hdulist:
+        return hdulist["COADD"].data.copy()
+
+
+@pytest.mark.parametrize("pixels", [1, 50, 3801])
+def test_matches_astropy(pixels):
+    content = fits_bytes(
+        coadd(spectrum_columns(pixels)),
+        coadd([fits.Column(name="z", format="E", array=[0.1])], name="SPALL"),
+    )
+    expected = astropy_coadd(content)
+    rows = read_coadd(content)
+
+    assert len(rows) == pixels
+    for name in expected.names:
+        column = rows[name.lower()]
+
+        # Strings are left as bytes, where astropy decodes them
+        if column.dtype.kind == "S":
+            column = np.char.decode(column, "ascii")
+
+        np.testing.assert_array_equal(column, expected[name])
+
+
+def test_finds_table_after_other_extensions():
+    content = fits_bytes(
+        fits.ImageHDU(np.zeros((3, 5), dtype=">f4")),
+        coadd([fits.Column(name="z", format="E", array=[0.1])], name="SPALL"),
+        coadd(spectrum_columns()),
+    )
+
+    np.testing.assert_array_equal(
+        read_coadd(content)["flux"], astropy_coadd(content)["flux"]
+    )
+
+
+def test_views_content_in_place():
+    rows = read_coadd(fits_bytes(coadd(spectrum_columns())))
+
+    assert not rows.flags.writeable
+    assert rows.dtype["flux"] == np.dtype(">f4")
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        pytest.param(b"", id="empty"),
+        pytest.param(b"SIMPLE  =                    T" * 10, id="truncated"),
+        pytest.param(
+            fits_bytes(coadd(spectrum_columns(), name="SPALL")), id="no coadd"
+        ),
+        pytest.param(
+            fits_bytes(
+                coadd([fits.Column(name="flux", format="J", bzero=2**31, array=[1])])
+            ),
+            id="scaled column",
+        ),
+        pytest.param(
+            fits_bytes(coadd([fits.Column(name="flag", format="L", array=[False])])),
+            id="logical column",
+        ),
+        pytest.param(
+            fits_bytes(
+                coadd([fits.Column(name="flux", format="PE()", array=[[1.0, 2.0]])])
+            ),
+            id="variable-length column",
+        ),
+    ],
+)
+def test_unsupported_files_fall_back(content):
+    assert read_coadd(content) is None
+
+
+def test_truncated_data_falls_back():
+    content = fits_bytes(coadd(spectrum_columns()))
+    assert read_coadd(content[: len(content) - 2880]) is None
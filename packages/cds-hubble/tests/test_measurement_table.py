@@ -0,0 +1,127 @@
+import numpy as np
+
+from cds_hubble.measurement_table import MeasurementTable
+from cds_hubble.story_state import GalaxyData, StudentMeasurement
+
+
+def row(student_id, class_id, name, velocity=None, galaxy_id=None):
+    return {
+        "student_id": student_id,
+        "class_id": class_id,
+        "velocity_value": velocity,
+        "galaxy": {"id": galaxy_id or int(name.split(".")[0]), "name": name},
+    }
+
+
+def names(table: MeasurementTable) -> list[str]:
+    return table["galaxy_name"].tolist()
+
+
+def test_from_rows_fills_missing_values():
+    table = MeasurementTable.from_rows(
+        [row(1, 10, "5.fits", velocity=1000.0), {"student_id": 2, "class_id": 10}]
+    )
+
+    np.testing.assert_array_equal(table["velocity_value"], [1000.0, np.nan])
+    np.testing.assert_array_equal(table["est_dist_value"], [np.nan, np.nan])
+    assert table["galaxy_id"].tolist() == [5, 0]
+    assert names(table) == ["5.fits", ""]
+
+
+def test_rows_are_sorted_by_class_and_student():
+    table = MeasurementTable.from_rows(
+        [
+            row(3, 20, "1.fits", velocity=1.0),
+            row(1, 20, "2.fits", velocity=2.0),
+            row(2, 10, "3.fits", velocity=3.0),
+        ]
+    )
+
+    assert table["class_id"].tolist() == [10, 20, 20]
+    assert table["student_id"].tolist() == [2, 1, 3]
+    assert table["velocity_value"].tolist() == [3.0, 2.0, 1.0]
+    assert names(table) == ["3.fits", "2.fits", "1.fits"]
+
+
+def test_galaxy_names_are_interned():
+    table = MeasurementTable.from_rows(
+        [row(1, 10, "1.fits"), row(2, 10, "1.fits"), row(3, 10, "2.fits")]
+    )
+
+    assert table.galaxy_names.tolist() == ["1.fits", "2.fits"]
+    assert table.galaxy_code.tolist() == [0, 0, 1]
+
+
+def test_concatenate_remaps_galaxy_codes():
+    first = MeasurementTable.from_rows([row(1, 10, "2.fits"), row(1, 10, "1.fits")])
+    second = MeasurementTable.from_rows(
+        [row(2, 20, "3.fits"), row(2, 20, "1.fits"), row(3, 20, "3.fits")]
+    )
+
+    # Each table numbers the galaxies it has itself from 0
+    assert first.galaxy_code.tolist() == second.galaxy_code[:2].tolist()
+
+    table = MeasurementTable.concatenate([second, first])
+
+    assert table.galaxy_names.tolist() == ["1.fits", "2.fits", "3.fits"]
+    assert names(table) == ["2.fits", "1.fits", "3.fits", "1.fits", "3.fits"]
+    assert table["galaxy_id"].tolist() == [2, 1, 3, 1, 3]
+    assert table["student_id"].tolist() == [1, 1, 2, 2, 3]
+
+
+def test_concatenate_with_an_empty_table():
+    empty = MeasurementTable.from_rows([])
+    table = MeasurementTable.concatenate(
+        [empty, MeasurementTable.from_rows([row(1, 10, "1.fits")])]
+    )
+
+    assert len(table) == 1
+    assert names(table) == ["1.fits"]
+
+
+def test_for_class_and_for_student_are_views():
+    table = MeasurementTable.from_rows(
+        [
+            row(1, 10, "1.fits"),
+            row(2, 20, "2.fits"),
+            row(1, 10, "3.fits"),
+            row(3, 20, "4.fits"),
+        ]
+    )
+
+    class_table = table.for_class(20)
+    assert class_table["student_id"].tolist() == [2, 3]
+    assert names(class_table) == ["2.fits", "4.fits"]
+    assert np.shares_memory(class_table["velocity_value"], table["velocity_value"])
+
+    student_table = table.for_student(1)
+    assert sorted(names(student_table)) == ["1.fits", "3.fits"]
+    assert np.shares_memory(student_table.galaxy_code, table.galaxy_code)
+
+    assert len(table.for_class(30)) == 0
+    assert len(table.for_student(4)) == 0
+    assert table.class_ids.tolist() == [10, 20]
+
+
+def test_student_in_several_classes_keeps_their_first_class():
+    table = MeasurementTable.from_rows(
+        [row(1, 20, "1.fits"), row(1, 10, "2.fits"), row(2, 15, "3.fits")]
+    )
+
+    student_table = table.for_student(1)
+    assert student_table["class_id"].tolist() == [10]
+    assert names(student_table) == ["2.fits"]
+
+
+def test_from_models_matches_from_rows():
+    galaxy = GalaxyData(
+        id=5, name="5.fits", ra=10.0, decl=20.0, z=0.01, type="Sp", element="H-α"
+    )
+    measurement = StudentMeasurement(
+        student_id=1, class_id=10, galaxy=galaxy, velocity_value=1000.0
+    )
+    table = MeasurementTable.from_models([measurement])
+
+    assert table["galaxy_id"].tolist() == [5]
+    assert names(table) == ["5.fits"]
+    assert table["velocity_value"].tolist() == [1000.0]
@@ -0,0 +1,224 @@
+import pytest
+import solara
+from solara.toestand import Ref
+
+from cds_core import cache
+from cds_core.app_state import AppState, Student
+from cds_hubble.remote import CLASS_DATA_CACHE, UPLOADED_MEASUREMENTS, LocalAPI
+from cds_hubble.story_state import GalaxyData, StoryState, StudentMeasurement
+
+STUDENT_ID = 1001
+CLASS_ID = 7
+
+
+class Response:
+    def __init__(self, status_code: int = 200, json: dict | None = None):
+        self.status_code = status_code
+        self._json = json or {}
+        self.text = ""
+
+    def json(self):
+        return self._json
+
+
+class Session:
+    """Records PUT requests, answering with `bulk` for the bulk endpoint."""
+
+    def __init__(self, bulk=None, single: int = 200):
+        self.bulk = bulk
+        self.single = single
+        self.puts: list[tuple[str, dict]] = []
+
+    def put(self, url, json=None):
+        self.puts.append((url, json))
+
+        if url.endswith("s/"):
+            if isinstance(self.bulk, int):
+                return Response(self.bulk)
+
+            results = self.bulk or [True] * len(json["measurements"])
+            return Response(json={"results": [{"success": s} for s in results]})
+
+        return Response(self.single)
+
+    def bulk_rows(self) -> list[list[int]]:
+        return [
+            [m["galaxy_id"] for m in payload["measurements"]]
+            for url, payload in self.puts
+            if url.endswith("s/")
+        ]
+
+    def single_rows(self) -> list[int]:
+        return [
+            payload["galaxy_id"] for url, payload in self.puts if not url.endswith("s/")
+        ]
+
+
+class API(LocalAPI):
+    is_educator = False
+
+
+def galaxy(galaxy_id: int) -> GalaxyData:
+    return GalaxyData(
+        id=galaxy_id,
+        name=f"{galaxy_id}.fits",
+        ra=10.0,
+        decl=20.0,
+        z=0.01,
+        type="Sp",
+        element="H-α",
+    )
+
+
+def measurement(galaxy_id: int, velocity: float | None = None, **kwargs):
+    return StudentMeasurement(
+        student_id=STUDENT_ID,
+        galaxy=galaxy(galaxy_id),
+        velocity_value=velocity,
+        **kwargs,
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    UPLOADED_MEASUREMENTS.invalidate()
+    CLASS_DATA_CACHE.invalidate()
+    yield
+    UPLOADED_MEASUREMENTS.invalidate()
+    CLASS_DATA_CACHE.invalidate()
+
+
+@pytest.fixture
+def states():
+    app_state = AppState(student=Student(id=STUDENT_ID), update_db=True)
+    app_state.classroom.class_info = {"id": CLASS_ID}
+    return solara.Reactive(app_state), solara.Reactive(StoryState())
+
+
+def make_api(session: Session) -> API:
+    api = API()
+    api.request_session = session
+    return api
+
+
+def test_only_changed_rows_are_uploaded(states):
+    global_state, local_state = states
+    measurements = Ref(local_state.fields.measurements)
+    loaded = [measurement(1, 100.0), measurement(2, 200.0), measurement(3)]
+    measurements.set(loaded)
+
+    session = Session()
+    api = make_api(session)
+    api._mark_uploaded(global_state, local_state, loaded)
+
+    # Nothing changed since the measurements were loaded
+    api.put_measurements(global_state, local_state)
+    assert session.puts == []
+
+    measurements.set([loaded[0], measurement(2, 250.0), loaded[2], measurement(4)])
+    api.put_measurements(global_state, local_state)
+    assert session.bulk_rows() == [[2, 4]]
+
+    # Uploaded rows aren't sent again
+    api.put_measurements(global_state, local_state)
+    assert session.bulk_rows() == [[2, 4]]
+
+
+def test_failed_rows_are_retried(states):
+    global_state, local_state = states
+    Ref(local_state.fields.measurements).set([measurement(1), measurement(2)])
+
+    session = Session(bulk=[True, False])
+    api = make_api(session)
+    api.put_measurements(global_state, local_state)
+
+    session.bulk = None
+    api.put_measurements(global_state, local_state)
+
+    assert session.bulk_rows() == [[1, 2], [2]]
+
+
+@pytest.mark.parametrize("status", [404, 405])
+def test_missing_bulk_endpoint_falls_back_to_single_rows(states, status):
+    global_state, local_state = states
+    measurements = Ref(local_state.fields.measurements)
+    measurements.set([measurement(1), measurement(2)])
+
+    session = Session(bulk=status)
+    api = make_api(session)
+    api.put_measurements(global_state, local_state)
+
+    assert session.bulk_rows() == [[1, 2]]
+    assert sorted(session.single_rows()) == [1, 2]
+
+    # The bulk endpoint isn't tried again
+    measurements.set([measurement(1, 100.0), measurement(2)])
+    api.put_measurements(global_state, local_state)
+
+    assert session.bulk_rows() == [[1, 2]]
+    assert sorted(session.single_rows()) == [1, 1, 2]
+
+
+def test_bulk_server_error_fails_every_row(states):
+    global_state, local_state = states
+    Ref(local_state.fields.measurements).set([measurement(1)])
+
+    session = Session(bulk=500)
+    api = make_api(session)
+    api.put_measurements(global_state, local_state)
+    api.put_measurements(global_state, local_state)
+
+    # Not a missing endpoint: nothing is sent row by row, and the row is
+    #  retried through the bulk endpoint
+    assert session.bulk_rows() == [[1], [1]]
+    assert session.single_rows() == []
+
+
+def test_uploads_invalidate_class_data(states):
+    global_state, local_state = states
+    Ref(local_state.fields.measurements).set([measurement(1)])
+    CLASS_DATA_CACHE.set(("hubbles_law", CLASS_ID, "measurements"), [])
+    CLASS_DATA_CACHE.set(("hubbles_law", CLASS_ID + 1, "measurements"), [])
+
+    make_api(Session()).put_measurements(global_state, local_state)
+
+    assert CLASS_DATA_CACHE.get(("hubbles_law", CLASS_ID, "measurements")) is None
+    assert CLASS_DATA_CACHE.get(("hubbles_law", CLASS_ID + 1, "measurements")) == []
+
+
+def test_loaded_sample_measurements_are_not_uploaded_again(states):
+    global_state, local_state = states
+    api = make_api(Session())
+
+    # Only the first sample measurement is stored: the second is created
+    stored = measurement(1, 100.0, measurement_number="first")
+    api._set_sample_measurements(
+        {"measurements": [stored.model_dump()]}, galaxy(1), global_state, local_state
+    )
+
+    api.put_sample_measurements(global_state, local_state)
+
+    assert [
+        m["measurement_number"]
+        for m in api.request_session.puts[0][1]["measurements"]
+    ] == ["second"]
+
+
+def test_uploaded_fingerprints_expire(states, monkeypatch):
+    global_state, local_state = states
+    measurements = [measurement(1)]
+    Ref(local_state.fields.measurements).set(measurements)
+
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+
+    session = Session()
+    api = make_api(session)
+    api._mark_uploaded(global_state, local_state, measurements)
+
+    # Once forgotten, rows are uploaded again in case another process
+    #  changed them
+    now[0] += UPLOADED_MEASUREMENTS.ttl + 1
+    api.put_measurements(global_state, local_state)
+
+    assert session.bulk_rows() == [[1]]
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from cds_hubble.spectrum_cache import SpectrumCache, SpectrumDiskStore
+from cds_hubble.story_state import SpectrumData
+
+
+def spectrum(name: str = "galaxy.fits", size: int = 100) -> SpectrumData:
+    wave = np.linspace(3800, 9200, size)
+    return SpectrumData.from_arrays(
+        name, wave, np.sin(wave / 100), np.ones(size), dtype="float32"
+    )
+
+
+def test_disk_store_round_trip(tmp_path):
+    store = SpectrumDiskStore(str(tmp_path))
+    spec_data = spectrum()
+
+    assert store.get("hubbles_law", spec_data.name) is None
+    store.set("hubbles_law", spec_data)
+
+    assert ("hubbles_law", spec_data.name) in store
+    assert store.get("hubbles_law", spec_data.name) == spec_data
+    assert store.get("other_story", spec_data.name) is None
+    assert store.stats["writes"] == 1
+    assert store.stats["hits"] == 1 and store.stats["misses"] == 2
+
+
+def test_disk_store_without_directory_stores_nothing():
+    store = SpectrumDiskStore(None)
+    store.set("hubbles_law", spectrum())
+
+    assert store.get("hubbles_law", "galaxy.fits") is None
+    assert ("hubbles_law", "galaxy.fits") not in store
+
+
+def test_unwritable_directory_does_not_raise(tmp_path):
+    # A file where the story folder should be makes every write fail
+    (tmp_path / "hubbles_law").write_text("")
+    store = SpectrumDiskStore(str(tmp_path))
+
+    store.set("hubbles_law", spectrum())
+
+    assert store.stats["writes"] == 0
+    assert store.get("hubbles_law", "galaxy.fits") is None
+
+
+def test_corrupt_file_is_a_miss(tmp_path):
+    store = SpectrumDiskStore(str(tmp_path))
+    store.set("hubbles_law", spectrum())
+    (tmp_path / "hubbles_law" / "galaxy.npz").write_bytes(b"not a spectrum")
+
+    assert store.get("hubbles_law", "galaxy.fits") is None
+
+
+def test_disk_hits_are_promoted_to_memory(tmp_path):
+    spec_data = spectrum()
+    SpectrumCache(directory=str(tmp_path)).set("hubbles_law", spec_data)
+
+    # A new process starts with an empty memory tier
+    cache = SpectrumCache(directory=str(tmp_path))
+    assert cache.get("hubbles_law", spec_data.name) == spec_data
+    assert ("hubbles_law", spec_data.name) in cache.memory
+
+    cache.get("hubbles_law", spec_data.name)
+    assert cache.stats["disk"]["hits"] == 1
+    assert cache.stats["memory"]["hits"] == 1
+
+
+@pytest.mark.parametrize("max_bytes", [0, 10])
+def test_spectra_too_large_for_memory_are_still_stored_on_disk(tmp_path, max_bytes):
+    cache = SpectrumCache(max_bytes=max_bytes, directory=str(tmp_path))
+    spec_data = spectrum()
+    cache.set("hubbles_law", spec_data)
+
+    assert ("hubbles_law", spec_data.name) not in cache.memory
+    assert cache.get("hubbles_law", spec_data.name) == spec_data
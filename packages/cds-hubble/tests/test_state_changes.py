@@ -0,0 +1,94 @@
+import copy
+
+import pytest
+import solara
+from solara.toestand import Ref
+
+import cds_hubble  # noqa: F401 (registers the story and stage states)
+from cds_core.app_state import AppState, Student
+from cds_core.base_states import FreeResponse, MultipleChoiceResponse
+from cds_hubble.story_state import GalaxyData, StudentMeasurement
+from cds_hubble.utils import extract_changed_subtree
+
+GALAXY = GalaxyData(
+    id=5, name="5.fits", ra=10.0, decl=20.0, z=0.01, type="Sp", element="H-α"
+)
+
+
+def _merge(target: dict, patch: dict) -> dict:
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = value
+    return target
+
+
+def _stages(patch: dict) -> set[str]:
+    return set(patch.get("story_state", {}).get("stage_states", {}))
+
+
+@pytest.fixture
+def app_state():
+    return solara.Reactive(AppState(student=Student(id=1)))
+
+
+def _edits(app_state):
+    stage_states = app_state.fields.story_state.stage_states
+    stage = next(iter(Ref(stage_states).value))
+
+    def free_response():
+        responses = Ref(stage_states[stage].free_responses)
+        responses.set(
+            {**responses.value, "fr-1": FreeResponse(tag="fr-1", response="answer")}
+        )
+
+    def multiple_choice():
+        responses = Ref(stage_states[stage].multiple_choice_responses)
+        responses.set(
+            {
+                **responses.value,
+                "mc-1": MultipleChoiceResponse(tag="mc-1", score=10, choice=2),
+            }
+        )
+
+    def piggybank():
+        Ref(app_state.fields.story_state.piggybank_total).set(20)
+
+    return {
+        "free_response": [free_response],
+        "multiple_choice": [multiple_choice],
+        "piggybank": [piggybank],
+        "several": [free_response, multiple_choice, piggybank],
+    }
+
+
+@pytest.mark.parametrize(
+    "name", ["free_response", "multiple_choice", "piggybank", "several"]
+)
+def test_journal_matches_deepdiff_patch(app_state, name):
+    old = app_state.value
+    old_dump = old.as_dict()
+
+    for edit in _edits(app_state)[name]:
+        edit()
+
+    new_dump = app_state.value.as_dict()
+    journal = app_state.value.dump_changes(since=old.journal_seq)
+    deepdiff = extract_changed_subtree(old_dump, new_dump)
+
+    # Both patches turn the last written state into the current one, and
+    #  touch the same stages
+    assert _merge(copy.deepcopy(old_dump), journal) == new_dump
+    assert _merge(copy.deepcopy(old_dump), deepdiff) == new_dump
+    assert _stages(journal) == _stages(deepdiff)
+
+
+def test_measurement_changes_leave_nothing_to_patch(app_state):
+    old = app_state.value
+    Ref(app_state.fields.story_state.measurements).set(
+        [StudentMeasurement(student_id=1, galaxy=GALAXY)]
+    )
+
+    assert app_state.value.journal_seq > old.journal_seq
+    assert app_state.value.dump_changes(since=old.journal_seq) == {}
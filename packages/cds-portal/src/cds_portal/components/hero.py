@@ -1,12 +1,12 @@
 import solara
 from solara.alias import rv
 
-from ..utils import IMG_PATH
+from ..utils import image_url
 
 
 @solara.component
 def Hero():
-    with rv.Parallax(src=str(IMG_PATH / "opo0006a.jpg")) as hero:
+    with rv.Parallax(src=image_url("opo0006a.jpg")) as hero:
         with rv.Container(style_="max-width: 1200px"):
             with rv.Row():
                 with rv.Col(cols=9):
@@ -1,5 +1,3 @@
-from pathlib import Path
-
 import solara
 from solara.alias import rv
 from solara.lab import Ref
@@ -8,8 +6,7 @@ from ..components.join_class import JoinClass
 from ..components.request_form import RequestForm
 from ..remote import BASE_API
 from ..state import GLOBAL_STATE, UserType
-
-IMG_PATH = Path("static") / "public" / "images"
+from ..utils import image_url
 
 
 @solara.component
@@ -71,7 +68,7 @@ def InitialSetup():
                                     hover=True,
                                 ) as student_card:
                                     with rv.Img(
-                                        src=str(IMG_PATH / "student.jpg"),
+                                        src=image_url("student.jpg"),
                                         class_="white--text align-end",
                                         height=200,
                                         gradient="to bottom, rgba(0,0,0,.1), rgba(0,0,0,.5)",
@@ -99,7 +96,7 @@ def InitialSetup():
                                     hover=True,
                                 ) as educator_card:
                                     with rv.Img(
-                                        src=str(IMG_PATH / "educator.jpg"),
+                                        src=image_url("educator.jpg"),
                                         class_="white--text align-end",
                                         height=200,
                                         gradient="to bottom, rgba(0,0,0,.1), rgba(0,0,0,.5)",
@@ -141,7 +138,7 @@ def InitialSetup():
                         ):
                             with rv.Col(cols=12, class_="pa-0 ma-0"):
                                 rv.Img(
-                                    src=str(IMG_PATH / "success.gif"),
+                                    src=image_url("success.gif"),
                                     max_height=100,
                                     contain=True,
                                 )
@@ -1,5 +1,3 @@
-from pathlib import Path
-
 import ipyvuetify as v
 import solara
 from solara.alias import rv
@@ -11,12 +9,10 @@ from .state import GLOBAL_STATE, UserType
 from .remote import BASE_API
 from .components.hero import Hero
 from .components.setup_dialog import UserTypeSetup
+from .utils import image_url
 from cds_core.components.theme_toggle import ThemeToggle
 
 
-IMG_PATH = Path("static") / "public" / "images"
-
-
 @solara.component
 def Layout(children=[]):
     router = solara.use_router()
@@ -53,9 +49,8 @@ def Layout(children=[]):
                 with solara.Link(solara.resolve_path("/")):
                     with rv.Avatar(class_="mr-8", width="60", tile=True):
                         rv.Img(
-                            src=str(
-                                IMG_PATH
-                                / "cosmicds_logo_transparent_for_dark_backgrounds.webp"
+                            src=image_url(
+                                "cosmicds_logo_transparent_for_dark_backgrounds.webp"
                             ),
                         )
 
@@ -271,16 +266,14 @@ def Layout(children=[]):
 
                     with rv.Col(cols=4):
                         rv.Img(
-                            src=str(
-                                IMG_PATH / "NASA_Grantee_color_no_outline.png"
-                            ),
+                            src=image_url("NASA_Grantee_color_no_outline.png"),
                             contain=True,
                             height="100",
                         )
 
                     with rv.Col(cols=4):
                         rv.Img(
-                            src=str(IMG_PATH / "cfa_theme_logo_black.webp"),
+                            src=image_url("cfa_theme_logo_black.webp"),
                             contain=True,
                             height=50,
                         )
@@ -2,7 +2,7 @@ from typing import Optional
 import solara
 from solara.alias import rv
 
-from ...utils import IMG_PATH
+from ...utils import image_url
 
 
 tags = ["TEMPO", "climate", "comets", "data science", "eclipse", "milky way",
@@ -141,14 +141,14 @@ def StoryCard(
         subtitle: Optional[str] = None,
         **kwargs
     ):
-    image_url = str(IMG_PATH / "stories" / image_filename)
+    src = image_url("stories", image_filename)
     with rv.Card(max_width=600, class_="mx-auto", style_="height: 100%") as story_card:
         link_attributes = {"href": url, "target": "_blank", "rel": "noopener noreferrer"}
         with rv.Html(tag="a", attributes=link_attributes):
             rv.Img(
                 class_="white--text align-end",
                 height="275px",
-                src=image_url,
+                src=src,
             )
 
         with rv.CardTitle():
@@ -3,11 +3,11 @@ from typing import Optional
 import solara
 from solara.alias import rv
 
-from ...utils import IMG_PATH
+from ...utils import image_url
 
 
 def team_member_image_url(filename: str) -> str:
-    return str(IMG_PATH / "team" / filename)
+    return image_url("team", filename)
 
 
 DEFAULT_IMAGE = "default.avif"
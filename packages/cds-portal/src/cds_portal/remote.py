@@ -15,8 +15,9 @@ logger = setup_logger("API")
 
 
 class BaseAPI:
-    API_URL = "https://api.cosmicds.cfa.harvard.edu"
-    # API_URL = "http://localhost:8081"
+    API_URL = os.getenv(
+        "CDS_API_URL", "https://api.cosmicds.cfa.harvard.edu"
+    ).rstrip("/")
 
     @cached_property
     def request_session(self):
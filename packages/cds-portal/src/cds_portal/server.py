@@ -6,7 +6,10 @@ from solara.server import settings
 
 import solara.server.starlette
 
+from .utils import ASSETS
+
 routes = [
+    ASSETS.mount(),
     Mount("/", routes=solara.server.starlette.routes),
 ]
 
@@ -1,4 +1,9 @@
 from pathlib import Path
 
+from cds_core.assets import StaticAssets
 
-IMG_PATH = Path("static") / "public" / "images"
+ASSETS = StaticAssets(Path(__file__).parent / "public")
+
+
+def image_url(*parts: str) -> str:
+    return ASSETS.url("/".join(("images", *parts)))
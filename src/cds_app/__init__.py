@@ -1,2 +1,47 @@
-def main() -> None:
-    print("Hello from cds-app!")
+import argparse
+
+
+def main(argv=None) -> None:
+    from . import api_server, build_assets, build_spectra, loadgen, wwt_prefetch
+
+    parser = argparse.ArgumentParser(
+        prog="cds-app", description="Development tools for Cosmic Data Stories."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    api_server.add_arguments(
+        commands.add_parser("api-server", help="Run a stand-in CosmicDS API server.")
+    )
+    build_assets.add_arguments(
+        commands.add_parser(
+            "build-assets", help="Precompress the stories' and portal's static assets."
+        )
+    )
+    build_spectra.add_arguments(
+        commands.add_parser(
+            "build-spectra", help="Pack the Hubble story's spectra into a bundle."
+        )
+    )
+    loadgen.add_arguments(
+        commands.add_parser(
+            "loadgen", help="Walk simulated students through the Hubble story."
+        )
+    )
+    wwt_prefetch.add_arguments(
+        commands.add_parser(
+            "wwt-prefetch", help="Cache the sky imagery around the story's galaxies."
+        )
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "api-server":
+        api_server.run(args)
+    elif args.command == "build-assets":
+        build_assets.run(args)
+    elif args.command == "build-spectra":
+        build_spectra.run(args)
+    elif args.command == "loadgen":
+        loadgen.run(args)
+    elif args.command == "wwt-prefetch":
+        wwt_prefetch.run(args)
@@ -0,0 +1,74 @@
+"""
+A stand-in for the CosmicDS API server, for benchmarking and load testing
+the stories without touching production.
+
+Point the clients at it by setting ``CDS_API_URL`` (e.g.
+``CDS_API_URL=http://localhost:8081``) before starting a story, the portal
+or the dashboard.
+"""
+
+import argparse
+
+from .app import MODES, create_app
+from .fixtures import FixtureStore, fixture_key
+from .store import StandInStore
+
+__all__ = ["create_app", "FixtureStore", "StandInStore", "fixture_key", "main"]
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default="standin",
+        help="Serve from an in-memory store (standin), proxy and record "
+        "upstream traffic (record), or serve recorded fixtures (replay).",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument(
+        "--fixtures", default="api_fixtures", help="Fixture directory."
+    )
+    parser.add_argument(
+        "--upstream",
+        default="https://api.cosmicds.cfa.harvard.edu",
+        help="API server proxied in record mode.",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Artificial latency added to every response, in milliseconds.",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Additional random latency of up to this many milliseconds.",
+    )
+    parser.add_argument(
+        "--class-size",
+        type=int,
+        default=0,
+        help="Minimum class size reported by the stand-in store.",
+    )
+
+
+def run(args: argparse.Namespace):
+    import uvicorn
+
+    app = create_app(
+        mode=args.mode,
+        fixtures_dir=args.fixtures,
+        upstream=args.upstream,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        store=StandInStore(class_size=args.class_size),
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_arguments(parser)
+    run(parser.parse_args(argv))
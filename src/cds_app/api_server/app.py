@@ -0,0 +1,406 @@
+import asyncio
+import io
+import json
+import os
+import random
+from contextlib import asynccontextmanager
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from .fixtures import FixtureStore, fixture_key
+from .store import StandInStore
+
+MODES = ("standin", "record", "replay")
+
+# Rest wavelengths (angstrom) used when synthesizing spectra
+_ELEMENT_REST = {"H-α": 6565.0, "Mg-I": 5172.0}
+
+
+class LatencyMiddleware:
+    """Delays every HTTP response by `latency` plus up to `jitter` seconds."""
+
+    def __init__(self, app, latency: float = 0.0, jitter: float = 0.0):
+        self.app = app
+        self.latency = latency
+        self.jitter = jitter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and (self.latency or self.jitter):
+            await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        await self.app(scope, receive, send)
+
+
+def synthetic_spectrum(galaxy: dict, n_pixels: int = 3800) -> bytes:
+    """
+    Builds a FITS file with an SDSS-like `COADD` table (`loglam`, `flux`,
+    `ivar`) containing a single redshifted line for the galaxy's element.
+    """
+    import numpy as np
+    from astropy.io import fits
+
+    loglam = np.linspace(3.58, 3.96, n_pixels, dtype=">f4")
+    wave = 10**loglam
+    center = _ELEMENT_REST.get(galaxy.get("element"), 6565.0) * (1 + galaxy["z"])
+    depth = -0.6 if galaxy.get("element") == "Mg-I" else 1.5
+    flux = 10 + depth * 10 * np.exp(-0.5 * ((wave - center) / 4.0) ** 2)
+    flux += np.random.default_rng(galaxy["id"]).normal(0, 0.3, n_pixels)
+
+    coadd = fits.BinTableHDU.from_columns(
+        [
+            fits.Column(name="flux", format="E", array=flux.astype(">f4")),
+            fits.Column(name="loglam", format="E", array=loglam),
+            fits.Column(name="ivar", format="E", array=np.full(n_pixels, 4.0, ">f4")),
+        ],
+        name="COADD",
+    )
+
+    buffer = io.BytesIO()
+    fits.HDUList([fits.PrimaryHDU(), coadd]).writeto(buffer)
+    return buffer.getvalue()
+
+
+def _key(request: Request) -> str:
+    return fixture_key(request.method, request.url.path, request.url.query)
+
+
+def _fixture_response(fixtures: FixtureStore, request: Request) -> Response:
+    fixture = fixtures.load(_key(request))
+
+    if fixture is None:
+        return JSONResponse(
+            {"error": f"No fixture recorded for `{_key(request)}`."}, status_code=404
+        )
+
+    status, content_type, body = fixture
+    return Response(body, status_code=status, media_type=content_type)
+
+
+def _standin_routes(store: StandInStore, fixtures: FixtureStore) -> list[Route]:
+
+    async def body(request: Request) -> dict:
+        raw = await request.body()
+        return json.loads(raw) if raw else {}
+
+    # Users and classes
+
+    async def get_student(request: Request):
+        return JSONResponse({"student": store.get_student(request.path_params["user"])})
+
+    async def get_educator(request: Request):
+        return JSONResponse(
+            {"educator": store.get_educator(request.path_params["user"])}
+        )
+
+    async def create_student(request: Request):
+        data = await body(request)
+        student = store.create_student(data["username"], str(data.get("classroom_code", "")))
+        if student is None:
+            return JSONResponse({"success": False}, status_code=409)
+        return JSONResponse({"success": True, "student_info": student}, status_code=201)
+
+    async def create_educator(request: Request):
+        data = await body(request)
+        educator = store.create_educator(data["username"], data)
+        if educator is None:
+            return JSONResponse({"success": False}, status_code=409)
+        return JSONResponse({"success": True, "educator_info": educator}, status_code=201)
+
+    async def class_size(request: Request):
+        return JSONResponse({"size": store.class_size(request.path_params["cid"])})
+
+    async def class_for_student_story(request: Request):
+        cls = store.class_for_student(request.path_params["sid"])
+        size = store.class_size(cls["id"]) if cls else 0
+        return JSONResponse({"class": cls, "size": size})
+
+    async def ignore_student(request: Request):
+        data = await body(request)
+        store.set_ignored(
+            request.path_params["sid"],
+            request.path_params["story"],
+            data.get("ignore", True),
+        )
+        return JSONResponse({"success": True})
+
+    async def roster_info(request: Request):
+        story = request.path_params.get("story", "hubbles_law")
+        return JSONResponse(store.roster(request.path_params["cid"], story))
+
+    # Story and stage states
+
+    async def story_state(request: Request):
+        sid, story = request.path_params["sid"], request.path_params["story"]
+
+        if request.method == "GET":
+            return JSONResponse(
+                {"student_id": sid, "state": store.get_story_state(sid, story)}
+            )
+        elif request.method == "PUT":
+            store.put_story_state(sid, story, await body(request))
+        else:
+            store.patch_story_state(sid, story, await body(request))
+
+        return JSONResponse({"success": True})
+
+    async def stage_state(request: Request):
+        sid = request.path_params["sid"]
+        story, stage = request.path_params["story"], request.path_params["stage"]
+
+        if request.method == "GET":
+            return JSONResponse({"state": store.get_stage_state(sid, story, stage)})
+        elif request.method == "DELETE":
+            if not store.delete_stage_state(sid, story, stage):
+                return JSONResponse({"success": False}, status_code=404)
+        else:
+            store.put_stage_state(sid, story, stage, await body(request))
+
+        return JSONResponse({"success": True})
+
+    # Hubble story data
+
+    async def galaxies(request: Request):
+        fixture = fixtures.load_json(_key(request))
+        if fixture is not None:
+            return JSONResponse(fixture)
+
+        types = request.query_params.get("types")
+        allowed = set(types.split(",")) if types else None
+        return JSONResponse(
+            [g for g in store.galaxies.values() if not allowed or g["type"] in allowed]
+        )
+
+    async def sample_galaxy(request: Request):
+        fixture = fixtures.load_json(_key(request))
+        if fixture is not None:
+            return JSONResponse(fixture)
+
+        return JSONResponse(next(iter(store.galaxies.values()), None))
+
+    async def spectrum(request: Request):
+        fixture = fixtures.load(_key(request))
+        if fixture is not None:
+            return Response(fixture[2], status_code=fixture[0], media_type=fixture[1])
+
+        name = request.path_params["file"].replace(".fits", "")
+        galaxy = next((g for g in store.galaxies.values() if g["name"] == name), None)
+        if galaxy is None:
+            return JSONResponse({"error": f"Unknown galaxy `{name}`."}, status_code=404)
+
+        return Response(synthetic_spectrum(galaxy), media_type="application/fits")
+
+    async def measurements(request: Request):
+        story, sid = request.path_params["story"], request.path_params["sid"]
+        sample = request.url.path.split("/")[2] == "sample-measurements"
+        items = store.student_measurements(story, sid, sample=sample)
+
+        if (gid := request.path_params.get("gid")) is not None:
+            if request.method == "DELETE":
+                if not store.delete_measurement(story, sid, gid):
+                    return JSONResponse({"success": False}, status_code=404)
+                return JSONResponse({"success": True})
+
+            match = next((m for m in items if m["galaxy_id"] == gid), None)
+            return JSONResponse({"measurements": match})
+
+        return JSONResponse({"student_id": sid, "measurements": items})
+
+    async def submit_measurement(request: Request):
+        sample = request.url.path.split("/")[2] == "sample-measurement"
+        store.submit_measurement(
+            request.path_params["story"], await body(request), sample=sample
+        )
+        return JSONResponse({"success": True})
+
+    async def submit_measurements(request: Request):
+        # Bulk variant of `submit_measurement`, with a status for every row
+        sample = request.url.path.split("/")[2] == "submit-sample-measurements"
+        results = []
+        for measurement in (await body(request)).get("measurements", []):
+            try:
+                store.submit_measurement(
+                    request.path_params["story"], measurement, sample=sample
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                results.append({"success": False, "error": str(e)})
+            else:
+                results.append({"success": True})
+        return JSONResponse({"results": results})
+
+    async def class_measurements(request: Request):
+        complete_only = request.query_params.get("complete_only", "false") == "true"
+        return JSONResponse(
+            {
+                "measurements": store.class_measurements(
+                    request.path_params["story"],
+                    request.path_params["cid"],
+                    complete_only=complete_only,
+                )
+            }
+        )
+
+    async def students_completed(request: Request):
+        return JSONResponse(
+            {
+                "students_completed_measurements": store.students_completed(
+                    request.path_params["story"], request.path_params["cid"]
+                )
+            }
+        )
+
+    async def all_data(request: Request):
+        class_id = request.query_params.get("class_id")
+        return JSONResponse(
+            store.all_data(
+                request.path_params["story"],
+                int(class_id) if class_id is not None else None,
+            )
+        )
+
+    async def dashboard_class_measurements(request: Request):
+        return JSONResponse(
+            {
+                "measurements": store.class_measurements(
+                    "hubbles_law", request.path_params["cid"], complete_only=True
+                )
+            }
+        )
+
+    return [
+        Route("/student/{user}", get_student),
+        Route("/students/{user}", get_student),
+        Route("/educators/{user}", get_educator),
+        Route("/students/create", create_student, methods=["POST"]),
+        Route("/educators/create", create_educator, methods=["POST"]),
+        Route("/classes/size/{cid:int}", class_size),
+        Route("/class-for-student-story/{sid:int}/{story}", class_for_student_story),
+        Route("/students/ignore/{sid}/{story}", ignore_student, methods=["PUT"]),
+        Route("/roster-info/{cid:int}", roster_info),
+        Route("/roster-info/{cid:int}/{story}", roster_info),
+        Route(
+            "/story-state/{sid:int}/{story}",
+            story_state,
+            methods=["GET", "PUT", "PATCH"],
+        ),
+        Route(
+            "/stage-state/{sid:int}/{story}/{stage}",
+            stage_state,
+            methods=["GET", "PUT", "DELETE"],
+        ),
+        Route("/hubbles_law/measurements/classes/{cid:int}", dashboard_class_measurements),
+        Route("/{story}/galaxies", galaxies),
+        Route("/{story}/sample-galaxy", sample_galaxy),
+        Route("/{story}/spectra/{folder}/{file}", spectrum),
+        Route("/{story}/measurements/{sid:int}", measurements),
+        Route(
+            "/{story}/measurements/{sid:int}/{gid:int}",
+            measurements,
+            methods=["GET", "DELETE"],
+        ),
+        Route("/{story}/sample-measurements/{sid:int}", measurements),
+        Route("/{story}/sample-measurements/{sid:int}/{gid:int}", measurements),
+        Route("/{story}/submit-measurement/", submit_measurement, methods=["PUT"]),
+        Route("/{story}/sample-measurement/", submit_measurement, methods=["PUT"]),
+        Route("/{story}/submit-measurements/", submit_measurements, methods=["PUT"]),
+        Route(
+            "/{story}/submit-sample-measurements/",
+            submit_measurements,
+            methods=["PUT"],
+        ),
+        Route(
+            "/{story}/class-measurements/students-completed/{sid:int}/{cid:int}",
+            students_completed,
+        ),
+        Route("/{story}/class-measurements/{sid:int}/{cid:int}", class_measurements),
+        Route("/{story}/all-data", all_data),
+    ]
+
+
+def create_app(
+    mode: str = "standin",
+    fixtures_dir: str = "api_fixtures",
+    upstream: str = "https://api.cosmicds.cfa.harvard.edu",
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    store: StandInStore | None = None,
+) -> Starlette:
+    """
+    Creates the stand-in CosmicDS API application.
+
+    Parameters
+    ----------
+    mode : str
+        ``"standin"`` serves the API from an in-memory store, falling back to
+        recorded fixtures for unknown endpoints; ``"record"`` proxies every
+        request to `upstream` and records the responses as fixtures;
+        ``"replay"`` serves recorded fixtures only.
+    fixtures_dir : str
+        Directory fixtures are recorded to and replayed from.
+    upstream : str
+        The API server proxied in record mode.
+    latency, jitter : float
+        Artificial delay (in seconds) added to every response outside of
+        record mode.
+    store : `StandInStore`
+        The in-memory store used in stand-in mode.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode `{mode}`; expected one of {MODES}.")
+
+    fixtures = FixtureStore(fixtures_dir)
+    upstream = upstream.rstrip("/")
+    methods = ["GET", "POST", "PUT", "PATCH", "DELETE"]
+
+    async def record(request: Request):
+        client: httpx.AsyncClient = request.app.state.upstream_client
+        headers = {
+            "Authorization": request.headers.get(
+                "authorization", os.getenv("CDS_API_KEY", "")
+            )
+        }
+        if "content-type" in request.headers:
+            headers["Content-Type"] = request.headers["content-type"]
+
+        r = await client.request(
+            request.method,
+            f"{upstream}{request.url.path}",
+            params=request.url.query or None,
+            content=await request.body(),
+            headers=headers,
+        )
+        content_type = r.headers.get("content-type", "application/octet-stream")
+        fixtures.save(_key(request), r.status_code, content_type, r.content)
+
+        return Response(r.content, status_code=r.status_code, media_type=content_type)
+
+    async def replay(request: Request):
+        return _fixture_response(fixtures, request)
+
+    fallback = Route(
+        "/{path:path}", record if mode == "record" else replay, methods=methods
+    )
+
+    if mode == "standin":
+        routes = _standin_routes(store or StandInStore(), fixtures) + [fallback]
+    else:
+        routes = [fallback]
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        if mode != "record":
+            yield
+            return
+
+        async with httpx.AsyncClient(timeout=60) as client:
+            app.state.upstream_client = client
+            yield
+
+    app = Starlette(routes=routes, lifespan=lifespan)
+
+    if mode != "record":
+        app.add_middleware(LatencyMiddleware, latency=latency, jitter=jitter)
+
+    return app
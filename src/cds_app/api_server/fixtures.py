@@ -0,0 +1,82 @@
+import base64
+import hashlib
+import json
+from pathlib import Path
+from threading import Lock
+from urllib.parse import parse_qsl, urlencode
+
+TEXT_CONTENT_TYPES = ("application/json", "text/")
+
+
+def fixture_key(method: str, path: str, query: str = "") -> str:
+    """
+    Returns the key a request is recorded under. Query parameters are sorted
+    so that equivalent requests map to the same fixture.
+    """
+    query = urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+    request_line = f"{method.upper()} /{path.strip('/')}"
+    if query:
+        request_line += f"?{query}"
+    return request_line
+
+
+class FixtureStore:
+    """
+    Recorded API responses, stored as one JSON file per request under
+    `directory`. Text bodies are stored as-is; binary bodies (e.g. FITS
+    spectra) are base64 encoded.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self._lock = Lock()
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def save(
+        self, key: str, status: int, content_type: str, body: bytes
+    ) -> Path:
+        record = {"request": key, "status": status, "content_type": content_type}
+
+        if content_type.startswith(TEXT_CONTENT_TYPES):
+            record["body"] = body.decode("utf-8")
+        else:
+            record["body_b64"] = base64.b64encode(body).decode("ascii")
+
+        path = self._path(key)
+
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(record))
+
+        return path
+
+    def load(self, key: str) -> tuple[int, str, bytes] | None:
+        path = self._path(key)
+
+        if not path.exists():
+            return None
+
+        record = json.loads(path.read_text())
+
+        if "body_b64" in record:
+            body = base64.b64decode(record["body_b64"])
+        else:
+            body = record["body"].encode("utf-8")
+
+        return record["status"], record["content_type"], body
+
+    def load_json(self, key: str):
+        fixture = self.load(key)
+
+        if fixture is None or fixture[0] != 200:
+            return None
+
+        return json.loads(fixture[2])
+
+    def __len__(self):
+        if not self.directory.exists():
+            return 0
+        return sum(1 for _ in self.directory.glob("*.json"))
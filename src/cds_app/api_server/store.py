@@ -0,0 +1,292 @@
+import copy
+import csv
+import itertools
+from importlib.util import find_spec
+from pathlib import Path
+from threading import RLock
+
+
+def _bundled_galaxies() -> list[dict]:
+    """
+    Reads the galaxies referenced by the Hubble story's dummy student data,
+    without importing `cds_hubble` itself.
+    """
+    spec = find_spec("cds_hubble")
+
+    if spec is None or not spec.submodule_search_locations:
+        return []
+
+    path = Path(spec.submodule_search_locations[0]) / "data" / "dummy_student_data.csv"
+
+    galaxies = {}
+    with open(path, "r") as f:
+        for row in csv.DictReader(f):
+            galaxies[int(row["galaxy.id"])] = {
+                "id": int(row["galaxy.id"]),
+                "name": row["galaxy.name"],
+                "ra": float(row["galaxy.ra"]),
+                "decl": float(row["galaxy.decl"]),
+                "z": float(row["galaxy.z"]),
+                "type": row["galaxy.type"],
+                "element": row["galaxy.element"],
+            }
+
+    return list(galaxies.values())
+
+
+def _deep_merge(target: dict, patch: dict):
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _deep_merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+def _is_complete(measurement: dict) -> bool:
+    return all(
+        measurement.get(k) is not None
+        for k in ("obs_wave_value", "velocity_value", "ang_size_value", "est_dist_value")
+    )
+
+
+def _fit_summary(measurements: list[dict]) -> tuple[float | None, float | None]:
+    # Least-squares slope of velocity against distance through the origin
+    sxy = sxx = 0.0
+    for m in measurements:
+        if _is_complete(m):
+            sxy += m["est_dist_value"] * m["velocity_value"]
+            sxx += m["est_dist_value"] ** 2
+
+    if sxx == 0 or sxy == 0:
+        return None, None
+
+    from cds_core.fitting import GYR_PER_INVERSE_H0
+
+    h0 = sxy / sxx
+    return h0, round(GYR_PER_INVERSE_H0 / h0, 3)
+
+
+class StandInStore:
+    """
+    In-memory model of the CosmicDS API database: users, classes, story and
+    stage states, and (sample) measurements.
+    """
+
+    def __init__(self, galaxies: list[dict] | None = None, class_size: int = 0):
+        self.galaxies = {g["id"]: g for g in (galaxies or _bundled_galaxies())}
+        self.default_class_size = class_size
+        self.students: dict[str, dict] = {}
+        self.educators: dict[str, dict] = {}
+        self.classes: dict[int, dict] = {}
+        self.class_codes: dict[str, int] = {}
+        self.student_classes: dict[int, int] = {}
+        self.ignored: set[tuple[int, str]] = set()
+        self.story_states: dict[tuple[int, str], dict] = {}
+        self.stage_states: dict[tuple[int, str, str], dict] = {}
+        self.measurements: dict[tuple[str, int], dict[int, dict]] = {}
+        self.sample_measurements: dict[tuple[str, int], dict[tuple, dict]] = {}
+        self._ids = itertools.count(1)
+        self._lock = RLock()
+
+    # Users and classes
+
+    def get_student(self, username: str) -> dict | None:
+        return self.students.get(username)
+
+    def get_educator(self, username: str) -> dict | None:
+        return self.educators.get(username)
+
+    def get_or_create_class(self, code: str) -> dict:
+        with self._lock:
+            if code in self.class_codes:
+                return self.classes[self.class_codes[code]]
+
+            class_id = int(code) if code.isdigit() else next(self._ids)
+            self.classes[class_id] = {
+                "id": class_id,
+                "name": f"Class {code}",
+                "code": code,
+                "educator_id": 0,
+                "small_class": False,
+            }
+            self.class_codes[code] = class_id
+            return self.classes[class_id]
+
+    def create_student(self, username: str, class_code: str) -> dict | None:
+        with self._lock:
+            if username in self.students:
+                return None
+
+            student = {
+                "id": next(self._ids) + 1000,
+                "username": username,
+                "email": username,
+                "verified": 1,
+            }
+            self.students[username] = student
+
+            if class_code:
+                self.student_classes[student["id"]] = self.get_or_create_class(
+                    class_code
+                )["id"]
+
+            return student
+
+    def create_educator(self, username: str, info: dict) -> dict | None:
+        with self._lock:
+            if username in self.educators:
+                return None
+
+            educator = {**info, "id": next(self._ids), "username": username}
+            self.educators[username] = educator
+            return educator
+
+    def class_students(self, class_id: int) -> list[int]:
+        return [s for s, c in self.student_classes.items() if c == class_id]
+
+    def class_size(self, class_id: int) -> int:
+        return max(len(self.class_students(class_id)), self.default_class_size)
+
+    def class_for_student(self, student_id: int) -> dict | None:
+        class_id = self.student_classes.get(student_id)
+        return self.classes.get(class_id) if class_id is not None else None
+
+    def set_ignored(self, student: int | str, story: str, ignore: bool):
+        # Students are ignored by id or, like the real API, by username
+        if isinstance(student, str):
+            if student.isdigit():
+                student = int(student)
+            elif (record := self.students.get(student)) is not None:
+                student = record["id"]
+
+        with self._lock:
+            if ignore:
+                self.ignored.add((student, story))
+            else:
+                self.ignored.discard((student, story))
+
+    # Story and stage states
+
+    def get_story_state(self, student_id: int, story: str) -> dict | None:
+        return self.story_states.get((student_id, story))
+
+    def put_story_state(self, student_id: int, story: str, state: dict):
+        with self._lock:
+            self.story_states[(student_id, story)] = copy.deepcopy(state)
+
+    def patch_story_state(self, student_id: int, story: str, patch: dict):
+        with self._lock:
+            state = self.story_states.setdefault((student_id, story), {})
+            _deep_merge(state, patch)
+
+    def get_stage_state(self, student_id: int, story: str, stage: str) -> dict | None:
+        return self.stage_states.get((student_id, story, stage))
+
+    def put_stage_state(self, student_id: int, story: str, stage: str, state: dict):
+        with self._lock:
+            self.stage_states[(student_id, story, stage)] = copy.deepcopy(state)
+
+    def delete_stage_state(self, student_id: int, story: str, stage: str) -> bool:
+        with self._lock:
+            return self.stage_states.pop((student_id, story, stage), None) is not None
+
+    # Measurements
+
+    def _with_galaxy(self, measurement: dict) -> dict:
+        return {**measurement, "galaxy": self.galaxies.get(measurement["galaxy_id"])}
+
+    def submit_measurement(self, story: str, measurement: dict, sample=False):
+        student_id = int(measurement["student_id"])
+        measurement = {
+            **measurement,
+            "student_id": student_id,
+            "galaxy_id": int(measurement["galaxy_id"]),
+            "class_id": self.student_classes.get(student_id),
+        }
+
+        with self._lock:
+            if sample:
+                key = (measurement["galaxy_id"], measurement.get("measurement_number"))
+                self.sample_measurements.setdefault((story, student_id), {})[key] = (
+                    measurement
+                )
+            else:
+                self.measurements.setdefault((story, student_id), {})[
+                    measurement["galaxy_id"]
+                ] = measurement
+
+    def student_measurements(
+        self, story: str, student_id: int, sample=False
+    ) -> list[dict]:
+        store = self.sample_measurements if sample else self.measurements
+        return [
+            self._with_galaxy(m)
+            for m in store.get((story, student_id), {}).values()
+        ]
+
+    def delete_measurement(self, story: str, student_id: int, galaxy_id: int) -> bool:
+        with self._lock:
+            measurements = self.measurements.get((story, student_id), {})
+            return measurements.pop(galaxy_id, None) is not None
+
+    def class_measurements(
+        self, story: str, class_id: int, complete_only: bool = False
+    ) -> list[dict]:
+        measurements = []
+        for student_id in self.class_students(class_id):
+            if (student_id, story) in self.ignored:
+                continue
+            for m in self.student_measurements(story, student_id):
+                if not complete_only or _is_complete(m):
+                    measurements.append(m)
+        return measurements
+
+    def students_completed(self, story: str, class_id: int, required: int = 5) -> int:
+        return sum(
+            1
+            for student_id in self.class_students(class_id)
+            if sum(map(_is_complete, self.student_measurements(story, student_id)))
+            >= required
+        )
+
+    def all_data(self, story: str, class_id: int | None = None) -> dict:
+        class_ids = [class_id] if class_id is not None else list(self.classes)
+
+        measurements, student_data, class_data = [], [], []
+        for cid in class_ids:
+            class_measurements = self.class_measurements(story, cid, complete_only=True)
+            measurements.extend(class_measurements)
+
+            for student_id in self.class_students(cid):
+                h0, age = _fit_summary(
+                    [m for m in class_measurements if m["student_id"] == student_id]
+                )
+                if h0 is not None:
+                    student_data.append(
+                        {"student_id": student_id, "hubble_fit_value": h0, "age_value": age}
+                    )
+
+            h0, age = _fit_summary(class_measurements)
+            if h0 is not None:
+                class_data.append(
+                    {"class_id": cid, "hubble_fit_value": h0, "age_value": age}
+                )
+
+        return {
+            "measurements": measurements,
+            "studentData": student_data,
+            "classData": class_data,
+        }
+
+    def roster(self, class_id: int, story: str) -> list[dict]:
+        student_by_id = {s["id"]: s for s in self.students.values()}
+        return [
+            {
+                "student_id": student_id,
+                "student": student_by_id.get(student_id, {}),
+                "story_state": (self.get_story_state(student_id, story) or {})
+                .get("app", {})
+                .get("story_state", {}),
+            }
+            for student_id in self.class_students(class_id)
+        ]
@@ -0,0 +1,46 @@
+"""
+Precompresses the static assets of the story and portal packages, which
+their servers then serve with long-lived cache headers (see
+``cds_core.assets``).
+
+For each package, gzip (and, if the `brotli` package is installed, brotli)
+variants of the files of its `public` folder are written to a `public-build`
+folder next to it.
+"""
+
+import argparse
+import importlib.util
+from pathlib import Path
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--packages",
+        nargs="+",
+        default=["cds_hubble", "cds_portal"],
+        help="Packages whose `public` folders are built.",
+    )
+
+
+def run(args: argparse.Namespace):
+    from cds_core.assets import StaticAssets, build_assets
+
+    for package in args.packages:
+        spec = importlib.util.find_spec(package)
+
+        if spec is None or not spec.submodule_search_locations:
+            print(f"Skipping `{package}`, which is not installed.")
+            continue
+
+        assets = StaticAssets(Path(spec.submodule_search_locations[0]) / "public")
+        files, variants = build_assets(assets)
+        print(
+            f"Wrote {variants} compressed variants of {files} files "
+            f"to `{assets.build}`."
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_arguments(parser)
+    run(parser.parse_args(argv))
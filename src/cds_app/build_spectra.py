@@ -0,0 +1,71 @@
+"""
+Packs every galaxy spectrum of the Hubble story into a memory-mapped
+``cds_hubble.spectrum_bundle.SpectrumBundle``.
+
+Spectra are downloaded from the CosmicDS API at ``CDS_API_URL``. By default,
+the bundle is written to ``cds_hubble/data/spectra.bundle``, where
+``LocalAPI.load_spectrum_data`` reads it instead of the API.
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Bundle to write; defaults to `CDS_SPECTRUM_BUNDLE`, or the one "
+        "shipped in `cds_hubble/data`.",
+    )
+    parser.add_argument("--story", default="hubbles_law", help="Story ID.")
+    parser.add_argument(
+        "--types",
+        default="Sp,E,Ir",
+        help="Comma-separated galaxy types whose spectra are included.",
+    )
+    parser.add_argument(
+        "--dtype",
+        default="float32",
+        help="Precision in which the samples are stored.",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Concurrent downloads."
+    )
+
+
+def run(args: argparse.Namespace):
+    from cds_hubble.remote import LOCAL_API
+    from cds_hubble.spectrum_bundle import SPECTRUM_BUNDLE_PATH, write_bundle
+    from cds_hubble.story_state import GalaxyData
+
+    r = LOCAL_API.request_session.get(
+        f"{LOCAL_API.API_URL}/{args.story}/galaxies?types={args.types}"
+    )
+    r.raise_for_status()
+    galaxies = [GalaxyData(**galaxy) for galaxy in r.json()]
+    print(f"Downloading the spectra of {len(galaxies)} galaxies...")
+
+    def _download(gal_data: GalaxyData):
+        try:
+            return gal_data, LOCAL_API.download_spectrum_data(args.story, gal_data)
+        except Exception as e:
+            print(f"Failed to download the spectrum of `{gal_data.name}`: {e}")
+            return gal_data, None
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        spectra = [
+            (gal_data, spec_data)
+            for gal_data, spec_data in executor.map(_download, galaxies)
+            if spec_data is not None
+        ]
+
+    output = args.output or SPECTRUM_BUNDLE_PATH
+    count = write_bundle(output, spectra, dtype=args.dtype)
+    print(f"Wrote {count} of {len(galaxies)} spectra to `{output}`.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_arguments(parser)
+    run(parser.parse_args(argv))
@@ -0,0 +1,177 @@
+"""
+A headless load generator for the Hubble's Law story.
+
+Each simulated student gets an account in the CosmicDS API (use the stand-in
+from ``cds-app api-server``, and point both the story server and the load
+generator at it with ``CDS_API_URL``), is seeded with measurements by one of
+the story's ``fill_*`` helpers, and is then walked through every stage in
+``cds_hubble.routes`` over a real kernel websocket.
+
+The story server must share ``SOLARA_SESSION_SECRET_KEY`` and
+``SOLARA_OAUTH_CLIENT_ID`` with the load generator, so that the generated
+login cookies are accepted.
+"""
+
+import argparse
+import asyncio
+import json
+import uuid
+
+from .report import format_report, percentile, summarize
+from .seed import FILLS
+from .session import SessionStats, SimulatedSession
+
+__all__ = ["SimulatedSession", "SessionStats", "percentile", "summarize", "main"]
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--url",
+        default="http://localhost:8000/hubbles-law",
+        help="Root URL of the running `cds_hubble.server:app`.",
+    )
+    parser.add_argument(
+        "--sessions", type=int, default=10, help="Number of simulated students."
+    )
+    parser.add_argument(
+        "--ramp",
+        type=float,
+        default=0.0,
+        help="Seconds over which session start times are spread.",
+    )
+    parser.add_argument(
+        "--think",
+        type=float,
+        default=1.0,
+        help="Seconds each student spends on a stage before moving on.",
+    )
+    parser.add_argument(
+        "--fill",
+        choices=FILLS,
+        default="all",
+        help="Which `fill_*` helper seeds each student's measurements.",
+    )
+    parser.add_argument(
+        "--class-code", default="215", help="Class the simulated students join."
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=120.0,
+        help="Seconds to wait for the app to start or a page to render.",
+    )
+    parser.add_argument(
+        "--server-pid",
+        type=int,
+        default=None,
+        help="PID of the story server, to report its RSS per session.",
+    )
+    parser.add_argument(
+        "--json", default=None, help="Also write the full results to this file."
+    )
+
+
+def _stages() -> list[tuple[str, str]]:
+    from cds_hubble.routes import routes
+
+    return [
+        ("/" if route.path == "/" else f"/{route.path}", route.label)
+        for route in routes
+    ]
+
+
+def _rss(pid: int | None) -> int | None:
+    if pid is None:
+        return None
+
+    import psutil
+
+    return psutil.Process(pid).memory_info().rss
+
+
+async def _simulate(
+    index: int,
+    args: argparse.Namespace,
+    run_id: str,
+    stages: list[tuple[str, str]],
+    walked: asyncio.Queue,
+    release: asyncio.Event,
+) -> SessionStats:
+    from solara.server import settings
+
+    from .seed import create_student, seed_measurements, userinfo
+    from .session import AUTH_SESSION_COOKIE, session_cookie
+
+    await asyncio.sleep(index * args.ramp / max(args.sessions, 1))
+
+    name = f"Load Test {run_id}-{index}"
+    email = f"loadgen-{run_id}-{index}@cosmicds.test"
+    cookie = session_cookie(
+        userinfo(email, name),
+        secret_key=settings.session.secret_key,
+        client_id=settings.oauth.client_id,
+    )
+    session = SimulatedSession(args.url, {AUTH_SESSION_COOKIE: cookie}, user=email)
+
+    try:
+        student_id = await create_student(email, args.class_code)
+        await seed_measurements(student_id, args.fill)
+
+        (first, _), *rest = stages
+        await session.open(first, timeout=args.timeout)
+
+        for location, label in rest:
+            await asyncio.sleep(args.think)
+            await session.navigate(location, label, timeout=args.timeout)
+    except Exception as e:
+        session.stats.error = f"{type(e).__name__}: {e}"
+
+    # Keep the session connected until every student has finished, so the
+    # server's memory is measured with all sessions alive
+    walked.put_nowait(index)
+    await release.wait()
+    await session.close()
+
+    return session.stats
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    stages = _stages()
+    run_id = uuid.uuid4().hex[:8]
+    rss_before = _rss(args.server_pid)
+
+    walked = asyncio.Queue()
+    release = asyncio.Event()
+    tasks = [
+        asyncio.create_task(_simulate(i, args, run_id, stages, walked, release))
+        for i in range(args.sessions)
+    ]
+
+    for _ in tasks:
+        await walked.get()
+
+    rss_after = _rss(args.server_pid)
+    release.set()
+    sessions = await asyncio.gather(*tasks)
+
+    return summarize(
+        sessions,
+        labels=[label for _, label in stages[1:]],
+        rss_before=rss_before,
+        rss_after=rss_after,
+    )
+
+
+def run(args: argparse.Namespace):
+    summary = asyncio.run(_run(args))
+    print(format_report(summary))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_arguments(parser)
+    run(parser.parse_args(argv))
@@ -0,0 +1,121 @@
+import math
+from dataclasses import asdict
+
+from .session import SessionStats
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile of `values`, or `None` if there are none."""
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def _latencies(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values, default=None),
+    }
+
+
+def summarize(
+    sessions: list[SessionStats],
+    labels: list[str],
+    rss_before: int | None = None,
+    rss_after: int | None = None,
+) -> dict:
+    completed = [s for s in sessions if s.error is None]
+    n = len(sessions) or 1
+
+    summary = {
+        "sessions": len(sessions),
+        "failed": len(sessions) - len(completed),
+        "errors": sorted({s.error for s in sessions if s.error is not None}),
+        "page_load": _latencies([s.page_load for s in sessions if s.page_load]),
+        "app_start": _latencies([s.app_start for s in sessions if s.app_start]),
+        "transitions": _latencies(
+            [t for s in sessions for t in s.transitions.values()]
+        ),
+        "stages": {
+            label: _latencies(
+                [s.transitions[label] for s in sessions if label in s.transitions]
+            )
+            for label in labels
+        },
+        "websocket": {
+            "messages_received": sum(s.messages_received for s in sessions),
+            "bytes_received": sum(s.bytes_received for s in sessions),
+            "messages_sent": sum(s.messages_sent for s in sessions),
+            "bytes_sent": sum(s.bytes_sent for s in sessions),
+            "messages_per_session": sum(s.messages_received for s in sessions) / n,
+            "bytes_per_session": sum(s.bytes_received for s in sessions) / n,
+        },
+        "rss": None,
+        "raw": [asdict(s) for s in sessions],
+    }
+
+    if rss_before is not None and rss_after is not None:
+        summary["rss"] = {
+            "before": rss_before,
+            "after": rss_after,
+            "per_session": (rss_after - rss_before) / n,
+        }
+
+    return summary
+
+
+def _ms(value: float | None) -> str:
+    return "-" if value is None else f"{value * 1000:.0f}"
+
+
+def _mb(value: float) -> str:
+    return f"{value / 2**20:.1f} MB"
+
+
+def format_report(summary: dict) -> str:
+    lines = [
+        f"Sessions: {summary['sessions']} ({summary['failed']} failed)",
+    ]
+    lines += [f"  error: {e}" for e in summary["errors"]]
+
+    lines.append("")
+    lines.append(f"{'latency (ms)':<28}{'n':>6}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}")
+    rows = [
+        ("page load", summary["page_load"]),
+        ("app start", summary["app_start"]),
+        ("page transitions", summary["transitions"]),
+    ] + [(f"  -> {label}", stats) for label, stats in summary["stages"].items()]
+
+    for name, stats in rows:
+        lines.append(
+            f"{name:<28}{stats['count']:>6}{_ms(stats['p50']):>8}{_ms(stats['p95']):>8}"
+            f"{_ms(stats['p99']):>8}{_ms(stats['max']):>8}"
+        )
+
+    ws = summary["websocket"]
+    lines.append("")
+    lines.append(
+        f"Websocket: {ws['messages_received']} messages / {_mb(ws['bytes_received'])} "
+        f"received, {ws['messages_sent']} messages / {_mb(ws['bytes_sent'])} sent"
+    )
+    lines.append(
+        f"  per session: {ws['messages_per_session']:.0f} messages, "
+        f"{_mb(ws['bytes_per_session'])} received"
+    )
+
+    rss = summary["rss"]
+    if rss is None:
+        lines.append("Server RSS: not measured (pass --server-pid)")
+    else:
+        lines.append(
+            f"Server RSS: {_mb(rss['before'])} -> {_mb(rss['after'])}, "
+            f"{_mb(rss['per_session'])} per session"
+        )
+
+    return "\n".join(lines)
@@ -0,0 +1,99 @@
+import asyncio
+
+# The `fill_*` helpers from `cds_hubble.helpers.measurement_helpers`, keyed
+# by how far through the measurement stages the simulated students are.
+FILLS = {
+    "none": None,
+    "wavelengths": "fill_and_add_wavelengths",
+    "velocities": "fill_and_add_velocities",
+    "wave-vel-ang": "fill_add_wave_vel_ang",
+    "ang-dist": "fill_add_angular_size_and_distance",
+    "all": "fill_add_all_measurements",
+}
+
+
+def userinfo(email: str, name: str) -> dict:
+    return {
+        "cds/name": name,
+        "cds/email": email,
+        "name": name,
+        "nickname": name,
+        "email": email,
+        "email_verified": True,
+    }
+
+
+async def create_student(email: str, class_code: str) -> int:
+    """
+    Registers the student behind `email` with the API, the same way
+    `BaseAPI.create_new_user` does on first login, and returns their id.
+    """
+    from cds_core.identity import hash_user_ref
+    from cds_hubble.remote import LOCAL_API
+
+    hashed_user = hash_user_ref(email)
+    client = LOCAL_API.async_session
+
+    r = await client.get(f"{LOCAL_API.API_URL}/student/{hashed_user}")
+    student = r.json()["student"]
+
+    if student is None:
+        r = await client.post(
+            f"{LOCAL_API.API_URL}/students/create",
+            json={
+                "username": hashed_user,
+                "password": "",
+                "institution": "",
+                "email": hashed_user,
+                "age": 0,
+                "gender": "undefined",
+                "classroom_code": class_code,
+            },
+        )
+        r.raise_for_status()
+
+        r = await client.get(f"{LOCAL_API.API_URL}/student/{hashed_user}")
+        student = r.json()["student"]
+
+    return student["id"]
+
+
+async def seed_measurements(student_id: int, fill: str) -> int:
+    """
+    Generates measurements for the student with one of the story's `fill_*`
+    helpers and submits them, so the session starts out with the data a
+    student would have at that point of the story. Returns the number of
+    measurements submitted.
+    """
+    helper_name = FILLS[fill]
+
+    if helper_name is None:
+        return 0
+
+    import solara
+    from cds_core.app_state import AppState, Student
+    from cds_hubble.helpers import measurement_helpers
+    from cds_hubble.remote import LOCAL_API
+    from cds_hubble.story_state import StoryState
+
+    global_state = solara.Reactive(AppState(student=Student(id=student_id)))
+    local_state = solara.Reactive(StoryState())
+
+    # The helpers call `ignore_student` synchronously, so keep them off the loop
+    await asyncio.to_thread(
+        getattr(measurement_helpers, helper_name), LOCAL_API, local_state, global_state
+    )
+
+    url = f"{LOCAL_API.API_URL}/{local_state.value.story_id}/submit-measurement/"
+    measurements = local_state.value.measurements
+    responses = await asyncio.gather(
+        *(
+            LOCAL_API.async_session.put(url, json=m.model_dump(exclude={"galaxy"}))
+            for m in measurements
+        )
+    )
+
+    for r in responses:
+        r.raise_for_status()
+
+    return len(measurements)
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import struct
+import time
+import uuid
+from base64 import b64encode
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import httpx
+
+# Cookie names used by the solara server
+SESSION_ID_COOKIE = "solara-session-id"
+AUTH_SESSION_COOKIE = "solara-session"
+
+
+def session_cookie(userinfo: dict, secret_key: str, client_id: str) -> str:
+    """
+    Builds a signed `solara-session` cookie for `userinfo`, in the format
+    written by solara-enterprise after a successful OAuth login. The secret
+    key and client id have to match the ones the server was started with.
+    """
+    import itsdangerous
+
+    session = {
+        "token": json.dumps({"access_token": "loadgen", "token_type": "Bearer"}),
+        "user": json.dumps(userinfo),
+        "client_id": client_id,
+    }
+    data = b64encode(json.dumps(session).encode("utf-8"))
+    return itsdangerous.TimestampSigner(secret_key).sign(data).decode("utf-8")
+
+
+def _decode(frame: str | bytes) -> dict:
+    # Messages carrying buffers are sent in the binary Jupyter wire format;
+    # we only need the JSON part.
+    if isinstance(frame, str):
+        return json.loads(frame)
+
+    n_parts = struct.unpack("!I", frame[:4])[0]
+    offsets = struct.unpack("!" + "I" * n_parts, frame[4 : 4 * (n_parts + 1)])
+    end = offsets[1] if n_parts > 1 else None
+    return json.loads(frame[offsets[0] : end])
+
+
+@dataclass
+class SessionStats:
+    """Measurements collected over the lifetime of a `SimulatedSession`."""
+
+    user: str
+    page_load: float | None = None
+    app_start: float | None = None
+    transitions: dict[str, float] = field(default_factory=dict)
+    messages_received: int = 0
+    bytes_received: int = 0
+    messages_sent: int = 0
+    bytes_sent: int = 0
+    error: str | None = None
+
+
+class SimulatedSession:
+    """
+    A headless browser tab connected to a solara app. It loads the page,
+    opens the kernel websocket, starts the app the way `main-vuetify.js`
+    does, and navigates between routes by updating the `Navigator` widget's
+    `location`, exactly as the front-end router would.
+    """
+
+    def __init__(self, base_url: str, cookies: dict[str, str], user: str):
+        self.base_url = base_url.rstrip("/")
+        self.cookies = dict(cookies)
+        self.stats = SessionStats(user=user)
+        self.kernel_id = str(uuid.uuid4())
+        self.page_id = str(uuid.uuid4())
+        self._control_id = str(uuid.uuid4())
+        self._navigator_id: str | None = None
+        self._websocket = None
+        self._reader: asyncio.Task | None = None
+        self._waiters: dict[str, asyncio.Future] = {}
+        self._app_finished: asyncio.Future | None = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self, path: str = "/", timeout: float = 120):
+        import websockets
+
+        t0 = time.perf_counter()
+        async with httpx.AsyncClient(cookies=self.cookies, timeout=timeout) as client:
+            r = await client.get(f"{self.base_url}{path}")
+            r.raise_for_status()
+            self.cookies.update(client.cookies)
+        self.stats.page_load = time.perf_counter() - t0
+
+        ws_url = self.base_url.replace("http", "ws", 1)
+        self._websocket = await websockets.connect(
+            f"{ws_url}/jupyter/api/kernels/{self.kernel_id}/channels"
+            f"?session_id={self.page_id}",
+            additional_headers={
+                "Cookie": "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+            },
+            max_size=None,
+        )
+        self._reader = asyncio.create_task(self._read())
+
+        # Start the app, as `widgetManager.run` does in the browser
+        t0 = time.perf_counter()
+        self._app_finished = asyncio.get_running_loop().create_future()
+        await self._send(
+            "comm_open",
+            {"comm_id": self._control_id, "target_name": "solara.control", "data": {}},
+        )
+        await self._send(
+            "comm_msg",
+            {
+                "comm_id": self._control_id,
+                "data": {
+                    "method": "run",
+                    "args": {"path": path, "appName": None, "dark": False, "themes": None},
+                },
+            },
+        )
+        await asyncio.wait_for(self._app_finished, timeout)
+        self.stats.app_start = time.perf_counter() - t0
+
+    async def navigate(self, location: str, label: str, timeout: float = 120):
+        """
+        Moves the session to `location` and records the time until the
+        server has finished re-rendering, i.e. reports the kernel as idle
+        for our update message.
+        """
+        if self._navigator_id is None:
+            raise RuntimeError("The app did not create a `Navigator` widget.")
+
+        t0 = time.perf_counter()
+        msg_id = await self._send(
+            "comm_msg",
+            {
+                "comm_id": self._navigator_id,
+                "data": {
+                    "method": "update",
+                    "state": {"location": location},
+                    "buffer_paths": [],
+                },
+            },
+        )
+        await asyncio.wait_for(self._waiters[msg_id], timeout)
+        self.stats.transitions[label] = time.perf_counter() - t0
+
+    async def close(self):
+        if self._websocket is not None:
+            await self._websocket.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+    async def _send(self, msg_type: str, content: dict) -> str:
+        msg_id = uuid.uuid4().hex
+        message = json.dumps(
+            {
+                "header": {
+                    "msg_id": msg_id,
+                    "msg_type": msg_type,
+                    "session": self.page_id,
+                    "username": "",
+                    "date": datetime.now(timezone.utc).isoformat(),
+                    "version": "5.3",
+                },
+                "parent_header": {},
+                "metadata": {},
+                "content": content,
+                "buffers": [],
+                "channel": "shell",
+            }
+        )
+        self._waiters[msg_id] = asyncio.get_running_loop().create_future()
+        await self._websocket.send(message)
+        self.stats.messages_sent += 1
+        self.stats.bytes_sent += len(message)
+        return msg_id
+
+    async def _read(self):
+        import websockets
+
+        try:
+            async for frame in self._websocket:
+                self.stats.messages_received += 1
+                self.stats.bytes_received += len(frame)
+                self._handle(_decode(frame))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for waiter in [self._app_finished, *self._waiters.values()]:
+                if waiter is not None and not waiter.done():
+                    waiter.set_exception(ConnectionError("Websocket closed."))
+
+    def _handle(self, msg: dict):
+        msg_type = msg.get("msg_type") or msg["header"]["msg_type"]
+        content = msg.get("content", {})
+
+        if msg_type == "status" and content.get("execution_state") == "idle":
+            waiter = self._waiters.pop(msg["parent_header"].get("msg_id"), None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+
+        elif msg_type == "comm_open" and self._navigator_id is None:
+            state = content.get("data", {}).get("state", {})
+            if (
+                state.get("_model_name") == "VuetifyTemplateModel"
+                and "location" in state
+            ):
+                self._navigator_id = content["comm_id"]
+
+        elif msg_type == "comm_msg" and content.get("comm_id") == self._control_id:
+            if content.get("data", {}).get("method") == "finished":
+                if not self._app_finished.done():
+                    self._app_finished.set_result(None)
@@ -0,0 +1,110 @@
+"""
+Fills the cache of the WWT imagery proxy (``cds_hubble.wwt_proxy``) with the
+tiles around every galaxy of the Hubble story, so that the first class to
+open the sky viewers doesn't wait on the upstream imagery servers.
+
+Galaxies are listed from the CosmicDS API at ``CDS_API_URL``. Tiles are
+stored in ``CDS_WWT_CACHE_DIR``, which the proxy reads from. Only imagesets
+in the HEALPix (HiPS) projection are prefetched; tiles of other imagesets
+are cached as they are first requested.
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--story", default="hubbles_law", help="Story ID.")
+    parser.add_argument(
+        "--types",
+        default="Sp",
+        help="Comma-separated galaxy types whose fields are prefetched.",
+    )
+    parser.add_argument(
+        "--imagesets",
+        default="SDSS9 color,Digitized Sky Survey (Color)",
+        help="Comma-separated names of the imagesets to prefetch.",
+    )
+    parser.add_argument(
+        "--fov",
+        type=float,
+        default=None,
+        help="Width (degrees) of the field around each galaxy; defaults to the "
+        "field of view of the galaxy close-up.",
+    )
+    parser.add_argument(
+        "--max-order", type=int, default=11, help="Deepest HiPS order fetched."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Concurrent downloads."
+    )
+
+
+def run(args: argparse.Namespace):
+    import astropy.units as u
+    import httpx
+
+    from cds_hubble.remote import LOCAL_API
+    from cds_hubble.utils import GALAXY_FOV
+    from cds_hubble.wwt_proxy import (
+        UPSTREAM_SURVEYS_URL,
+        WWT_TILE_CACHE,
+        field_tile_urls,
+        read_imagesets,
+    )
+
+    with httpx.Client(follow_redirects=True, timeout=30) as client:
+        wtml = WWT_TILE_CACHE.get(UPSTREAM_SURVEYS_URL)
+
+        if wtml is None:
+            r = client.get(UPSTREAM_SURVEYS_URL)
+            r.raise_for_status()
+            wtml = r.content
+            WWT_TILE_CACHE.set(UPSTREAM_SURVEYS_URL, wtml)
+
+        names = set(args.imagesets.split(","))
+        imagesets = [x for x in read_imagesets(wtml.decode()) if x.name in names]
+
+        r = LOCAL_API.request_session.get(
+            f"{LOCAL_API.API_URL}/{args.story}/galaxies?types={args.types}"
+        )
+        r.raise_for_status()
+        galaxies = r.json()
+
+        fov = args.fov or GALAXY_FOV.to_value(u.deg)
+        urls = set()
+        for imageset in imagesets:
+            for galaxy in galaxies:
+                urls |= field_tile_urls(
+                    imageset, galaxy["ra"], galaxy["decl"], fov, args.max_order
+                )
+
+        urls = [url for url in urls if url not in WWT_TILE_CACHE]
+        print(
+            f"Fetching {len(urls)} uncached tiles of {len(imagesets)} imagesets "
+            f"for {len(galaxies)} galaxies..."
+        )
+
+        def _download(url: str) -> bool:
+            try:
+                r = client.get(url)
+            except httpx.HTTPError as e:
+                print(f"Failed to fetch `{url}`: {e}")
+                return False
+
+            if r.status_code != 200:
+                return False
+
+            WWT_TILE_CACHE.set(url, r.content)
+            return True
+
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            fetched = sum(executor.map(_download, urls))
+
+    print(f"Cached {fetched} of {len(urls)} tiles in `{WWT_TILE_CACHE.directory}`.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_arguments(parser)
+    run(parser.parse_args(argv))